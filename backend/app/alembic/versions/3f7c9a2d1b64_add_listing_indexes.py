@@ -0,0 +1,53 @@
+"""Add indexes for the item and user listings
+
+Revision ID: 3f7c9a2d1b64
+Revises: fe56fa70289e
+Create Date: 2026-10-17 10:12:44.318207
+
+"""
+from alembic import op
+import sqlalchemy as sa
+import sqlmodel.sql.sqltypes
+
+
+# revision identifiers, used by Alembic.
+revision = '3f7c9a2d1b64'
+down_revision = 'fe56fa70289e'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # CONCURRENTLY does not block writes but cannot run in a transaction.
+    # If interrupted it leaves an INVALID index: drop it and run again
+    with op.get_context().autocommit_block():
+        op.create_index(
+            'ix_item_owner_id_created_at_id',
+            'item',
+            ['owner_id', sa.text('created_at DESC'), sa.text('id DESC')],
+            postgresql_concurrently=True,
+            if_not_exists=True,
+        )
+        op.create_index(
+            'ix_user_created_at_id',
+            'user',
+            [sa.text('created_at DESC'), sa.text('id DESC')],
+            postgresql_concurrently=True,
+            if_not_exists=True,
+        )
+
+
+def downgrade():
+    with op.get_context().autocommit_block():
+        op.drop_index(
+            'ix_user_created_at_id',
+            table_name='user',
+            postgresql_concurrently=True,
+            if_exists=True,
+        )
+        op.drop_index(
+            'ix_item_owner_id_created_at_id',
+            table_name='item',
+            postgresql_concurrently=True,
+            if_exists=True,
+        )
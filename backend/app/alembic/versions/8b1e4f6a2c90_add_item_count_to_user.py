@@ -0,0 +1,32 @@
+"""Add item_count to User
+
+Revision ID: 8b1e4f6a2c90
+Revises: 3f7c9a2d1b64
+Create Date: 2026-10-17 14:03:21.540917
+
+"""
+from alembic import op
+import sqlalchemy as sa
+import sqlmodel.sql.sqltypes
+
+
+# revision identifiers, used by Alembic.
+revision = '8b1e4f6a2c90'
+down_revision = '3f7c9a2d1b64'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.add_column('user', sa.Column('item_count', sa.Integer(), server_default='0', nullable=False))
+    # Backfill, scripts/check_item_counts.py --repair fixes items written by
+    # the previous version while this runs
+    op.execute(
+        'UPDATE "user" SET item_count = counts.n '
+        'FROM (SELECT owner_id, count(*) AS n FROM item GROUP BY owner_id) AS counts '
+        'WHERE counts.owner_id = "user".id'
+    )
+
+
+def downgrade():
+    op.drop_column('user', 'item_count')
@@ -0,0 +1,41 @@
+from fastapi import APIRouter
+from fastapi.responses import PlainTextResponse
+
+from app.core.db import async_engine, engine
+from app.core.pool import async_pool_metrics, render_pool_metrics, sync_pool_metrics
+from app.ml.executor import get_inference_executor
+from app.ml.metrics import render_gauges, render_histograms
+
+router = APIRouter()
+
+
+@router.get("/metrics", response_class=PlainTextResponse)
+def metrics() -> str:
+    """
+    Inference and database pool metrics in the Prometheus text format.
+
+    Per-stage latency summaries (p50/p90/p99/p999) of the inference path, the
+    inference executor load, and connection pool checkout waits and usage of
+    both database engines. Values are per worker process.
+    """
+    executor_stats = get_inference_executor().stats()
+    return (
+        render_histograms()
+        + render_gauges(
+            "ml_executor",
+            {
+                "workers": executor_stats["workers"],
+                "running": executor_stats["running"],
+                "queue_depth": executor_stats["queue_depth"],
+                "completed": executor_stats["completed"],
+                "rejected": executor_stats["rejected"],
+            },
+            counters=("completed", "rejected"),
+        )
+        + render_pool_metrics(
+            {
+                "sync": (engine.pool, sync_pool_metrics),
+                "async": (async_engine.pool, async_pool_metrics),
+            }
+        )
+    )
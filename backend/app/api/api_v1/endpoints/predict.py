@@ -1,54 +1,391 @@
 from typing import Any
 
-from fastapi import APIRouter, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Request, Response
+from fastapi.exceptions import RequestValidationError
+from fastapi.responses import StreamingResponse
+from pydantic import TypeAdapter, ValidationError
+from starlette.types import Receive, Scope, Send
 
-from app.ml.model import predict, get_model
+from app.api.deps import get_current_active_superuser
+from app.core.config import settings
+from app.ml import codecs, streaming
+from app.ml.batching import get_batcher
+from app.ml.cache import get_prediction_cache
+from app.ml.executor import get_inference_executor
+from app.ml.metrics import mark_handled, mark_parsed
+from app.ml.model import (
+    get_model,
+    get_model_status,
+    predict,
+    predict_batch,
+    reload_model,
+)
+from app.ml.server import InferenceServerUnavailable, get_inference_client
 
 router = APIRouter()
 
+_FEATURES = TypeAdapter(list[float])
+_ROWS = TypeAdapter(list[list[float]])
 
-@router.post("/predict")
-def predict_endpoint(data: list[float]) -> dict[str, Any]:
+
+def _request_body(json_schema: dict[str, Any]) -> dict[str, Any]:
+    """OpenAPI request body accepting JSON and the binary formats."""
+    binary = {"schema": {"type": "string", "format": "binary"}}
+    return {
+        "requestBody": {
+            "required": True,
+            "content": {
+                codecs.JSON: {"schema": json_schema},
+                **dict.fromkeys(codecs.BINARY_MEDIA_TYPES, binary),
+            },
+        }
+    }
+
+
+async def _read_features(request: Request, adapter: TypeAdapter[Any]) -> Any:
+    """
+    Decode the request body according to its Content-Type.
+
+    JSON is validated with ``adapter`` straight from the raw bytes, binary
+    formats are decoded into an (N, 5) float32 array without copying.
+    """
+    body = await request.body()
+    content_type = codecs.media_type(request.headers.get("content-type"))
+    if content_type == codecs.JSON:
+        try:
+            return adapter.validate_json(body)
+        except ValidationError as e:
+            raise RequestValidationError(e.errors(include_url=False))
+    try:
+        return codecs.decode_features(body, content_type)
+    except codecs.UnsupportedMediaTypeError as e:
+        raise HTTPException(status_code=415, detail=str(e))
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+
+class _BodyStreamingResponse(StreamingResponse):
+    """
+    Streaming response produced while the request body is still being read.
+
+    ``StreamingResponse`` listens for client disconnects by calling
+    ``receive`` alongside the stream (ASGI < 2.4), which would swallow the
+    request body chunks the stream is consuming. Here only the stream reads
+    from ``receive``, a disconnect surfaces as ``ClientDisconnect`` from
+    ``request.stream()``.
+    """
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        await self.stream_response(send)
+        if self.background is not None:
+            await self.background()
+
+
+def _prediction_response(
+    request: Request, predictions: Any, result: dict[str, Any], lean: bool
+) -> Response:
+    """
+    Encode a prediction result in the format asked for by Accept.
+
+    JSON is encoded directly to bytes, binary formats carry the predictions
+    only, with the other fields in msgpack or ``X-`` headers. ``lean`` drops
+    the timing fields.
+    """
+    response_type = codecs.negotiate(request.headers.get("accept"))
+    if response_type == codecs.JSON:
+        return Response(codecs.encode_json(result, lean), media_type=codecs.JSON)
+    metadata = {
+        key: value
+        for key, value in result.items()
+        if key not in ("prediction", "predictions")
+    }
+    if lean:
+        metadata = codecs.lean_result(metadata)
+    try:
+        content = codecs.encode_predictions(predictions, response_type, metadata)
+    except codecs.UnsupportedMediaTypeError as e:
+        raise HTTPException(status_code=406, detail=str(e))
+    headers = {"X-Model-Version": str(result["model_version"])}
+    if not lean:
+        headers["X-Latency-Ms"] = str(result["latency_ms"])
+        headers["X-Total-Time-Ms"] = str(result["total_time_ms"])
+    return Response(content, media_type=response_type, headers=headers)
+
+
+async def _predict(data: list[float]) -> dict[str, Any]:
+    """Score one row in this worker or on the inference server."""
+    if settings.ML_INFERENCE_MODE == "server":
+        return await get_inference_client().predict(data)
+    if settings.ML_BATCHING_ENABLED:
+        return await get_batcher().predict(data)
+    return await get_inference_executor().run(predict, data)
+
+
+async def _predict_batch(data: Any) -> dict[str, Any]:
+    """Score rows in this worker or on the inference server."""
+    if settings.ML_INFERENCE_MODE == "server":
+        return await get_inference_client().predict_batch(data)
+    return await get_inference_executor().run(predict_batch, data)
+
+
+@router.post(
+    "/predict",
+    response_model=None,
+    openapi_extra=_request_body(_FEATURES.json_schema()),
+)
+async def predict_endpoint(request: Request, lean: bool = False) -> Response:
     """
     Make a prediction using the ML model with latency measurement.
-    
-    Expects exactly 5 float features.
-    
-    Args:
-        data: List of 5 float values
-        
+
+    Expects exactly 5 float features, as a JSON list or one row in a binary
+    format (``application/octet-stream`` raw little-endian float32,
+    ``application/x-npy`` or ``application/msgpack``). An ``Accept`` header
+    with one of these types returns the prediction in that format, with the
+    latency info in ``X-`` headers.
+
+    When ``ML_BATCHING_ENABLED`` is set, concurrent requests are grouped into
+    one vectorized inference call and the response also includes
+    ``queue_wait_ms`` and ``batch_size``. Inference runs on the dedicated
+    inference executor, when its queue is full the request is rejected with
+    ``ML_EXECUTOR_REJECT_STATUS_CODE`` and ``Retry-After``.
+
+    The JSON response is encoded straight to bytes, without response model
+    validation. ``lean=true`` omits the timing fields (``latency_ms``,
+    ``total_time_ms``, ``queue_wait_ms``, ``batch_size``).
+
     Returns:
-        Dictionary containing:
+        JSON object containing:
         - prediction: The model's prediction
         - latency_ms: Inference time in milliseconds
         - total_time_ms: Total request processing time
         - model_format: "ONNX"
         - features_count: Number of input features
-        
+
     Raises:
-        HTTPException: If input validation fails
+        HTTPException: If input validation fails or the format is unsupported
+        InferenceQueueFull: If the inference executor queue is full
     """
+    data = await _read_features(request, _FEATURES)
+    if not isinstance(data, list):
+        if data.shape[0] != 1:
+            raise HTTPException(
+                status_code=400,
+                detail=f"Expected one row, got {data.shape[0]}, use /batch",
+            )
+        data = data[0].tolist()
+    mark_parsed(request.scope)
     try:
-        result = predict(data)
-        return result
+        result = await _predict(data)
     except ValueError as e:
         raise HTTPException(status_code=400, detail=str(e))
+    response = _prediction_response(request, [result["prediction"]], result, lean)
+    mark_handled(request.scope)
+    return response
 
 
-@router.get("/health")
-def health_check() -> dict[str, Any]:
-    """Check if ML model is loaded and healthy."""
+@router.post(
+    "/batch",
+    response_model=None,
+    openapi_extra=_request_body(_ROWS.json_schema()),
+)
+async def predict_batch_endpoint(request: Request, lean: bool = False) -> Response:
+    """
+    Make predictions for many rows in a single vectorized inference call.
+
+    Expects rows of exactly 5 float features, as a JSON list of rows or an
+    (N, 5) matrix in a binary format (``application/octet-stream`` raw
+    little-endian float32, ``application/x-npy`` or ``application/msgpack``).
+    Binary bodies are scored without copying. An ``Accept`` header with one
+    of these types returns the predictions as a float32 vector in that
+    format, with the latency info in ``X-`` headers.
+
+    The JSON response is encoded straight to bytes, without response model
+    validation. ``lean=true`` omits ``latency_ms`` and ``total_time_ms``.
+
+    Returns:
+        JSON object containing:
+        - predictions: List of predictions, in input order
+        - count: Number of rows scored
+        - latency_ms: Inference time in milliseconds for the whole batch
+        - total_time_ms: Total request processing time
+        - model_format: "ONNX"
+        - features_count: Number of input features
+
+    Raises:
+        HTTPException: If input validation fails, the format is unsupported
+            or the batch is too large
+        InferenceQueueFull: If the inference executor queue is full
+    """
+    data = await _read_features(request, _ROWS)
+    mark_parsed(request.scope)
+    if len(data) > settings.ML_PREDICT_BATCH_MAX_ROWS:
+        raise HTTPException(
+            status_code=413,
+            detail=f"Batch too large, maximum is {settings.ML_PREDICT_BATCH_MAX_ROWS} rows",
+        )
     try:
+        result = await _predict_batch(data)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    response = _prediction_response(request, result["predictions"], result, lean)
+    mark_handled(request.scope)
+    return response
+
+
+@router.post(
+    "/stream",
+    response_class=StreamingResponse,
+    openapi_extra={
+        "requestBody": {
+            "required": True,
+            "content": {
+                streaming.NDJSON: {"schema": {"type": "string"}},
+                streaming.CSV: {"schema": {"type": "string"}},
+            },
+        }
+    },
+)
+async def predict_stream_endpoint(
+    request: Request, csv_header: bool = False
+) -> StreamingResponse:
+    """
+    Score an arbitrarily large NDJSON or CSV body, streaming the results.
+
+    Each line holds one row of 5 features: a JSON array
+    (``application/x-ndjson``) or comma-separated numbers (``text/csv``,
+    ``csv_header`` skips the first line). The body is read incrementally and
+    scored in chunks of ``ML_STREAM_CHUNK_ROWS`` rows, memory stays flat
+    whatever the input size.
+
+    The response has the same format as the request, one result per line in
+    input order: ``{"line": n, "prediction": x}`` or ``{"line": n, "error":
+    "..."}`` for NDJSON, ``line,prediction,error`` rows for CSV. Malformed
+    rows are reported inline and do not stop the stream. All rows are scored
+    by the model loaded when the request started, whose version is in the
+    ``X-Model-Version`` header.
+
+    Raises:
+        HTTPException: If the content type is not NDJSON or CSV
+    """
+    content_type = codecs.media_type(request.headers.get("content-type"))
+    if content_type not in streaming.STREAM_MEDIA_TYPES:
+        raise HTTPException(
+            status_code=415,
+            detail=f"Unsupported content type: {content_type}, "
+            f"expected {' or '.join(streaming.STREAM_MEDIA_TYPES)}",
+        )
+    predict_chunk: streaming.PredictChunk
+    if settings.ML_INFERENCE_MODE == "server":
+        client = get_inference_client()
+        await client.connect()
+        predict_chunk, model_version = client.infer, client.model_version
+    else:
         model = get_model()
+        predict_chunk = streaming.executor_predictor(model)
+        model_version = model.version
+    return _BodyStreamingResponse(
+        streaming.score_stream(
+            request.stream(),
+            content_type,
+            predict_chunk,
+            chunk_rows=settings.ML_STREAM_CHUNK_ROWS,
+            max_line_bytes=settings.ML_STREAM_MAX_LINE_BYTES,
+            csv_header=csv_header,
+        ),
+        media_type=content_type,
+        headers={"X-Model-Version": str(model_version)},
+    )
+
+
+async def _inference_server_status() -> dict[str, Any]:
+    """Connection state of the inference server client, connecting if needed."""
+    client = get_inference_client()
+    try:
+        await client.connect()
+    except InferenceServerUnavailable:
+        pass
+    return client.status()
+
+
+@router.get("/health")
+async def health_check() -> dict[str, Any]:
+    """
+    Check if ML model is loaded and healthy, without triggering loading.
+
+    In server mode, reports the connection to the inference server instead.
+    """
+    if settings.ML_INFERENCE_MODE == "server":
+        server_status = await _inference_server_status()
         return {
-            "status": "healthy",
-            "model_loaded": model.session is not None,
-            "model_format": "ONNX",
+            "status": "healthy" if server_status["status"] == "ready" else "unhealthy",
+            "mode": "server",
+            "server": server_status,
         }
-    except Exception as e:
+    model_status = get_model_status()
+    if model_status["status"] != "ready":
         return {
             "status": "unhealthy",
             "model_loaded": False,
-            "error": str(e),
+            "model_status": model_status["status"],
+            "error": model_status["error"],
         }
+    model = get_model()
+    return {
+        "status": "healthy",
+        "model_loaded": model.session is not None,
+        "model_format": "ONNX",
+        "runtime": model.runtime_info(),
+        "cache": get_prediction_cache().stats() if settings.ML_CACHE_ENABLED else None,
+        "executor": get_inference_executor().stats(),
+    }
+
+
+@router.post("/reload", dependencies=[Depends(get_current_active_superuser)])
+def reload(force: bool = False) -> dict[str, Any]:
+    """
+    Hot reload the model from its artifact.
+
+    The new session is built and warmed up before being swapped in, requests
+    in flight finish on the previous one. Unchanged artifacts are skipped
+    unless ``force`` is set. Not available in server mode, where the
+    inference server owns the model: restart it instead.
 
+    Only the worker process handling this call reloads right away. With
+    ``fastapi run --workers N`` the others pick up a changed artifact through
+    their own watcher, within ``ML_MODEL_WATCH_INTERVAL_SECONDS`` (5 s by
+    default); ``force`` applies to this worker only. With the watcher
+    disabled (0), restart the workers to get them all on the new model.
+    """
+    if settings.ML_INFERENCE_MODE == "server":
+        raise HTTPException(
+            status_code=409,
+            detail="The model is served by the inference server, restart it to reload",
+        )
+    try:
+        reloaded = reload_model(force=force)
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Model reload failed: {e}")
+    return {"reloaded": reloaded, "model_version": get_model().version}
+
+
+@router.get("/live")
+def liveness() -> dict[str, Any]:
+    """Liveness probe: the process is up and serving requests."""
+    return {"status": "alive"}
+
+
+@router.get("/ready")
+async def readiness(response: Response) -> dict[str, Any]:
+    """
+    Readiness probe: the model is loaded and warmed up.
+
+    Never triggers loading, returns 503 while the model is still loading. In
+    server mode, returns 503 while the inference server is unreachable.
+    """
+    if settings.ML_INFERENCE_MODE == "server":
+        model_status = await _inference_server_status()
+    else:
+        model_status = get_model_status()
+    if model_status["status"] != "ready":
+        response.status_code = 503
+    return model_status
@@ -4,17 +4,33 @@ Example API usage for the ML prediction endpoint.
 This demonstrates how to integrate the ML model with FastAPI.
 """
 
-from fastapi import FastAPI
-from pydantic import BaseModel, Field
+from typing import Any
 
-from app.ml.model import predict
+from fastapi import FastAPI, HTTPException, Request, Response
+from pydantic import BaseModel, Field
 
+from app.api.api_v1.endpoints.metrics import router as metrics_router
+from app.core.config import settings
+from app.ml import codecs
+from app.ml.cache import get_prediction_cache
+from app.ml.executor import (
+    InferenceQueueFull,
+    get_inference_executor,
+    inference_queue_full_handler,
+)
+from app.ml.lifespan import ml_lifespan
+from app.ml.metrics import StageTimingMiddleware, mark_handled, mark_parsed
+from app.ml.model import get_model, get_model_status, predict, predict_batch
 
 app = FastAPI(
     title="ML Prediction API",
     description="Production ML inference with ONNX and latency measurement",
     version="1.0.0",
+    lifespan=ml_lifespan,
 )
+app.add_exception_handler(InferenceQueueFull, inference_queue_full_handler)
+app.add_middleware(StageTimingMiddleware)
+app.include_router(metrics_router, tags=["Metrics"])
 
 
 class PredictionRequest(BaseModel):
@@ -29,16 +45,31 @@ class PredictionRequest(BaseModel):
     )
 
 
+class BatchPredictionRequest(BaseModel):
+    """Request model for batch predictions."""
+
+    data: list[list[float]] = Field(
+        ...,
+        description="List of rows, each with exactly 5 float features",
+        example=[[0.1, 0.2, 0.3, 0.4, 0.5], [0.5, 0.4, 0.3, 0.2, 0.1]],
+        min_items=1,
+    )
+
+
 class PredictionResponse(BaseModel):
     """Response model for predictions."""
 
     prediction: float = Field(description="The model's prediction")
-    latency_ms: float = Field(description="Model inference latency in milliseconds")
-    total_time_ms: float = Field(
-        description="Total request processing time in milliseconds"
+    latency_ms: float | None = Field(
+        None, description="Model inference latency in milliseconds, not in lean mode"
+    )
+    total_time_ms: float | None = Field(
+        None,
+        description="Total request processing time in milliseconds, not in lean mode",
     )
     model_format: str = Field(description="Model format (ONNX)")
     features_count: int = Field(description="Number of input features")
+    model_version: str = Field(description="Content hash of the serving model")
 
 
 @app.post(
@@ -47,11 +78,14 @@ class PredictionResponse(BaseModel):
     summary="Make a prediction",
     tags=["Predictions"],
 )
-async def predict_endpoint(request: PredictionRequest) -> PredictionResponse:
+async def predict_endpoint(
+    request: PredictionRequest, http_request: Request, lean: bool = False
+) -> Response:
     """
     Make a prediction using the ML model.
 
-    The model expects exactly 5 normalized float features.
+    The model expects exactly 5 normalized float features. The response is
+    encoded straight to JSON bytes, ``lean=true`` omits the timing fields.
 
     **Example:**
     ```bash
@@ -71,8 +105,65 @@ async def predict_endpoint(request: PredictionRequest) -> PredictionResponse:
     }
     ```
     """
-    result = predict(request.data)
-    return PredictionResponse(**result)
+    mark_parsed(http_request.scope)
+    result = await get_inference_executor().run(predict, request.data)
+    mark_handled(http_request.scope)
+    return Response(codecs.encode_json(result, lean), media_type=codecs.JSON)
+
+
+class BatchPredictionResponse(BaseModel):
+    """Response model for batch predictions."""
+
+    predictions: list[float] = Field(description="Predictions, in input order")
+    count: int = Field(description="Number of rows scored")
+    latency_ms: float | None = Field(
+        None,
+        description="Model inference latency for the whole batch in milliseconds, "
+        "not in lean mode",
+    )
+    total_time_ms: float | None = Field(
+        None,
+        description="Total request processing time in milliseconds, not in lean mode",
+    )
+    model_format: str = Field(description="Model format (ONNX)")
+    features_count: int = Field(description="Number of input features")
+    model_version: str = Field(description="Content hash of the serving model")
+
+
+@app.post(
+    "/predict/batch",
+    response_model=BatchPredictionResponse,
+    summary="Make batch predictions",
+    tags=["Predictions"],
+)
+async def predict_batch_endpoint(
+    request: BatchPredictionRequest, http_request: Request, lean: bool = False
+) -> Response:
+    """
+    Make predictions for many rows in a single vectorized inference call.
+
+    The response is encoded straight to JSON bytes, ``lean=true`` omits the
+    timing fields.
+
+    **Example:**
+    ```bash
+    curl -X POST "http://localhost:8000/predict/batch" \\
+        -H "Content-Type: application/json" \\
+        -d '{"data": [[0.1, 0.2, 0.3, 0.4, 0.5], [0.5, 0.4, 0.3, 0.2, 0.1]]}'
+    ```
+    """
+    mark_parsed(http_request.scope)
+    if len(request.data) > settings.ML_PREDICT_BATCH_MAX_ROWS:
+        raise HTTPException(
+            status_code=413,
+            detail=f"Batch too large, maximum is {settings.ML_PREDICT_BATCH_MAX_ROWS} rows",
+        )
+    try:
+        result = await get_inference_executor().run(predict_batch, request.data)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    mark_handled(http_request.scope)
+    return Response(codecs.encode_json(result, lean), media_type=codecs.JSON)
 
 
 @app.get(
@@ -80,34 +171,55 @@ async def predict_endpoint(request: PredictionRequest) -> PredictionResponse:
     summary="Health check",
     tags=["Health"],
 )
-async def health_check():
-    """Check if ML model is loaded and healthy."""
-    from app.ml.model import get_model
-
-    try:
-        model = get_model()
-        return {
-            "status": "healthy",
-            "model_loaded": model.session is not None,
-            "model_format": "ONNX",
-        }
-    except Exception as e:
+async def health_check() -> dict[str, Any]:
+    """Check if ML model is loaded and healthy, without triggering loading."""
+    model_status = get_model_status()
+    if model_status["status"] != "ready":
         return {
             "status": "unhealthy",
             "model_loaded": False,
-            "error": str(e),
+            "model_status": model_status["status"],
+            "error": model_status["error"],
         }
+    model = get_model()
+    return {
+        "status": "healthy",
+        "model_loaded": model.session is not None,
+        "model_format": "ONNX",
+        "runtime": model.runtime_info(),
+        "cache": get_prediction_cache().stats() if settings.ML_CACHE_ENABLED else None,
+        "executor": get_inference_executor().stats(),
+    }
+
+
+@app.get("/live", summary="Liveness probe", tags=["Health"])
+async def liveness() -> dict[str, Any]:
+    """The process is up and serving requests."""
+    return {"status": "alive"}
+
+
+@app.get("/ready", summary="Readiness probe", tags=["Health"])
+async def readiness(response: Response) -> dict[str, Any]:
+    """The model is loaded and warmed up, 503 while still loading."""
+    model_status = get_model_status()
+    if model_status["status"] != "ready":
+        response.status_code = 503
+    return model_status
 
 
 @app.get("/", tags=["Info"])
-async def root():
+async def root() -> dict[str, Any]:
     """API information."""
     return {
         "name": "ML Prediction API",
         "version": "1.0.0",
         "endpoints": {
             "predict": "/predict",
+            "predict_batch": "/predict/batch",
             "health": "/health",
+            "live": "/live",
+            "ready": "/ready",
+            "metrics": "/metrics",
             "docs": "/docs",
         },
     }
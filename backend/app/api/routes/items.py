@@ -2,54 +2,68 @@ import uuid
 from typing import Any
 
 from fastapi import APIRouter, HTTPException
-from sqlmodel import col, func, select
+from sqlmodel import col, delete, select
 
-from app.api.deps import CurrentUser, SessionDep
+from app import async_crud
+from app.api.deps import AsyncSessionDep, CurrentUser
+from app.crud import item_count_update
 from app.models import Item, ItemCreate, ItemPublic, ItemsPublic, ItemUpdate, Message
+from app.pagination import decode_cursor, fetch_page
 
 router = APIRouter(prefix="/items", tags=["items"])
 
 
 @router.get("/", response_model=ItemsPublic)
-def read_items(
-    session: SessionDep, current_user: CurrentUser, skip: int = 0, limit: int = 100
+async def read_items(
+    session: AsyncSessionDep,
+    current_user: CurrentUser,
+    skip: int = 0,
+    limit: int = 100,
+    cursor: str | None = None,
+    include_count: bool | None = None,
+    estimate_count: bool = False,
 ) -> Any:
     """
-    Retrieve items.
+    Retrieve items, newest first.
+
+    Pages by ``skip`` or, faster on deep pages, by the ``next_cursor`` /
+    ``prev_cursor`` of a previous page. The total ``count`` is included by
+    default only without a cursor. For superusers, ``estimate_count`` returns
+    PostgreSQL's estimate of the item table size instead of the exact total.
     """
+    try:
+        page_cursor = decode_cursor(cursor) if cursor else None
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    if include_count is None:
+        include_count = page_cursor is None
+
+    statement = select(Item)
+    count = None
+    if not current_user.is_superuser:
+        statement = statement.where(Item.owner_id == current_user.id)
+        if include_count:
+            # Maintained counter, loaded with the user
+            count = current_user.item_count
+    elif include_count:
+        count = await async_crud.count_items(session=session, estimate=estimate_count)
+    items, next_cursor, prev_cursor = await fetch_page(
+        session, statement, Item, page_cursor, skip, limit
+    )
 
-    if current_user.is_superuser:
-        count_statement = select(func.count()).select_from(Item)
-        count = session.exec(count_statement).one()
-        statement = (
-            select(Item).order_by(col(Item.created_at).desc()).offset(skip).limit(limit)
-        )
-        items = session.exec(statement).all()
-    else:
-        count_statement = (
-            select(func.count())
-            .select_from(Item)
-            .where(Item.owner_id == current_user.id)
-        )
-        count = session.exec(count_statement).one()
-        statement = (
-            select(Item)
-            .where(Item.owner_id == current_user.id)
-            .order_by(col(Item.created_at).desc())
-            .offset(skip)
-            .limit(limit)
-        )
-        items = session.exec(statement).all()
-
-    return ItemsPublic(data=items, count=count)
+    return ItemsPublic(
+        data=items, count=count, next_cursor=next_cursor, prev_cursor=prev_cursor
+    )
 
 
 @router.get("/{id}", response_model=ItemPublic)
-def read_item(session: SessionDep, current_user: CurrentUser, id: uuid.UUID) -> Any:
+async def read_item(
+    session: AsyncSessionDep, current_user: CurrentUser, id: uuid.UUID
+) -> Any:
     """
     Get item by ID.
     """
-    item = session.get(Item, id)
+    item = await session.get(Item, id)
     if not item:
         raise HTTPException(status_code=404, detail="Item not found")
     if not current_user.is_superuser and (item.owner_id != current_user.id):
@@ -58,23 +72,21 @@ def read_item(session: SessionDep, current_user: CurrentUser, id: uuid.UUID) ->
 
 
 @router.post("/", response_model=ItemPublic)
-def create_item(
-    *, session: SessionDep, current_user: CurrentUser, item_in: ItemCreate
+async def create_item(
+    *, session: AsyncSessionDep, current_user: CurrentUser, item_in: ItemCreate
 ) -> Any:
     """
     Create new item.
     """
-    item = Item.model_validate(item_in, update={"owner_id": current_user.id})
-    session.add(item)
-    session.commit()
-    session.refresh(item)
-    return item
+    return await async_crud.create_item(
+        session=session, item_in=item_in, owner_id=current_user.id
+    )
 
 
 @router.put("/{id}", response_model=ItemPublic)
-def update_item(
+async def update_item(
     *,
-    session: SessionDep,
+    session: AsyncSessionDep,
     current_user: CurrentUser,
     id: uuid.UUID,
     item_in: ItemUpdate,
@@ -82,7 +94,7 @@ def update_item(
     """
     Update an item.
     """
-    item = session.get(Item, id)
+    item = await session.get(Item, id)
     if not item:
         raise HTTPException(status_code=404, detail="Item not found")
     if not current_user.is_superuser and (item.owner_id != current_user.id):
@@ -90,23 +102,25 @@ def update_item(
     update_dict = item_in.model_dump(exclude_unset=True)
     item.sqlmodel_update(update_dict)
     session.add(item)
-    session.commit()
-    session.refresh(item)
+    await session.commit()
+    await session.refresh(item)
     return item
 
 
 @router.delete("/{id}")
-def delete_item(
-    session: SessionDep, current_user: CurrentUser, id: uuid.UUID
+async def delete_item(
+    session: AsyncSessionDep, current_user: CurrentUser, id: uuid.UUID
 ) -> Message:
     """
     Delete an item.
     """
-    item = session.get(Item, id)
+    item = await session.get(Item, id)
     if not item:
         raise HTTPException(status_code=404, detail="Item not found")
     if not current_user.is_superuser and (item.owner_id != current_user.id):
         raise HTTPException(status_code=403, detail="Not enough permissions")
-    session.delete(item)
-    session.commit()
+    # By the rows actually deleted: 0 when a concurrent request deleted it first
+    result = await session.exec(delete(Item).where(col(Item.id) == id))
+    await session.exec(item_count_update(item.owner_id, -result.rowcount))
+    await session.commit()
     return Message(message="Item deleted successfully")
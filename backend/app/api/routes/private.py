@@ -1,9 +1,10 @@
+import asyncio
 from typing import Any
 
 from fastapi import APIRouter
 from pydantic import BaseModel
 
-from app.api.deps import SessionDep
+from app.api.deps import AsyncSessionDep
 from app.core.security import get_password_hash
 from app.models import (
     User,
@@ -21,18 +22,19 @@ class PrivateUserCreate(BaseModel):
 
 
 @router.post("/users/", response_model=UserPublic)
-def create_user(user_in: PrivateUserCreate, session: SessionDep) -> Any:
+async def create_user(user_in: PrivateUserCreate, session: AsyncSessionDep) -> Any:
     """
     Create a new user.
     """
 
+    hashed_password = await asyncio.to_thread(get_password_hash, user_in.password)
     user = User(
         email=user_in.email,
         full_name=user_in.full_name,
-        hashed_password=get_password_hash(user_in.password),
+        hashed_password=hashed_password,
     )
 
     session.add(user)
-    session.commit()
+    await session.commit()
 
     return user
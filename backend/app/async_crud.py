@@ -0,0 +1,96 @@
+"""
+Async versions of the ``app.crud`` functions, for the API routes.
+
+Password hashing and verification are CPU-bound (Argon2), they run in a
+worker thread so they do not block the event loop.
+"""
+
+import asyncio
+import uuid
+from typing import Any
+
+from sqlmodel import func, select
+from sqlmodel.ext.asyncio.session import AsyncSession
+
+from app.core.security import get_password_hash, verify_password
+from app.crud import DUMMY_HASH, ITEM_COUNT_ESTIMATE, item_count_update
+from app.models import Item, ItemCreate, User, UserCreate, UserUpdate
+
+
+async def create_user(*, session: AsyncSession, user_create: UserCreate) -> User:
+    hashed_password = await asyncio.to_thread(get_password_hash, user_create.password)
+    db_obj = User.model_validate(
+        user_create, update={"hashed_password": hashed_password}
+    )
+    session.add(db_obj)
+    await session.commit()
+    await session.refresh(db_obj)
+    return db_obj
+
+
+async def update_user(
+    *, session: AsyncSession, db_user: User, user_in: UserUpdate
+) -> Any:
+    user_data = user_in.model_dump(exclude_unset=True)
+    extra_data = {}
+    if "password" in user_data:
+        password = user_data["password"]
+        hashed_password = await asyncio.to_thread(get_password_hash, password)
+        extra_data["hashed_password"] = hashed_password
+    db_user.sqlmodel_update(user_data, update=extra_data)
+    session.add(db_user)
+    await session.commit()
+    await session.refresh(db_user)
+    return db_user
+
+
+async def get_user_by_email(*, session: AsyncSession, email: str) -> User | None:
+    statement = select(User).where(User.email == email)
+    session_user = (await session.exec(statement)).first()
+    return session_user
+
+
+async def authenticate(
+    *, session: AsyncSession, email: str, password: str
+) -> User | None:
+    db_user = await get_user_by_email(session=session, email=email)
+    if not db_user:
+        # Prevent timing attacks by running password verification even when user doesn't exist
+        await asyncio.to_thread(verify_password, password, DUMMY_HASH)
+        return None
+    verified, updated_password_hash = await asyncio.to_thread(
+        verify_password, password, db_user.hashed_password
+    )
+    if not verified:
+        return None
+    if updated_password_hash:
+        db_user.hashed_password = updated_password_hash
+        session.add(db_user)
+        await session.commit()
+        await session.refresh(db_user)
+    return db_user
+
+
+async def create_item(
+    *, session: AsyncSession, item_in: ItemCreate, owner_id: uuid.UUID
+) -> Item:
+    db_item = Item.model_validate(item_in, update={"owner_id": owner_id})
+    session.add(db_item)
+    await session.exec(item_count_update(owner_id, 1))
+    await session.commit()
+    await session.refresh(db_item)
+    return db_item
+
+
+async def count_items(*, session: AsyncSession, estimate: bool = False) -> int:
+    """
+    Total number of items, summed from the per-user counters, or estimated
+    from the table statistics (exact until the table is first analyzed).
+    """
+    if estimate:
+        estimated: int = await session.scalar(ITEM_COUNT_ESTIMATE)
+        if estimated > 0:
+            return estimated
+    statement = select(func.coalesce(func.sum(User.item_count), 0))
+    count: int = (await session.exec(statement)).one()
+    return count
@@ -1,3 +1,4 @@
+import json
 import secrets
 import warnings
 from typing import Annotated, Any, Literal
@@ -11,7 +12,7 @@ from pydantic import (
     computed_field,
     model_validator,
 )
-from pydantic_settings import BaseSettings, SettingsConfigDict
+from pydantic_settings import BaseSettings, NoDecode, SettingsConfigDict
 from typing_extensions import Self
 
 
@@ -23,6 +24,17 @@ def parse_cors(v: Any) -> list[str] | str:
     raise ValueError(v)
 
 
+def parse_int_list(v: Any) -> Any:
+    """Parse ``8``, ``1,32`` or a JSON list ``[1, 32]`` into a list of ints."""
+    if isinstance(v, int):
+        return [v]
+    if isinstance(v, str):
+        if v.strip().startswith("["):
+            return json.loads(v)
+        return [i.strip() for i in v.split(",") if i.strip()]
+    return v
+
+
 class Settings(BaseSettings):
     model_config = SettingsConfigDict(
         # Use top level .env file (one level above ./backend/)
@@ -55,6 +67,16 @@ class Settings(BaseSettings):
     POSTGRES_USER: str
     POSTGRES_PASSWORD: str = ""
     POSTGRES_DB: str = ""
+    # Connection pool of each engine, per worker process. Checkouts waiting
+    # longer than POSTGRES_POOL_TIMEOUT seconds fail with a 503; connections
+    # are replaced after POSTGRES_POOL_RECYCLE seconds (-1 to keep them) and
+    # tested before use with POSTGRES_POOL_PRE_PING
+    POSTGRES_POOL_SIZE: int = 5
+    POSTGRES_MAX_OVERFLOW: int = 10
+    POSTGRES_POOL_TIMEOUT: float = 2.0
+    POSTGRES_POOL_RECYCLE: int = 1800
+    POSTGRES_POOL_PRE_PING: bool = True
+    POSTGRES_POOL_RETRY_AFTER_SECONDS: int = 1
 
     @computed_field  # type: ignore[prop-decorator]
     @property
@@ -94,6 +116,93 @@ class Settings(BaseSettings):
     FIRST_SUPERUSER: EmailStr
     FIRST_SUPERUSER_PASSWORD: str
 
+    # Micro-batching of concurrent /predict requests
+    ML_BATCHING_ENABLED: bool = False
+    ML_BATCH_MAX_SIZE: int = 32
+    ML_BATCH_WINDOW_MS: float = 2.0
+    # Requests waiting for a batch; when full, /predict is rejected like a
+    # full executor queue (ML_EXECUTOR_REJECT_STATUS_CODE)
+    ML_BATCH_MAX_QUEUE: int = 256
+    # Maximum number of rows accepted by /predict/batch
+    ML_PREDICT_BATCH_MAX_ROWS: int = 100_000
+    # Streaming scoring (/predict/stream): rows per inference call, and the
+    # longest accepted input line
+    ML_STREAM_CHUNK_ROWS: int = 1024
+    ML_STREAM_MAX_LINE_BYTES: int = 65536
+
+    # Dedicated inference thread pool, separate from AnyIO's default pool used
+    # by sync endpoints. Requests beyond the workers wait in a bounded queue,
+    # when it is full they are rejected with ML_EXECUTOR_REJECT_STATUS_CODE
+    # and a Retry-After header.
+    ML_EXECUTOR_WORKERS: int = 4
+    ML_EXECUTOR_MAX_QUEUE: int = 64
+    ML_EXECUTOR_REJECT_STATUS_CODE: Literal[429, 503] = 503
+    ML_EXECUTOR_RETRY_AFTER_SECONDS: int = 1
+
+    # "server" sends inference to a shared inference process (started with
+    # scripts/inference_server.py) over a Unix socket and shared memory, see
+    # app/ml/server.py; "local" runs it in each web worker
+    ML_INFERENCE_MODE: Literal["local", "server"] = "local"
+    # Created with mode 0600, web workers must run as the server's user
+    ML_INFERENCE_SOCKET: str = "/tmp/ml-inference.sock"
+    # Client side: concurrent requests in flight per web worker, rows per slot
+    ML_SERVER_SLOTS: int = 64
+    ML_SERVER_SLOT_ROWS: int = 1024
+    # Server side: batching across workers and concurrent inference calls
+    ML_SERVER_MAX_BATCH_ROWS: int = 8192
+    ML_SERVER_BATCH_WINDOW_MS: float = 0
+    ML_SERVER_WORKERS: int = 1
+    # Requests waiting for a batch on the server, further ones are rejected
+    # like a full ML_EXECUTOR_MAX_QUEUE
+    ML_SERVER_MAX_QUEUE: int = 1024
+
+    # Per-stage latency histograms of the inference path, served on /metrics
+    ML_METRICS_ENABLED: bool = True
+
+    # ONNX Runtime session, 0 threads means let ONNX Runtime decide
+    ML_ORT_INTRA_OP_NUM_THREADS: int = 0
+    ML_ORT_INTER_OP_NUM_THREADS: int = 0
+    ML_ORT_EXECUTION_MODE: Literal["sequential", "parallel"] = "sequential"
+    ML_ORT_GRAPH_OPTIMIZATION_LEVEL: Literal["disable", "basic", "extended", "all"] = (
+        "all"
+    )
+    ML_ORT_ENABLE_CPU_MEM_ARENA: bool = True
+    ML_ORT_ENABLE_MEM_PATTERN: bool = True
+    ONNXRUNTIME_EXECUTION_PROVIDERS: Annotated[
+        list[str] | str, BeforeValidator(parse_cors)
+    ] = ["CPUExecutionProvider"]
+    # Load model.ort / model.optimized.onnx (see save_optimized_model) if present
+    ML_ORT_USE_OPTIMIZED_MODEL: bool = True
+    ML_ORT_OPTIMIZED_MODEL_FORMAT: Literal["ort", "onnx"] = "ort"
+    # "numpy" evaluates the tree ensemble with vectorized NumPy instead of
+    # ONNX Runtime, see app/ml/forest.py
+    ML_INFERENCE_ENGINE: Literal["onnx", "numpy"] = "onnx"
+    # Serve a variant built by scripts/build_model_variants.py
+    # (model.<variant>.onnx), empty serves the full model
+    ML_MODEL_VARIANT: str = ""
+    # Variants whose held-out RMSE exceeds the full model's by more than this
+    # fraction are not emitted
+    ML_VARIANT_MAX_RMSE_INCREASE: float = 0.05
+
+    # Prediction result cache, quantization 0 keys on the exact float32 bytes
+    ML_CACHE_ENABLED: bool = False
+    ML_CACHE_MAX_ENTRIES: int = 10_000
+    ML_CACHE_MAX_BYTES: int = 16 * 1024 * 1024
+    ML_CACHE_TTL_SECONDS: float = 0
+    ML_CACHE_QUANTIZATION: float = 0
+
+    # Load and warm up the model in the application lifespan
+    ML_PRELOAD_MODEL: bool = True
+    ML_WARMUP_ITERATIONS: int = 3
+    # Comma-separated, e.g. 1,32 (NoDecode: parsed by parse_int_list, not as JSON)
+    ML_WARMUP_BATCH_SIZES: Annotated[
+        list[int], NoDecode, BeforeValidator(parse_int_list)
+    ] = [1, 32]
+    # Poll model.onnx and hot reload it when it changes, 0 disables watching.
+    # This is how every worker of a multi-worker deployment picks up a new
+    # artifact, POST /predict/reload only reloads the worker it reaches
+    ML_MODEL_WATCH_INTERVAL_SECONDS: float = 5
+
     def _check_default_secret(self, var_name: str, value: str | None) -> None:
         if value == "changethis":
             message = (
@@ -1,10 +1,24 @@
+from sqlalchemy.ext.asyncio import create_async_engine
 from sqlmodel import Session, create_engine, select
 
 from app import crud
 from app.core.config import settings
+from app.core.pool import (
+    async_pool_metrics,
+    engine_options,
+    sync_pool_metrics,
+    watch_pool,
+)
 from app.models import User, UserCreate
 
-engine = create_engine(str(settings.SQLALCHEMY_DATABASE_URI))
+# Sync engine, for Alembic, scripts and init_db
+engine = create_engine(str(settings.SQLALCHEMY_DATABASE_URI), **engine_options())
+# Async engine for the API routes, psycopg 3 runs in async mode on the same URL
+async_engine = create_async_engine(
+    str(settings.SQLALCHEMY_DATABASE_URI), **engine_options(is_async=True)
+)
+watch_pool(engine.pool, sync_pool_metrics)
+watch_pool(async_engine.pool, async_pool_metrics)
 
 
 # make sure all SQLModel models are imported (app.models) before initializing DB
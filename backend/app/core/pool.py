@@ -0,0 +1,144 @@
+"""
+Database connection pool options and metrics.
+
+Both engines use a ``QueuePool`` subclass that times every checkout (waiting
+for a free connection, opening a new one, pre-ping) into a latency histogram
+and counts checkouts that hit ``POSTGRES_POOL_TIMEOUT``. Connections in use
+are tracked with the pool's ``checkout`` / ``checkin`` events. Everything is
+per process and served on ``/metrics``.
+
+A checkout timeout (pool exhausted) is turned into a 503 with
+``Retry-After`` instead of a 500.
+"""
+
+import threading
+import time
+from typing import Any, cast
+
+from fastapi import Request
+from fastapi.responses import JSONResponse
+from sqlalchemy import event
+from sqlalchemy import exc as sa_exc
+from sqlalchemy.pool import (
+    AsyncAdaptedQueuePool,
+    Pool,
+    PoolProxiedConnection,
+    QueuePool,
+)
+
+from app.core.config import settings
+from app.ml.metrics import LatencyHistogram, render_gauges, render_summary
+
+
+class PoolMetrics:
+    """Checkout wait times and connections in use of one engine's pool."""
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self.wait = LatencyHistogram()
+        self.in_use = 0
+        self.checkouts = 0
+        self.timeouts = 0
+
+    def record_wait(self, duration_ns: int, timed_out: bool) -> None:
+        self.wait.record(duration_ns)
+        if timed_out:
+            with self._lock:
+                self.timeouts += 1
+
+    def on_checkout(self, *args: Any) -> None:  # noqa: ARG002
+        with self._lock:
+            self.in_use += 1
+            self.checkouts += 1
+
+    def on_checkin(self, *args: Any) -> None:  # noqa: ARG002
+        with self._lock:
+            self.in_use -= 1
+
+
+def timed_pool_class(base: type[QueuePool], metrics: PoolMetrics) -> type[QueuePool]:
+    """Subclass ``base`` to time checkouts into ``metrics``."""
+
+    class TimedPool(base):  # type: ignore[valid-type, misc]
+        def connect(self) -> PoolProxiedConnection:
+            start = time.perf_counter_ns()
+            timed_out = False
+            try:
+                return cast(PoolProxiedConnection, super().connect())
+            except sa_exc.TimeoutError:
+                timed_out = True
+                raise
+            finally:
+                metrics.record_wait(time.perf_counter_ns() - start, timed_out)
+
+    return TimedPool
+
+
+def watch_pool(pool: Pool, metrics: PoolMetrics) -> None:
+    """
+    Count connections in use of ``pool`` into ``metrics``.
+
+    The listeners are kept by the pools replacing it on ``engine.dispose()``.
+    """
+    event.listen(pool, "checkout", metrics.on_checkout)
+    event.listen(pool, "checkin", metrics.on_checkin)
+
+
+sync_pool_metrics = PoolMetrics()
+async_pool_metrics = PoolMetrics()
+
+
+def engine_options(is_async: bool = False) -> dict[str, Any]:
+    """``create_engine`` / ``create_async_engine`` pool arguments from settings."""
+    if is_async:
+        poolclass = timed_pool_class(AsyncAdaptedQueuePool, async_pool_metrics)
+    else:
+        poolclass = timed_pool_class(QueuePool, sync_pool_metrics)
+    return {
+        "poolclass": poolclass,
+        "pool_size": settings.POSTGRES_POOL_SIZE,
+        "max_overflow": settings.POSTGRES_MAX_OVERFLOW,
+        "pool_timeout": settings.POSTGRES_POOL_TIMEOUT,
+        "pool_recycle": settings.POSTGRES_POOL_RECYCLE,
+        "pool_pre_ping": settings.POSTGRES_POOL_PRE_PING,
+    }
+
+
+def render_pool_metrics(pools: dict[str, tuple[Pool, PoolMetrics]]) -> str:
+    """
+    Render checkout wait times and pool gauges in the Prometheus text format.
+
+    Args:
+        pools: Engine name (``sync`` / ``async``) to its pool and metrics
+    """
+    output = render_summary(
+        "db_pool_checkout_wait_seconds",
+        "Time to get a connection from the pool.",
+        "engine",
+        {name: metrics.wait for name, (_, metrics) in pools.items()},
+    )
+    for name, (pool, metrics) in pools.items():
+        output += render_gauges(
+            f"db_pool_{name}",
+            {
+                "size": pool.size(),  # type: ignore[attr-defined]
+                "max_overflow": settings.POSTGRES_MAX_OVERFLOW,
+                "in_use": metrics.in_use,
+                "checkouts": metrics.checkouts,
+                "timeouts": metrics.timeouts,
+            },
+            counters=("checkouts", "timeouts"),
+        )
+    return output
+
+
+async def pool_timeout_handler(
+    request: Request,  # noqa: ARG001
+    exc: Exception,  # noqa: ARG001
+) -> JSONResponse:
+    """Turn a pool checkout timeout into a 503 with ``Retry-After``."""
+    return JSONResponse(
+        status_code=503,
+        content={"detail": "Database connection pool exhausted, retry later"},
+        headers={"Retry-After": str(settings.POSTGRES_POOL_RETRY_AFTER_SECONDS)},
+    )
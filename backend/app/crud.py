@@ -1,7 +1,8 @@
 import uuid
 from typing import Any
 
-from sqlmodel import Session, select
+from sqlalchemy import Update, text, update
+from sqlmodel import Session, col, func, select
 
 from app.core.security import get_password_hash, verify_password
 from app.models import Item, ItemCreate, User, UserCreate, UserUpdate
@@ -60,9 +61,70 @@ def authenticate(*, session: Session, email: str, password: str) -> User | None:
     return db_user
 
 
+def item_count_update(owner_id: uuid.UUID, delta: int) -> Update:
+    """
+    Move the owner's ``item_count`` by ``delta``, to execute in the
+    transaction inserting or deleting the items.
+    """
+    return (
+        update(User)
+        .where(col(User.id) == owner_id)
+        .values(item_count=col(User.item_count) + delta)
+    )
+
+
 def create_item(*, session: Session, item_in: ItemCreate, owner_id: uuid.UUID) -> Item:
     db_item = Item.model_validate(item_in, update={"owner_id": owner_id})
     session.add(db_item)
+    session.exec(item_count_update(owner_id, 1))
     session.commit()
     session.refresh(db_item)
     return db_item
+
+
+# Estimated rows of the item table, maintained by VACUUM / ANALYZE; -1 (or 0
+# on older PostgreSQL) until the table is first analyzed
+ITEM_COUNT_ESTIMATE = text(
+    "SELECT reltuples::bigint FROM pg_class WHERE oid = 'public.item'::regclass"
+)
+
+
+def check_item_counts(*, session: Session) -> list[tuple[uuid.UUID, int, int]]:
+    """
+    Find users whose ``item_count`` does not match their items.
+
+    Returns:
+        (user id, stored count, actual count) for each mismatch
+    """
+    actual = func.count(col(Item.id))
+    statement = (
+        select(User.id, User.item_count, actual)
+        .outerjoin(Item, col(Item.owner_id) == col(User.id))
+        .group_by(col(User.id))
+        .having(col(User.item_count) != actual)
+    )
+    return [tuple(row) for row in session.exec(statement).all()]  # type: ignore[misc]
+
+
+def repair_item_counts(*, session: Session) -> int:
+    """
+    Recount the items of users with a wrong ``item_count``.
+
+    Each user row is locked before counting, so item inserts and deletes
+    running meanwhile (which update the same row) are either counted or
+    applied after the repair.
+
+    Returns:
+        The number of users repaired
+    """
+    mismatches = check_item_counts(session=session)
+    for user_id, _, _ in mismatches:
+        session.exec(select(User.id).where(col(User.id) == user_id).with_for_update())
+        count = session.exec(
+            select(func.count()).select_from(Item).where(Item.owner_id == user_id)
+        ).one()
+        session.exec(
+            update(User).where(col(User.id) == user_id).values(item_count=count)
+        )
+        session.commit()
+    return len(mismatches)
@@ -1,16 +1,39 @@
+from collections.abc import AsyncIterator
+from contextlib import asynccontextmanager
+
 import sentry_sdk
 from fastapi import FastAPI
 from fastapi.routing import APIRoute
+from sqlalchemy.exc import TimeoutError as PoolTimeoutError
 from starlette.middleware.cors import CORSMiddleware
 
+from app.api.api_v1.endpoints.metrics import router as metrics_router
+from app.api.api_v1.main import api_router as ml_router
 from app.api.main import api_router
 from app.core.config import settings
+from app.core.db import async_engine
+from app.core.pool import pool_timeout_handler
+from app.ml.executor import InferenceQueueFull, inference_queue_full_handler
+from app.ml.lifespan import ml_lifespan
+from app.ml.metrics import StageTimingMiddleware
+from app.ml.server import (
+    InferenceServerUnavailable,
+    inference_server_unavailable_handler,
+)
 
 
 def custom_generate_unique_id(route: APIRoute) -> str:
     return f"{route.tags[0]}-{route.name}"
 
 
+@asynccontextmanager
+async def lifespan(app: FastAPI) -> AsyncIterator[None]:
+    async with ml_lifespan(app):
+        yield
+    # Pooled connections are bound to this event loop
+    await async_engine.dispose()
+
+
 if settings.SENTRY_DSN and settings.ENVIRONMENT != "local":
     sentry_sdk.init(dsn=str(settings.SENTRY_DSN), enable_tracing=True)
 
@@ -18,6 +41,12 @@ app = FastAPI(
     title=settings.PROJECT_NAME,
     openapi_url=f"{settings.API_V1_STR}/openapi.json",
     generate_unique_id_function=custom_generate_unique_id,
+    lifespan=lifespan,
+)
+app.add_exception_handler(InferenceQueueFull, inference_queue_full_handler)
+app.add_exception_handler(PoolTimeoutError, pool_timeout_handler)
+app.add_exception_handler(
+    InferenceServerUnavailable, inference_server_unavailable_handler
 )
 
 # Set all CORS enabled origins
@@ -31,3 +60,9 @@ if settings.all_cors_origins:
     )
 
 app.include_router(api_router, prefix=settings.API_V1_STR)
+app.include_router(ml_router, prefix=settings.API_V1_STR)
+# Prometheus scrapes /metrics at the root
+app.include_router(metrics_router, tags=["metrics"])
+
+# Outermost, so the parse and serialization stages cover the whole app
+app.add_middleware(StageTimingMiddleware)
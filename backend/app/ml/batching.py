@@ -0,0 +1,185 @@
+import asyncio
+import time
+from dataclasses import dataclass, field
+from typing import Any
+
+import numpy as np
+
+from app.core.config import settings
+from app.ml.executor import InferenceQueueFull, get_inference_executor
+from app.ml.model import MLModel, get_model
+
+
+@dataclass
+class _PendingRequest:
+    """A single-row request waiting to be scored as part of a batch."""
+
+    features: list[float]
+    future: asyncio.Future[dict[str, Any]]
+    enqueued_at: float = field(default_factory=time.perf_counter)
+
+
+class MicroBatcher:
+    """
+    Collect concurrent single-row predictions into one vectorized call.
+
+    Requests are queued and a background task drains the queue, waiting up to
+    ``window_ms`` after the first request (or until ``max_batch_size`` rows are
+    collected) before running one scaler + ``session.run`` on the stacked
+    array. Each batch is scored in its own task on the inference executor, so
+    the next batch is collected meanwhile and up to one batch per executor
+    worker runs at once; a full executor queue fails the whole batch with
+    ``InferenceQueueFull``. At most ``max_queue`` requests wait for a batch,
+    further ones are rejected with ``InferenceQueueFull`` right away.
+
+    Without an explicit ``model`` the current ``get_model()`` is used for each
+    batch, so hot reloads are picked up.
+    """
+
+    def __init__(
+        self,
+        model: MLModel | None = None,
+        max_batch_size: int = 32,
+        window_ms: float = 2.0,
+        max_queue: int = 256,
+        retry_after: int = 1,
+    ):
+        if max_batch_size < 1:
+            raise ValueError("max_batch_size must be at least 1")
+        if window_ms < 0:
+            raise ValueError("window_ms must be non-negative")
+        if max_queue < 1:
+            raise ValueError("max_queue must be at least 1")
+        self.model = model
+        self.max_batch_size = max_batch_size
+        self.window_ms = window_ms
+        self.max_queue = max_queue
+        self.retry_after = retry_after
+        self.rejected = 0
+        self._queue: asyncio.Queue[_PendingRequest] | None = None
+        self._worker: asyncio.Task[None] | None = None
+        self._loop: asyncio.AbstractEventLoop | None = None
+        # Batches being scored, referenced until done
+        self._batches: set[asyncio.Task[None]] = set()
+
+    def _ensure_worker(self) -> asyncio.Queue[_PendingRequest]:
+        """Start the batching task on the running loop if needed."""
+        loop = asyncio.get_running_loop()
+        if self._loop is not loop or self._worker is None or self._worker.done():
+            self._loop = loop
+            self._queue = asyncio.Queue(maxsize=self.max_queue)
+            self._worker = loop.create_task(self._run())
+        assert self._queue is not None
+        return self._queue
+
+    async def predict(self, data: list[float]) -> dict[str, Any]:
+        """
+        Queue a prediction and wait for the batch containing it.
+
+        Args:
+            data: List of 5 float values
+
+        Returns:
+            Dictionary with prediction, latency info and batching stats
+
+        Raises:
+            InferenceQueueFull: If ``max_queue`` requests are already waiting
+        """
+        if len(data) != 5:
+            raise ValueError(f"Expected 5 features, got {len(data)}")
+
+        queue = self._ensure_worker()
+        request = _PendingRequest(
+            features=data, future=asyncio.get_running_loop().create_future()
+        )
+        try:
+            queue.put_nowait(request)
+        except asyncio.QueueFull:
+            self.rejected += 1
+            raise InferenceQueueFull(self.retry_after) from None
+        return await request.future
+
+    async def _collect(
+        self, queue: asyncio.Queue[_PendingRequest]
+    ) -> list[_PendingRequest]:
+        """Wait for one request, then gather more until the window closes."""
+        batch = [await queue.get()]
+        deadline = time.perf_counter() + self.window_ms / 1000
+        while len(batch) < self.max_batch_size:
+            # Drain whatever is already queued without yielding
+            while len(batch) < self.max_batch_size and not queue.empty():
+                batch.append(queue.get_nowait())
+            remaining = deadline - time.perf_counter()
+            if len(batch) >= self.max_batch_size or remaining <= 0:
+                break
+            try:
+                batch.append(await asyncio.wait_for(queue.get(), remaining))
+            except asyncio.TimeoutError:
+                break
+        return batch
+
+    async def _run(self) -> None:
+        """Background loop: collect batches and dispatch them for scoring."""
+        assert self._queue is not None
+        queue = self._queue
+        # One batch in flight per executor worker, more would only queue up
+        # in the executor; meanwhile requests wait here for the next batch
+        in_flight = asyncio.Semaphore(get_inference_executor().max_workers)
+        while True:
+            await in_flight.acquire()
+            batch = await self._collect(queue)
+            task = asyncio.create_task(self._score(batch))
+            self._batches.add(task)
+            task.add_done_callback(self._batches.discard)
+            task.add_done_callback(lambda _: in_flight.release())
+
+    async def _score(self, batch: list[_PendingRequest]) -> None:
+        """Run one batch on the inference executor and fan out results."""
+        batch_start = time.perf_counter()
+        X = np.array([r.features for r in batch], dtype=np.float32)
+        # Resolved per batch so hot reloads are picked up
+        model = self.model or get_model()
+        try:
+            predictions = await get_inference_executor().run(model._infer, X)
+        except Exception as e:
+            for request in batch:
+                if not request.future.done():
+                    request.future.set_exception(e)
+            return
+        batch_end = time.perf_counter()
+        inference_time = (batch_end - batch_start) * 1000  # ms
+
+        for request, prediction in zip(batch, predictions, strict=True):
+            if request.future.done():
+                # Caller went away (e.g. client disconnect)
+                continue
+            request.future.set_result(
+                {
+                    "prediction": float(prediction),
+                    "latency_ms": round(inference_time, 4),
+                    "queue_wait_ms": round(
+                        (batch_start - request.enqueued_at) * 1000, 4
+                    ),
+                    "total_time_ms": round((batch_end - request.enqueued_at) * 1000, 4),
+                    "batch_size": len(batch),
+                    "model_format": "ONNX",
+                    "features_count": 5,
+                    "model_version": model.version,
+                }
+            )
+
+
+_batcher_instance = None
+
+
+def get_batcher() -> MicroBatcher:
+    """Get or create the micro-batcher (singleton)."""
+    global _batcher_instance
+    if _batcher_instance is None:
+        _batcher_instance = MicroBatcher(
+            max_batch_size=settings.ML_BATCH_MAX_SIZE,
+            window_ms=settings.ML_BATCH_WINDOW_MS,
+            max_queue=settings.ML_BATCH_MAX_QUEUE,
+            retry_after=settings.ML_EXECUTOR_RETRY_AFTER_SECONDS,
+        )
+    return _batcher_instance
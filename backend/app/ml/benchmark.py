@@ -0,0 +1,421 @@
+"""
+In-process benchmark suite for ``MLModel``.
+
+Measures cold start (model load and first inference) and warm latency
+percentiles and throughput for every combination of batch size, caller
+threads and ONNX Runtime intra-op threads. Results are plain JSON so they
+can be saved as a baseline and compared against on model or runtime
+upgrades, see ``scripts/benchmark_ml_model.py``.
+
+``compare_serving_modes`` compares in-worker inference with the shared
+inference server (``ML_INFERENCE_MODE``) across several web worker
+processes, see ``scripts/benchmark_inference_server.py``.
+"""
+
+import asyncio
+import multiprocessing
+import os
+import platform
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from collections.abc import Iterator
+from contextlib import contextmanager
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any
+
+import numpy as np
+import onnxruntime as ort
+
+from app.core.config import settings
+from app.ml.executor import InferenceExecutor
+from app.ml.model import MLModel
+
+PERCENTILES = {"p50": 50, "p90": 90, "p99": 99, "p999": 99.9}
+
+# Cap on the rows scored per thread and case, keeps large batches short
+MAX_ROWS_PER_THREAD = 1_000_000
+
+
+@contextmanager
+def _intra_op_threads(threads: int) -> Iterator[None]:
+    """Temporarily override the ONNX Runtime intra-op thread setting."""
+    previous = settings.ML_ORT_INTRA_OP_NUM_THREADS
+    settings.ML_ORT_INTRA_OP_NUM_THREADS = threads
+    try:
+        yield
+    finally:
+        settings.ML_ORT_INTRA_OP_NUM_THREADS = previous
+
+
+def _percentiles(samples_ms: np.ndarray[Any, Any]) -> dict[str, float]:
+    values = np.percentile(samples_ms, list(PERCENTILES.values()))
+    return {
+        label: round(float(value), 4)
+        for label, value in zip(PERCENTILES, values, strict=True)
+    }
+
+
+def _call(model: MLModel, X: np.ndarray[Any, Any]) -> None:
+    """One inference the way serving does it (fast path for single rows)."""
+    if X.shape[0] == 1:
+        model._infer_one(X[0].tolist())
+    else:
+        model._infer(X)
+
+
+def measure_cold(
+    model_path: Path | None, batch_sizes: list[int], intra_op_threads: int
+) -> dict[str, Any]:
+    """
+    Load a fresh model and time its first inference at each batch size.
+
+    Args:
+        model_path: Model to load, the default model if None
+        batch_sizes: Batch sizes of the first inferences
+        intra_op_threads: ONNX Runtime intra-op threads
+
+    Returns:
+        Dictionary with load_ms and first_call_ms per batch size
+    """
+    with _intra_op_threads(intra_op_threads):
+        start = time.perf_counter()
+        model = MLModel(model_path=model_path)
+        load_ms = (time.perf_counter() - start) * 1000
+
+    rng = np.random.default_rng(0)
+    first_call_ms = {}
+    for batch_size in batch_sizes:
+        X = rng.standard_normal((batch_size, 5)).astype(np.float32)
+        start = time.perf_counter()
+        _call(model, X)
+        first_call_ms[str(batch_size)] = round((time.perf_counter() - start) * 1000, 4)
+    return {"load_ms": round(load_ms, 4), "first_call_ms": first_call_ms}
+
+
+def measure_warm(
+    model: MLModel,
+    batch_size: int,
+    threads: int,
+    iterations: int,
+    warmup_iterations: int = 10,
+) -> dict[str, Any]:
+    """
+    Time inferences at one batch size from ``threads`` concurrent callers.
+
+    Args:
+        model: Model to benchmark, warmed up first
+        batch_size: Rows per inference
+        threads: Concurrent callers
+        iterations: Inferences per caller
+        warmup_iterations: Untimed inferences per caller before measuring
+
+    Returns:
+        Dictionary with the case, throughput in rows/s and call latency
+        percentiles in ms
+    """
+    iterations = max(1, min(iterations, MAX_ROWS_PER_THREAD // batch_size))
+    X = np.random.default_rng(0).standard_normal((batch_size, 5)).astype(np.float32)
+    samples = np.empty((threads, iterations))
+    barrier = threading.Barrier(threads + 1)
+
+    def caller(index: int) -> None:
+        for _ in range(warmup_iterations):
+            _call(model, X)
+        barrier.wait()
+        for i in range(iterations):
+            start = time.perf_counter()
+            _call(model, X)
+            samples[index, i] = (time.perf_counter() - start) * 1000
+
+    workers = [
+        threading.Thread(target=caller, args=(i,), daemon=True) for i in range(threads)
+    ]
+    for worker in workers:
+        worker.start()
+    barrier.wait()
+    start = time.perf_counter()
+    for worker in workers:
+        worker.join()
+    elapsed = time.perf_counter() - start
+
+    return {
+        "batch_size": batch_size,
+        "threads": threads,
+        "iterations": iterations,
+        "throughput_rows_per_s": round(threads * iterations * batch_size / elapsed, 1),
+        **_percentiles(samples.ravel()),
+    }
+
+
+def run_benchmark(
+    batch_sizes: list[int],
+    threads: list[int],
+    intra_op_threads: list[int],
+    iterations: int = 200,
+    model_path: Path | None = None,
+) -> dict[str, Any]:
+    """
+    Run the cold and warm benchmarks over every combination of settings.
+
+    Args:
+        batch_sizes: Rows per inference
+        threads: Concurrent caller counts
+        intra_op_threads: ONNX Runtime intra-op thread counts (0 = default)
+        iterations: Timed inferences per caller and case
+        model_path: Model to benchmark, the default model if None
+
+    Returns:
+        JSON-serializable results with environment metadata
+    """
+    results: dict[str, Any] = {
+        "metadata": {
+            "created_at": datetime.now(timezone.utc).isoformat(),
+            "python": platform.python_version(),
+            "numpy": np.__version__,
+            "onnxruntime": ort.__version__,
+            "cpu_count": os.cpu_count(),
+            "engine": settings.ML_INFERENCE_ENGINE,
+            "iterations": iterations,
+        },
+        "cold": {},
+        "warm": [],
+    }
+    for intra_op in intra_op_threads:
+        results["cold"][str(intra_op)] = measure_cold(model_path, batch_sizes, intra_op)
+        with _intra_op_threads(intra_op):
+            model = MLModel(model_path=model_path)
+        results["metadata"]["model_version"] = model.version
+        for thread_count in threads:
+            for batch_size in batch_sizes:
+                case = measure_warm(model, batch_size, thread_count, iterations)
+                results["warm"].append({"intra_op_threads": intra_op, **case})
+    return results
+
+
+def _case_key(case: dict[str, Any]) -> tuple[int, int, int]:
+    return case["intra_op_threads"], case["threads"], case["batch_size"]
+
+
+def compare_results(
+    current: dict[str, Any], baseline: dict[str, Any], threshold: float
+) -> list[dict[str, Any]]:
+    """
+    Find regressions of ``current`` against ``baseline``.
+
+    Warm cases are matched on (intra-op threads, threads, batch size); a case
+    regresses when its p50 or p99 latency grows, or its throughput drops, by
+    more than ``threshold`` (a fraction). Cold load time is compared the same
+    way. Cases missing from either side are ignored.
+
+    Returns:
+        One entry per regressed metric, empty if none
+    """
+    regressions = []
+
+    def check(
+        case: str, metric: str, before: float, after: float, higher_is_better: bool
+    ) -> None:
+        if not before:
+            return
+        change = (after - before) / before
+        if (-change if higher_is_better else change) > threshold:
+            regressions.append(
+                {
+                    "case": case,
+                    "metric": metric,
+                    "baseline": before,
+                    "current": after,
+                    "change": round(change, 4),
+                }
+            )
+
+    baseline_cases = {_case_key(case): case for case in baseline.get("warm", [])}
+    for case in current.get("warm", []):
+        before = baseline_cases.get(_case_key(case))
+        if before is None:
+            continue
+        name = "intra_op={}/threads={}/batch={}".format(*_case_key(case))
+        check(name, "p50", before["p50"], case["p50"], False)
+        check(name, "p99", before["p99"], case["p99"], False)
+        check(
+            name,
+            "throughput_rows_per_s",
+            before["throughput_rows_per_s"],
+            case["throughput_rows_per_s"],
+            True,
+        )
+
+    for intra_op, cold in current.get("cold", {}).items():
+        before = baseline.get("cold", {}).get(intra_op)
+        if before is not None:
+            name = f"cold/intra_op={intra_op}"
+            check(name, "load_ms", before["load_ms"], cold["load_ms"], False)
+    return regressions
+
+
+def _pss_mb(pid: int) -> float:
+    """Proportional set size of a process (shared pages split between
+    sharers), falls back to RSS where smaps_rollup is unavailable."""
+    for path, field in (
+        (f"/proc/{pid}/smaps_rollup", "Pss:"),
+        (f"/proc/{pid}/status", "VmRSS:"),
+    ):
+        try:
+            with open(path) as f:
+                for line in f:
+                    if line.startswith(field):
+                        return int(line.split()[1]) / 1024
+        except OSError:
+            continue
+    return 0.0
+
+
+# Run as a separate interpreter like scripts/inference_server.py, not as a
+# multiprocessing child sharing the benchmark's resource tracker
+_SERVER_SNIPPET = """
+import asyncio, sys
+from app.ml.model import MLModel
+from app.ml.server import InferenceServer
+asyncio.run(InferenceServer(MLModel(), sys.argv[1]).serve_forever())
+"""
+
+
+def _web_worker(
+    mode: str,
+    socket_path: str,
+    concurrency: int,
+    batch_size: int,
+    duration: float,
+    start: Any,
+    results: Any,
+    done: Any,
+) -> None:
+    """One simulated web worker: ``concurrency`` requests in flight at once."""
+    from app.ml.server import InferenceClient
+
+    X = np.random.default_rng(0).standard_normal((batch_size, 5)).astype(np.float32)
+
+    async def run() -> int:
+        if mode == "server":
+            client = InferenceClient(socket_path, slots=concurrency)
+            await client.connect()
+            call = client.infer
+        else:
+            model = MLModel()
+            executor = InferenceExecutor(
+                max_workers=settings.ML_EXECUTOR_WORKERS, max_queue=concurrency
+            )
+
+            async def call(X: np.ndarray[Any, Any]) -> np.ndarray[Any, Any]:
+                return await executor.run(model._infer, X)
+
+        await call(X)
+        start.wait()
+        deadline = time.perf_counter() + duration
+        rows = 0
+
+        async def caller() -> None:
+            nonlocal rows
+            while time.perf_counter() < deadline:
+                await call(X)
+                rows += batch_size
+
+        await asyncio.gather(*(caller() for _ in range(concurrency)))
+        if mode == "server":
+            client.close()
+        return rows
+
+    results.put((os.getpid(), asyncio.run(run())))
+    # Stay alive until the parent has measured memory
+    done.wait()
+
+
+def compare_serving_modes(
+    web_workers: int = 4,
+    concurrency: int = 8,
+    batch_size: int = 1,
+    duration: float = 5.0,
+) -> dict[str, Any]:
+    """
+    Measure throughput and memory of in-worker inference ("local") against
+    the shared inference server ("server").
+
+    ``web_workers`` processes each keep ``concurrency`` requests of
+    ``batch_size`` rows in flight for ``duration`` seconds, like
+    ``fastapi run --workers`` under load. Memory is the summed PSS of the
+    worker processes (and of the server process in server mode), measured at
+    the end of the run.
+
+    Returns:
+        JSON-serializable results per mode: rows_per_s, memory_mb and the
+        per-process memory
+    """
+    context = multiprocessing.get_context("spawn")
+    results: dict[str, Any] = {
+        "metadata": {
+            "cpu_count": os.cpu_count(),
+            "web_workers": web_workers,
+            "concurrency": concurrency,
+            "batch_size": batch_size,
+            "duration_s": duration,
+            "executor_workers": settings.ML_EXECUTOR_WORKERS,
+        }
+    }
+    with tempfile.TemporaryDirectory() as directory:
+        socket_path = os.path.join(directory, "inference.sock")
+        for mode in ("local", "server"):
+            server = None
+            if mode == "server":
+                server = subprocess.Popen(
+                    [sys.executable, "-c", _SERVER_SNIPPET, socket_path]
+                )
+                deadline = time.monotonic() + 60
+                while not os.path.exists(socket_path):
+                    if server.poll() is not None or time.monotonic() > deadline:
+                        raise RuntimeError("Inference server failed to start")
+                    time.sleep(0.05)
+
+            start = context.Barrier(web_workers + 1)
+            queue = context.Queue()
+            done = context.Event()
+            workers = [
+                context.Process(
+                    target=_web_worker,
+                    args=(
+                        mode,
+                        socket_path,
+                        concurrency,
+                        batch_size,
+                        duration,
+                        start,
+                        queue,
+                        done,
+                    ),
+                    daemon=True,
+                )
+                for _ in range(web_workers)
+            ]
+            for worker in workers:
+                worker.start()
+            start.wait()
+            counts = dict(queue.get() for _ in workers)
+            memory = {f"worker_{pid}": round(_pss_mb(pid), 1) for pid in counts}
+            if server is not None:
+                memory["server"] = round(_pss_mb(server.pid), 1)
+            done.set()
+            for worker in workers:
+                worker.join()
+            if server is not None:
+                server.terminate()
+                server.wait()
+
+            results[mode] = {
+                "rows_per_s": round(sum(counts.values()) / duration, 1),
+                "memory_mb": round(sum(memory.values()), 1),
+                "processes_mb": memory,
+            }
+    return results
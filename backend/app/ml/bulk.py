@@ -0,0 +1,250 @@
+"""
+Offline bulk scoring of feature files with a process pool.
+
+The input is memory-mapped as an (N, 5) matrix: ``.npy`` files directly,
+CSV and Parquet files after a streaming conversion to a raw float32 scratch
+file next to the output. The rows are split into shards scored by a pool of
+worker processes, each loading its own ``MLModel`` (and so its own
+``InferenceSession``) with one intra-op thread, so throughput scales with the
+number of processes instead of contending for ONNX Runtime's thread pool.
+Workers write their predictions straight into a memory-mapped ``.npy``
+output, nothing but shard bounds goes through the pool's pipes.
+
+Parquet support needs the optional ``pyarrow`` package (``bulk`` extra).
+"""
+
+import itertools
+import multiprocessing
+import os
+import time
+from collections.abc import Iterator
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from typing import Any, NamedTuple
+
+import numpy as np
+
+from app.core.config import settings
+from app.ml.model import MLModel
+
+N_FEATURES = 5
+
+# Rows converted at a time from CSV / Parquet to the scratch file
+CONVERT_CHUNK_ROWS = 65_536
+
+
+class FeatureSource(NamedTuple):
+    """Location of an (N, 5) feature matrix inside a file, for np.memmap."""
+
+    path: Path
+    rows: int
+    dtype: str
+    offset: int = 0
+    fortran_order: bool = False
+
+    def open(self) -> np.ndarray[Any, Any]:
+        """Memory-map the matrix read-only."""
+        if not self.rows:
+            return np.empty((0, N_FEATURES), dtype=self.dtype)
+        return np.memmap(
+            self.path,
+            dtype=self.dtype,
+            mode="r",
+            offset=self.offset,
+            shape=(self.rows, N_FEATURES),
+            order="F" if self.fortran_order else "C",
+        )
+
+
+def npy_source(path: Path) -> FeatureSource:
+    """
+    Describe the matrix of a ``.npy`` file without reading its data.
+
+    Raises:
+        ValueError: If the file is not an (N, 5) float array
+    """
+    with open(path, "rb") as f:
+        version = np.lib.format.read_magic(f)  # type: ignore[no-untyped-call]
+        if version == (1, 0):
+            shape, fortran_order, dtype = np.lib.format.read_array_header_1_0(f)  # type: ignore[no-untyped-call]
+        elif version == (2, 0):
+            shape, fortran_order, dtype = np.lib.format.read_array_header_2_0(f)  # type: ignore[no-untyped-call]
+        else:
+            raise ValueError(f"Unsupported .npy format version {version}")
+        offset = f.tell()
+    if dtype.kind != "f" or dtype.hasobject:
+        raise ValueError(f"Expected a float32 or float64 array, got {dtype}")
+    if len(shape) != 2 or shape[1] != N_FEATURES:
+        raise ValueError(f"Expected an (N, {N_FEATURES}) array, got shape {shape}")
+    return FeatureSource(path, shape[0], dtype.str, offset, fortran_order)
+
+
+def _iter_csv_chunks(path: Path, header: bool) -> Iterator[np.ndarray[Any, Any]]:
+    with open(path) as f:
+        if header:
+            next(f, None)
+        while True:
+            lines = list(itertools.islice(f, CONVERT_CHUNK_ROWS))
+            if not lines:
+                return
+            yield np.loadtxt(lines, delimiter=",", dtype=np.float32, ndmin=2)
+
+
+def _iter_parquet_chunks(
+    path: Path, columns: list[str] | None
+) -> Iterator[np.ndarray[Any, Any]]:
+    try:
+        import pyarrow.parquet as pq
+    except ImportError:
+        raise ValueError(
+            "Parquet input requires the pyarrow package (bulk extra)"
+        ) from None
+    parquet_file = pq.ParquetFile(path, memory_map=True)
+    for batch in parquet_file.iter_batches(
+        batch_size=CONVERT_CHUNK_ROWS, columns=columns
+    ):
+        yield np.column_stack(
+            [column.to_numpy(zero_copy_only=False) for column in batch.columns]
+        ).astype(np.float32)
+
+
+def convert_to_raw(
+    chunks: Iterator[np.ndarray[Any, Any]], scratch_path: Path
+) -> FeatureSource:
+    """
+    Write feature chunks to a raw float32 file, one chunk in memory at a time.
+
+    Raises:
+        ValueError: If a chunk does not have 5 columns
+    """
+    rows = 0
+    with open(scratch_path, "wb") as f:
+        for chunk in chunks:
+            if chunk.ndim != 2 or chunk.shape[1] != N_FEATURES:
+                raise ValueError(
+                    f"Expected {N_FEATURES} feature columns, got shape {chunk.shape}"
+                )
+            f.write(np.ascontiguousarray(chunk, dtype="<f4").tobytes())
+            rows += chunk.shape[0]
+    return FeatureSource(scratch_path, rows, "<f4")
+
+
+def open_input(
+    input_path: Path,
+    scratch_path: Path,
+    csv_header: bool = False,
+    columns: list[str] | None = None,
+) -> FeatureSource:
+    """
+    Memory-map ``.npy`` inputs, convert CSV and Parquet to ``scratch_path``.
+
+    Raises:
+        ValueError: If the format is unsupported or the data malformed
+    """
+    suffix = input_path.suffix.lower()
+    if suffix == ".npy":
+        return npy_source(input_path)
+    if suffix == ".csv":
+        return convert_to_raw(_iter_csv_chunks(input_path, csv_header), scratch_path)
+    if suffix in (".parquet", ".pq"):
+        return convert_to_raw(_iter_parquet_chunks(input_path, columns), scratch_path)
+    raise ValueError(f"Unsupported input format: {input_path.suffix}")
+
+
+# Model of the current worker process, see _init_worker
+_worker_model: MLModel | None = None
+
+
+def _init_worker(model_path: Path, engine: str, intra_op_threads: int) -> None:
+    global _worker_model
+    settings.ML_ORT_INTRA_OP_NUM_THREADS = intra_op_threads
+    _worker_model = MLModel(model_path=model_path, engine=engine, variant="")
+
+
+def _score_shard(
+    source: FeatureSource, output_path: Path, start: int, stop: int
+) -> int:
+    assert _worker_model is not None
+    X = np.ascontiguousarray(source.open()[start:stop], dtype=np.float32)
+    output = np.load(output_path, mmap_mode="r+")
+    output[start:stop] = _worker_model._infer(X)
+    output.flush()
+    return stop - start
+
+
+def score_file(
+    input_path: Path,
+    output_path: Path,
+    workers: int | None = None,
+    shard_rows: int = 65_536,
+    intra_op_threads: int = 1,
+    model_path: Path | None = None,
+    csv_header: bool = False,
+    columns: list[str] | None = None,
+) -> dict[str, Any]:
+    """
+    Score every row of a feature file into a float32 ``.npy`` vector.
+
+    Args:
+        input_path: ``.npy``, ``.csv`` or ``.parquet`` file of 5 features per row
+        output_path: Predictions ``.npy`` file, in input order
+        workers: Worker processes, one per CPU if None
+        shard_rows: Rows per task
+        intra_op_threads: ONNX Runtime intra-op threads per worker
+        model_path: Model to score with, the default model if None
+        csv_header: Skip the first CSV line
+        columns: Parquet columns holding the features, all if None
+
+    Returns:
+        Dictionary with rows, shards, workers, model_version, convert_s
+        (CSV / Parquet conversion), score_s (scoring, including worker
+        startup) and rows_per_s (over score_s)
+
+    Raises:
+        ValueError: If the input format is unsupported or malformed
+    """
+    workers = workers or os.cpu_count() or 1
+    # Loads (or trains) the model once before the workers do
+    model = MLModel(model_path=model_path)
+    scratch_path = output_path.with_name(output_path.name + ".features.tmp")
+
+    try:
+        start = time.perf_counter()
+        source = open_input(input_path, scratch_path, csv_header, columns)
+        convert_s = time.perf_counter() - start
+
+        output = np.lib.format.open_memmap(  # type: ignore[no-untyped-call]
+            output_path, mode="w+", dtype=np.float32, shape=(source.rows,)
+        )
+        del output
+        bounds = [
+            (shard_start, min(shard_start + shard_rows, source.rows))
+            for shard_start in range(0, source.rows, shard_rows)
+        ]
+
+        start = time.perf_counter()
+        # spawn: workers must not inherit the parent's ONNX Runtime threads
+        with ProcessPoolExecutor(
+            max_workers=workers,
+            mp_context=multiprocessing.get_context("spawn"),
+            initializer=_init_worker,
+            initargs=(model.model_path, model.engine, intra_op_threads),
+        ) as pool:
+            futures = [
+                pool.submit(_score_shard, source, output_path, shard_start, stop)
+                for shard_start, stop in bounds
+            ]
+            rows = sum(future.result() for future in futures)
+        score_s = time.perf_counter() - start
+    finally:
+        scratch_path.unlink(missing_ok=True)
+
+    return {
+        "rows": rows,
+        "shards": len(bounds),
+        "workers": workers,
+        "model_version": model.version,
+        "convert_s": round(convert_s, 4),
+        "score_s": round(score_s, 4),
+        "rows_per_s": round(rows / score_s, 1) if score_s else 0.0,
+    }
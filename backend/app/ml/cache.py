@@ -0,0 +1,212 @@
+import sys
+import threading
+import time
+from collections import OrderedDict
+from collections.abc import Callable
+from concurrent.futures import Future
+from typing import Any
+
+import numpy as np
+
+from app.core.config import settings
+from app.ml.model import MLModel
+
+# Rough per-entry bookkeeping cost (OrderedDict node, tuple, float) in bytes
+_ENTRY_OVERHEAD = 120
+
+
+class PredictionCache:
+    """
+    Bounded LRU/TTL cache of predictions keyed on the float32 input bytes.
+
+    Identical concurrent inputs are coalesced: the first caller runs the
+    inference and the others wait for its result. Entries are dropped when
+    the model version changes, so a new artifact never serves stale results.
+    """
+
+    def __init__(
+        self,
+        max_entries: int = 10_000,
+        max_bytes: int = 16 * 1024 * 1024,
+        ttl_seconds: float = 0,
+        quantization: float = 0,
+    ):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.ttl_seconds = ttl_seconds
+        self.quantization = quantization
+        self._lock = threading.Lock()
+        # key -> (prediction, expires_at, size)
+        self._entries: OrderedDict[bytes, tuple[float, float, int]] = OrderedDict()
+        self._in_flight: dict[bytes, Future[float]] = {}
+        self._version: str | None = None
+        self._bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.coalesced = 0
+        self.evictions = 0
+        self.expirations = 0
+        self.invalidations = 0
+
+    def make_key(self, data: list[float]) -> bytes:
+        """Key on the float32 bytes, optionally snapped to a quantization grid."""
+        X = np.asarray(data, dtype=np.float32)
+        if self.quantization > 0:
+            X = (np.round(X / self.quantization) * self.quantization).astype(np.float32)
+        return X.tobytes()
+
+    def _check_version(self, version: str | None) -> None:
+        """Drop everything if the model changed. Caller holds the lock."""
+        if version != self._version:
+            if self._entries:
+                self.invalidations += 1
+            self._entries.clear()
+            self._bytes = 0
+            self._version = version
+
+    def _store(self, key: bytes, value: float) -> None:
+        """Insert an entry and evict LRU entries over the bounds. Caller holds the lock."""
+        size = sys.getsizeof(key) + _ENTRY_OVERHEAD
+        expires_at = (
+            time.monotonic() + self.ttl_seconds if self.ttl_seconds > 0 else 0.0
+        )
+        self._entries[key] = (value, expires_at, size)
+        self._bytes += size
+        while self._entries and (
+            len(self._entries) > self.max_entries or self._bytes > self.max_bytes
+        ):
+            _, (_, _, evicted_size) = self._entries.popitem(last=False)
+            self._bytes -= evicted_size
+            self.evictions += 1
+
+    def get_or_compute(
+        self, key: bytes, version: str | None, compute: Callable[[], float]
+    ) -> tuple[float, str]:
+        """
+        Return the cached value for ``key`` or compute it once.
+
+        Args:
+            key: Cache key, see ``make_key``
+            version: Version of the model producing the value
+            compute: Called on a miss to produce the value
+
+        Returns:
+            Tuple of the value and how it was served: "hit", "miss" or
+            "coalesced" (waited for an identical in-flight request)
+        """
+        with self._lock:
+            self._check_version(version)
+            entry = self._entries.get(key)
+            if entry is not None:
+                value, expires_at, size = entry
+                if not expires_at or expires_at > time.monotonic():
+                    self._entries.move_to_end(key)
+                    self.hits += 1
+                    return value, "hit"
+                del self._entries[key]
+                self._bytes -= size
+                self.expirations += 1
+
+            future = self._in_flight.get(key)
+            leader = future is None
+            if future is None:
+                future = Future()
+                self._in_flight[key] = future
+                self.misses += 1
+            else:
+                self.coalesced += 1
+
+        if not leader:
+            return future.result(), "coalesced"
+
+        try:
+            value = compute()
+        except BaseException as e:
+            with self._lock:
+                del self._in_flight[key]
+            future.set_exception(e)
+            raise
+
+        with self._lock:
+            del self._in_flight[key]
+            if version == self._version:
+                self._store(key, value)
+        future.set_result(value)
+        return value, "miss"
+
+    def predict(self, model: MLModel, data: list[float]) -> dict[str, Any]:
+        """
+        Make a prediction through the cache.
+
+        Args:
+            model: Model used on cache misses
+            data: List of 5 float values
+
+        Returns:
+            Dictionary like ``MLModel.predict`` plus a ``cache`` field
+        """
+        start = time.perf_counter_ns()
+
+        if len(data) != 5:
+            raise ValueError(f"Expected 5 features, got {len(data)}")
+
+        computed: dict[str, Any] = {}
+
+        def compute() -> float:
+            computed["result"] = model.predict(data)
+            prediction: float = computed["result"]["prediction"]
+            return prediction
+
+        value, outcome = self.get_or_compute(
+            self.make_key(data), model.version, compute
+        )
+        if outcome == "miss":
+            return {**computed["result"], "cache": outcome}
+
+        return {
+            "prediction": value,
+            "latency_ms": 0.0,
+            "total_time_ms": round((time.perf_counter_ns() - start) / 1e6, 4),
+            "model_format": "ONNX",
+            "features_count": 5,
+            "model_version": model.version,
+            "cache": outcome,
+        }
+
+    def clear(self) -> None:
+        """Drop all entries, keeping the counters."""
+        with self._lock:
+            self._entries.clear()
+            self._bytes = 0
+
+    def stats(self) -> dict[str, Any]:
+        """Counters and current size, for the health endpoint."""
+        with self._lock:
+            lookups = self.hits + self.misses + self.coalesced
+            return {
+                "entries": len(self._entries),
+                "bytes": self._bytes,
+                "hits": self.hits,
+                "misses": self.misses,
+                "coalesced": self.coalesced,
+                "evictions": self.evictions,
+                "expirations": self.expirations,
+                "invalidations": self.invalidations,
+                "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0,
+            }
+
+
+_cache_instance = None
+
+
+def get_prediction_cache() -> PredictionCache:
+    """Get or create the prediction cache (singleton)."""
+    global _cache_instance
+    if _cache_instance is None:
+        _cache_instance = PredictionCache(
+            max_entries=settings.ML_CACHE_MAX_ENTRIES,
+            max_bytes=settings.ML_CACHE_MAX_BYTES,
+            ttl_seconds=settings.ML_CACHE_TTL_SECONDS,
+            quantization=settings.ML_CACHE_QUANTIZATION,
+        )
+    return _cache_instance
@@ -0,0 +1,195 @@
+"""
+Binary request and response formats for the prediction endpoints.
+
+Feature matrices are row-major (N, 5) float32:
+
+    application/octet-stream: raw little-endian float32 values
+    application/x-npy: a ``.npy`` file (``np.save``), float32 or float64
+    application/msgpack: a map ``{"data": <bin, little-endian float32>}``,
+        or an array of rows of numbers
+
+Binary payloads are decoded with ``np.frombuffer``, the resulting array
+shares the request body's memory and goes to ONNX Runtime without a copy.
+Predictions are encoded the same way, as a float32 vector.
+
+JSON responses are encoded straight to bytes with ``pydantic_core.to_json``
+(NumPy values converted on the fly), skipping FastAPI's ``jsonable_encoder``
+walk and response model revalidation.
+"""
+
+import io
+from typing import Any
+
+import msgpack
+import numpy as np
+from pydantic_core import to_json
+
+JSON = "application/json"
+OCTET_STREAM = "application/octet-stream"
+NPY = "application/x-npy"
+MSGPACK = "application/msgpack"
+
+BINARY_MEDIA_TYPES = (OCTET_STREAM, NPY, MSGPACK)
+_ALIASES = {"application/x-msgpack": MSGPACK, "application/vnd.msgpack": MSGPACK}
+
+_FLOAT32_LE = np.dtype("<f4")
+N_FEATURES = 5
+
+# Diagnostic fields dropped from lean responses
+TIMING_FIELDS = ("latency_ms", "total_time_ms", "queue_wait_ms", "batch_size")
+
+
+class UnsupportedMediaTypeError(ValueError):
+    """The request body or the requested response format is not supported."""
+
+
+def media_type(content_type: str | None) -> str:
+    """Normalize a Content-Type header, JSON when missing."""
+    if not content_type:
+        return JSON
+    value = content_type.split(";")[0].strip().lower()
+    return _ALIASES.get(value, value)
+
+
+def negotiate(accept: str | None) -> str:
+    """
+    Pick the response format from an Accept header.
+
+    The first binary media type listed wins, anything else gets JSON.
+    """
+    for item in (accept or "").split(","):
+        value = media_type(item)
+        if value in BINARY_MEDIA_TYPES:
+            return value
+    return JSON
+
+
+def _as_matrix(values: np.ndarray[Any, Any]) -> np.ndarray[Any, Any]:
+    """Check the feature count and shape values as (N, 5)."""
+    if values.ndim == 1:
+        if values.size % N_FEATURES:
+            raise ValueError(
+                f"Expected a multiple of {N_FEATURES} float32 values, got {values.size}"
+            )
+        values = values.reshape(-1, N_FEATURES)
+    if values.ndim != 2 or values.shape[1] != N_FEATURES:
+        raise ValueError(
+            f"Expected an (N, {N_FEATURES}) array, got shape {values.shape}"
+        )
+    return values
+
+
+def _frombuffer(buffer: bytes) -> np.ndarray[Any, Any]:
+    if len(buffer) % _FLOAT32_LE.itemsize:
+        raise ValueError("Body length is not a multiple of 4 bytes (float32)")
+    return np.frombuffer(buffer, dtype=_FLOAT32_LE)
+
+
+def _decode_npy(body: bytes) -> np.ndarray[Any, Any]:
+    """Parse the .npy header and wrap the data that follows without copying."""
+    f = io.BytesIO(body)
+    try:
+        version = np.lib.format.read_magic(f)  # type: ignore[no-untyped-call]
+        if version == (1, 0):
+            header = np.lib.format.read_array_header_1_0(f)  # type: ignore[no-untyped-call]
+        elif version == (2, 0):
+            header = np.lib.format.read_array_header_2_0(f)  # type: ignore[no-untyped-call]
+        else:
+            raise ValueError(f"unsupported format version {version}")
+    except ValueError as e:
+        raise ValueError(f"Invalid .npy payload: {e}") from None
+    shape, fortran_order, dtype = header
+    if dtype.kind != "f" or dtype.hasobject:
+        raise ValueError(f"Expected a float32 or float64 array, got {dtype}")
+    count = int(np.prod(shape))
+    if len(body) - f.tell() < count * dtype.itemsize:
+        raise ValueError("Truncated .npy payload")
+    values = np.frombuffer(body, dtype=dtype, count=count, offset=f.tell())
+    values = values.reshape(shape, order="F" if fortran_order else "C")
+    # No-op for little-endian C-ordered float32, the common case
+    return np.ascontiguousarray(values, dtype=np.float32)
+
+
+def _decode_msgpack(body: bytes) -> np.ndarray[Any, Any]:
+    try:
+        payload = msgpack.unpackb(body)
+    except Exception as e:
+        raise ValueError(f"Invalid msgpack payload: {e}") from None
+    if isinstance(payload, dict) and isinstance(payload.get("data"), bytes):
+        return _frombuffer(payload["data"])
+    if isinstance(payload, list):
+        try:
+            return np.asarray(payload, dtype=np.float32)
+        except (TypeError, ValueError):
+            raise ValueError("Expected rows of numbers") from None
+    raise ValueError('Expected a map with binary "data" or an array of rows')
+
+
+def decode_features(body: bytes, content_type: str) -> np.ndarray[Any, Any]:
+    """
+    Decode a binary request body into an (N, 5) float32 matrix.
+
+    Args:
+        body: Raw request body
+        content_type: Normalized media type, one of ``BINARY_MEDIA_TYPES``
+
+    Raises:
+        UnsupportedMediaTypeError: If the media type is not supported
+        ValueError: If the payload is malformed or has the wrong shape
+    """
+    if content_type == OCTET_STREAM:
+        values = _frombuffer(body)
+    elif content_type == NPY:
+        values = _decode_npy(body)
+    elif content_type == MSGPACK:
+        values = _decode_msgpack(body)
+    else:
+        raise UnsupportedMediaTypeError(f"Unsupported content type: {content_type}")
+    return _as_matrix(values)
+
+
+def encode_predictions(
+    predictions: np.ndarray[Any, Any], response_type: str, metadata: dict[str, Any]
+) -> bytes:
+    """
+    Encode predictions as a little-endian float32 vector.
+
+    Args:
+        predictions: Predictions, in input order
+        response_type: One of ``BINARY_MEDIA_TYPES``
+        metadata: Extra fields, only embedded by msgpack (the other formats
+            carry them in headers)
+    """
+    values = np.asarray(predictions, dtype=_FLOAT32_LE).reshape(-1)
+    if response_type == OCTET_STREAM:
+        return values.tobytes()
+    if response_type == NPY:
+        f = io.BytesIO()
+        np.lib.format.write_array(f, values, allow_pickle=False)  # type: ignore[no-untyped-call]
+        return f.getvalue()
+    if response_type == MSGPACK:
+        packed: bytes = msgpack.packb({**metadata, "predictions": values.tobytes()})
+        return packed
+    raise UnsupportedMediaTypeError(f"Unsupported response type: {response_type}")
+
+
+def _to_builtin(value: Any) -> Any:
+    if isinstance(value, np.ndarray | np.generic):
+        return value.tolist()
+    raise TypeError(f"Unable to serialize {type(value).__name__}")
+
+
+def lean_result(result: dict[str, Any]) -> dict[str, Any]:
+    """Drop the diagnostic timing fields of a prediction result."""
+    return {key: value for key, value in result.items() if key not in TIMING_FIELDS}
+
+
+def encode_json(result: dict[str, Any], lean: bool = False) -> bytes:
+    """
+    Encode a prediction result as JSON bytes.
+
+    Args:
+        result: Prediction result, NumPy arrays and scalars allowed
+        lean: Omit ``TIMING_FIELDS``
+    """
+    return to_json(lean_result(result) if lean else result, fallback=_to_builtin)
@@ -0,0 +1,141 @@
+import asyncio
+import threading
+import time
+from collections import deque
+from collections.abc import Callable
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Any, TypeVar
+
+import numpy as np
+from fastapi import Request
+from fastapi.responses import JSONResponse
+
+from app.core.config import settings
+
+T = TypeVar("T")
+
+# Number of recent queue waits kept for the percentiles in stats()
+_WAIT_SAMPLES = 1024
+
+
+class InferenceQueueFull(Exception):
+    """Raised when the inference queue is full, the request was not queued."""
+
+    def __init__(self, retry_after: int):
+        super().__init__("Inference queue is full")
+        self.retry_after = retry_after
+
+
+class InferenceExecutor:
+    """
+    Dedicated thread pool for blocking inference calls, with a bounded queue.
+
+    Inference never runs on the event loop nor in AnyIO's default thread
+    pool, so it does not compete with sync CRUD endpoints for threads. At most
+    ``max_workers`` calls run at once and ``max_queue`` more wait; further
+    calls are rejected right away with ``InferenceQueueFull`` instead of
+    letting latency grow without bound.
+    """
+
+    def __init__(
+        self,
+        max_workers: int = 4,
+        max_queue: int = 64,
+        retry_after: int = 1,
+    ):
+        if max_workers < 1:
+            raise ValueError("max_workers must be at least 1")
+        if max_queue < 0:
+            raise ValueError("max_queue must be non-negative")
+        self.max_workers = max_workers
+        self.max_queue = max_queue
+        self.retry_after = retry_after
+        self._pool = ThreadPoolExecutor(
+            max_workers=max_workers, thread_name_prefix="inference"
+        )
+        self._lock = threading.Lock()
+        # Admitted calls not finished yet, running or waiting for a worker
+        self._pending = 0
+        self._running = 0
+        self._waits_ms: deque[float] = deque(maxlen=_WAIT_SAMPLES)
+        self.completed = 0
+        self.rejected = 0
+
+    def _release(self, _future: Future[Any]) -> None:
+        """Free the slot of a finished (or cancelled before running) call."""
+        with self._lock:
+            self._pending -= 1
+
+    async def run(self, fn: Callable[..., T], *args: Any) -> T:
+        """
+        Run ``fn(*args)`` on the pool and wait for the result.
+
+        Raises:
+            InferenceQueueFull: If all workers are busy and the queue is full
+        """
+        with self._lock:
+            if self._pending >= self.max_workers + self.max_queue:
+                self.rejected += 1
+                raise InferenceQueueFull(self.retry_after)
+            self._pending += 1
+        enqueued_at = time.perf_counter()
+
+        def call() -> T:
+            wait_ms = (time.perf_counter() - enqueued_at) * 1000
+            with self._lock:
+                self._running += 1
+                self._waits_ms.append(wait_ms)
+            try:
+                return fn(*args)
+            finally:
+                with self._lock:
+                    self._running -= 1
+                    self.completed += 1
+
+        future = self._pool.submit(call)
+        future.add_done_callback(self._release)
+        return await asyncio.wrap_future(future)
+
+    def stats(self) -> dict[str, Any]:
+        """Queue depth, load and recent queue wait times, for health checks."""
+        with self._lock:
+            waits = np.array(self._waits_ms)
+            p50, p99 = np.percentile(waits, [50, 99]) if len(waits) else (0.0, 0.0)
+            return {
+                "workers": self.max_workers,
+                "max_queue": self.max_queue,
+                "running": self._running,
+                "queue_depth": self._pending - self._running,
+                "completed": self.completed,
+                "rejected": self.rejected,
+                "wait_ms_p50": round(float(p50), 4),
+                "wait_ms_p99": round(float(p99), 4),
+            }
+
+
+async def inference_queue_full_handler(
+    request: Request,  # noqa: ARG001
+    exc: Exception,
+) -> JSONResponse:
+    """Turn a full inference queue into a 429/503 with ``Retry-After``."""
+    assert isinstance(exc, InferenceQueueFull)
+    return JSONResponse(
+        status_code=settings.ML_EXECUTOR_REJECT_STATUS_CODE,
+        content={"detail": "Inference queue is full, retry later"},
+        headers={"Retry-After": str(exc.retry_after)},
+    )
+
+
+_executor_instance = None
+
+
+def get_inference_executor() -> InferenceExecutor:
+    """Get or create the inference executor (singleton)."""
+    global _executor_instance
+    if _executor_instance is None:
+        _executor_instance = InferenceExecutor(
+            max_workers=settings.ML_EXECUTOR_WORKERS,
+            max_queue=settings.ML_EXECUTOR_MAX_QUEUE,
+            retry_after=settings.ML_EXECUTOR_RETRY_AFTER_SECONDS,
+        )
+    return _executor_instance
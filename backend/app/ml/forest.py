@@ -0,0 +1,225 @@
+"""
+Pure-NumPy inference engine for the tree ensemble.
+
+The ONNX ``TreeEnsembleRegressor`` (and its ``Scaler`` prelude) is compiled
+into flat arrays indexed by a global node id, and whole batches are evaluated
+level by level: every row advances one level in every tree per step, so the
+number of Python-level iterations is the forest depth, not the node count.
+Sibling nodes are stored next to each other so a step is a single
+``node = children + (x <= threshold)`` with no branching.
+"""
+
+from pathlib import Path
+from typing import Any, NamedTuple
+
+import numpy as np
+
+# Rows evaluated at once, keeps the (rows, trees) index matrix cache-sized
+CHUNK_SIZE = 1024
+
+
+def forest_path(model_path: Path) -> Path:
+    """Path of the compiled forest stored next to ``model_path``."""
+    return model_path.with_suffix(".forest.npz")
+
+
+class TreeEnsemble(NamedTuple):
+    """
+    Forest compiled to flat arrays.
+
+    The "true" child of a node (x <= threshold) is always stored right
+    after its "false" child. Leaves point to themselves with a NaN threshold,
+    which no comparison passes, so traversal can run a fixed number of steps
+    without checking for leaves. NaN features take the "false" branch, as in
+    ONNX Runtime.
+    """
+
+    feature: np.ndarray[Any, Any]  # (nodes,) int32, feature tested at each node
+    threshold: np.ndarray[
+        Any, Any
+    ]  # (nodes,) float32, x <= threshold takes the true child
+    children: np.ndarray[Any, Any]  # (nodes,) int32, global id of the "false" child
+    value: np.ndarray[Any, Any]  # (nodes,) float32, leaf contribution (0 for branches)
+    roots: np.ndarray[Any, Any]  # (trees,) int32, global id of each tree root
+    max_depth: int
+    offset: np.ndarray[Any, Any]  # (features,) float32, Scaler prelude offset
+    scale: np.ndarray[Any, Any]  # (features,) float32, Scaler prelude scale
+    base_value: float
+
+    def predict(self, X: np.ndarray[Any, Any]) -> np.ndarray[Any, Any]:
+        """
+        Evaluate the forest on a batch.
+
+        Args:
+            X: Float32 array of shape (N, features) with raw features
+
+        Returns:
+            Array of N float32 predictions
+        """
+        X = ((X - self.offset) * self.scale).astype(np.float32, copy=False)
+        n_features = X.shape[1]
+        out = np.empty(X.shape[0], dtype=np.float32)
+        for start in range(0, X.shape[0], CHUNK_SIZE):
+            chunk = np.ascontiguousarray(X[start : start + CHUNK_SIZE])
+            flat = chunk.ravel()
+            # Offset of each row in the flattened chunk
+            row_base = (np.arange(chunk.shape[0], dtype=np.int32) * n_features)[:, None]
+            idx = np.broadcast_to(self.roots, (chunk.shape[0], len(self.roots)))
+            for _ in range(self.max_depth):
+                x = flat.take(row_base + self.feature.take(idx))
+                idx = self.children.take(idx) + (x <= self.threshold.take(idx))
+            out[start : start + CHUNK_SIZE] = (
+                self.value.take(idx).sum(axis=1, dtype=np.float64) + self.base_value
+            )
+        return out
+
+    def save(self, path: Path) -> None:
+        """Save the compiled arrays as ``.npz``."""
+        with open(path, "wb") as f:
+            np.savez(f, **self._asdict())
+
+    @classmethod
+    def load(cls, path: Path) -> "TreeEnsemble":
+        """Load arrays saved with ``save``."""
+        with np.load(path) as data:
+            fields = {name: data[name] for name in cls._fields}
+        fields["max_depth"] = int(fields["max_depth"])
+        fields["base_value"] = float(fields["base_value"])
+        return cls(**fields)
+
+
+def compile_onnx_forest(model_path: Path) -> "TreeEnsemble":
+    """
+    Compile the ``TreeEnsembleRegressor`` of an ONNX model into flat arrays.
+
+    Requires the ``onnx`` package (installed with skl2onnx), serving only
+    needs it when no up to date compiled forest exists.
+
+    Args:
+        model_path: ONNX model with an optional ``Scaler`` and one
+            single-target ``TreeEnsembleRegressor`` node
+
+    Returns:
+        The compiled forest
+    """
+    import onnx
+    from onnx import helper
+
+    graph = onnx.load(str(model_path)).graph
+    nodes = {node.op_type: node for node in graph.node}
+    if "TreeEnsembleRegressor" not in nodes:
+        raise ValueError(f"{model_path} has no TreeEnsembleRegressor node")
+    attrs = {
+        a.name: helper.get_attribute_value(a)
+        for a in nodes["TreeEnsembleRegressor"].attribute
+    }
+    if attrs.get("n_targets", 1) != 1:
+        raise ValueError("Only single-target tree ensembles are supported")
+    if attrs.get("post_transform", b"NONE") != b"NONE":
+        raise ValueError("Tree ensemble post_transform is not supported")
+    if attrs.get("aggregate_function", b"SUM") not in (b"SUM", b"AVERAGE"):
+        raise ValueError("Only SUM and AVERAGE aggregation are supported")
+
+    tree_ids = np.asarray(attrs["nodes_treeids"], dtype=np.int64)
+    node_ids = np.asarray(attrs["nodes_nodeids"], dtype=np.int64)
+    modes = attrs["nodes_modes"]
+    if any(mode not in (b"BRANCH_LEQ", b"LEAF") for mode in modes):
+        raise ValueError("Only BRANCH_LEQ splits are supported")
+
+    # Global node id = offset of the tree + node id within the tree
+    n_trees = int(tree_ids.max()) + 1
+    tree_sizes = np.zeros(n_trees, dtype=np.int64)
+    np.maximum.at(tree_sizes, tree_ids, node_ids + 1)
+    tree_offsets = np.concatenate([[0], np.cumsum(tree_sizes)[:-1]])
+    n_nodes = int(tree_sizes.sum())
+    gid = tree_offsets[tree_ids] + node_ids
+
+    # Children and leaf values indexed by global node id
+    is_leaf = np.array([mode == b"LEAF" for mode in modes])
+    features = np.zeros(n_nodes, dtype=np.int32)
+    thresholds = np.zeros(n_nodes, dtype=np.float32)
+    true_ids = np.full(n_nodes, -1, dtype=np.int64)
+    false_ids = np.full(n_nodes, -1, dtype=np.int64)
+    branch = ~is_leaf
+    features[gid[branch]] = np.asarray(attrs["nodes_featureids"])[branch]
+    thresholds[gid[branch]] = np.asarray(attrs["nodes_values"], np.float32)[branch]
+    true_ids[gid[branch]] = (
+        tree_offsets[tree_ids[branch]] + np.asarray(attrs["nodes_truenodeids"])[branch]
+    )
+    false_ids[gid[branch]] = (
+        tree_offsets[tree_ids[branch]] + np.asarray(attrs["nodes_falsenodeids"])[branch]
+    )
+    leaf_values = np.zeros(n_nodes, dtype=np.float32)
+    target_gid = tree_offsets[np.asarray(attrs["target_treeids"])] + np.asarray(
+        attrs["target_nodeids"]
+    )
+    np.add.at(leaf_values, target_gid, np.asarray(attrs["target_weights"], np.float32))
+    if attrs.get("aggregate_function", b"SUM") == b"AVERAGE":
+        leaf_values /= n_trees
+    base_values = attrs.get("base_values") or [0.0]
+
+    # Renumber nodes so that siblings are adjacent, tree by tree
+    feature = np.zeros(n_nodes, dtype=np.int32)
+    threshold = np.zeros(n_nodes, dtype=np.float32)
+    children = np.zeros(n_nodes, dtype=np.int32)
+    value = np.zeros(n_nodes, dtype=np.float32)
+    roots = np.zeros(n_trees, dtype=np.int32)
+    max_depth = 0
+    next_id = 0
+    for tree, root in enumerate(tree_offsets):
+        roots[tree] = next_id
+        stack = [(int(root), next_id, 0)]
+        next_id += 1
+        while stack:
+            old, new, depth = stack.pop()
+            if true_ids[old] < 0:
+                threshold[new] = np.nan
+                children[new] = new
+                value[new] = leaf_values[old]
+                max_depth = max(max_depth, depth)
+                continue
+            feature[new] = features[old]
+            threshold[new] = thresholds[old]
+            children[new] = next_id
+            stack.append((int(false_ids[old]), next_id, depth + 1))
+            stack.append((int(true_ids[old]), next_id + 1, depth + 1))
+            next_id += 2
+
+    if "Scaler" in nodes:
+        scaler = {
+            a.name: helper.get_attribute_value(a) for a in nodes["Scaler"].attribute
+        }
+        offset = np.asarray(scaler["offset"], dtype=np.float32)
+        scale = np.asarray(scaler["scale"], dtype=np.float32)
+    else:
+        offset = np.zeros(1, dtype=np.float32)
+        scale = np.ones(1, dtype=np.float32)
+
+    return TreeEnsemble(
+        feature=feature[:next_id],
+        threshold=threshold[:next_id],
+        children=children[:next_id],
+        value=value[:next_id],
+        roots=roots,
+        max_depth=max_depth,
+        offset=offset,
+        scale=scale,
+        base_value=float(base_values[0]),
+    )
+
+
+def load_forest(model_path: Path) -> TreeEnsemble:
+    """
+    Load the compiled forest for ``model_path``, compiling it if missing or
+    older than the ONNX model.
+    """
+    path = forest_path(model_path)
+    if path.exists() and path.stat().st_mtime >= model_path.stat().st_mtime:
+        return TreeEnsemble.load(path)
+    forest = compile_onnx_forest(model_path)
+    try:
+        forest.save(path)
+    except OSError:
+        # Read-only artifact directory, compile again next time
+        pass
+    return forest
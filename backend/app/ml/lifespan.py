@@ -0,0 +1,84 @@
+import asyncio
+import logging
+from collections.abc import AsyncIterator
+from contextlib import asynccontextmanager
+
+from fastapi import FastAPI
+
+from app.core.config import settings
+from app.ml.model import get_model, get_model_status, load_model, reload_model
+from app.ml.server import InferenceServerUnavailable, get_inference_client
+
+logger = logging.getLogger(__name__)
+
+
+async def _load_and_warm_up() -> None:
+    """Load and warm up the model in a worker thread, logging failures."""
+    try:
+        await asyncio.to_thread(
+            load_model,
+            warmup_batch_sizes=settings.ML_WARMUP_BATCH_SIZES,
+            warmup_iterations=settings.ML_WARMUP_ITERATIONS,
+        )
+    except Exception:
+        logger.exception("ML model failed to load")
+
+
+async def _connect_inference_server() -> None:
+    """Connect to the inference server, logging failures (retried per request)."""
+    try:
+        await get_inference_client().connect()
+    except InferenceServerUnavailable as e:
+        logger.warning("%s, requests will retry", e)
+
+
+async def _watch_model_artifact(interval: float) -> None:
+    """Poll the artifact mtime and hot reload the model when it changes."""
+    last_mtime = None
+    while True:
+        await asyncio.sleep(interval)
+        if get_model_status()["status"] != "ready":
+            continue
+        try:
+            mtime = get_model().model_path.stat().st_mtime
+        except FileNotFoundError:
+            continue
+        if mtime == last_mtime:
+            continue
+        # Recorded even on failure, so a broken artifact is not retried in a loop
+        last_mtime = mtime
+        try:
+            # No-op when the content hash did not change
+            if await asyncio.to_thread(reload_model):
+                logger.info("ML model reloaded, version %s", get_model().version)
+        except Exception:
+            logger.exception("ML model reload failed, keeping the current model")
+
+
+@asynccontextmanager
+async def ml_lifespan(app: FastAPI) -> AsyncIterator[None]:
+    """
+    Load the ML model when the application starts.
+
+    Loading runs in the background so liveness probes answer right away,
+    ``/ready`` reports 503 until the model is loaded and warmed up. Unless
+    ``ML_MODEL_WATCH_INTERVAL_SECONDS`` is 0, the artifact is also watched
+    for hot reloads, so every worker follows a replaced artifact.
+
+    In server mode the model lives in the inference server, the worker only
+    connects to it.
+    """
+    if settings.ML_INFERENCE_MODE == "server":
+        app.state.ml_model_loading = asyncio.create_task(_connect_inference_server())
+        yield
+        return
+    if settings.ML_PRELOAD_MODEL:
+        app.state.ml_model_loading = asyncio.create_task(_load_and_warm_up())
+    watcher = None
+    if settings.ML_MODEL_WATCH_INTERVAL_SECONDS > 0:
+        watcher = asyncio.create_task(
+            _watch_model_artifact(settings.ML_MODEL_WATCH_INTERVAL_SECONDS)
+        )
+    yield
+    if watcher is not None:
+        watcher.cancel()
@@ -0,0 +1,223 @@
+"""
+In-process latency histograms for the inference path.
+
+Each stage of a prediction request is timed with ``time.perf_counter_ns``
+and recorded into a fixed-bucket log-scale histogram: recording is a bisect
+over ~200 bucket bounds and a counter increment under a lock, cheap enough
+to leave on at full traffic. Quantiles are estimated from the buckets (within
+one bucket, ~9%) and rendered in the Prometheus text format.
+
+Histograms are per process: with several workers each one reports its own.
+
+Stages:
+    parse: request received to handler start (body read, JSON decoding and
+        FastAPI validation), see ``StageTimingMiddleware``
+    validation: feature count / shape checks and conversion to float32
+    scaling: Python-side scaling, only for legacy artifacts (the bundled
+        model scales inside the ONNX graph, so it is part of inference)
+    inference: ``session.run`` (or the NumPy engine)
+    serialization: handler return to response start (response encoding)
+    total: request received to response start
+"""
+
+import bisect
+import threading
+import time
+from collections.abc import Awaitable, Callable, MutableMapping
+from typing import Any
+
+from app.core.config import settings
+
+STAGES = ("parse", "validation", "scaling", "inference", "serialization", "total")
+QUANTILES = {"p50": 0.5, "p90": 0.9, "p99": 0.99, "p999": 0.999}
+
+# Bucket upper bounds in ns: 1 µs to ~67 s, 8 buckets per doubling
+BUCKET_BOUNDS_NS = [int(1000 * 2 ** (i / 8)) for i in range(8 * 26 + 1)]
+
+# Keys of the per-request timestamps in the ASGI scope state
+_RECEIVED_KEY = "ml_received_ns"
+_HANDLED_KEY = "ml_handled_ns"
+
+Scope = MutableMapping[str, Any]
+Message = MutableMapping[str, Any]
+ASGIApp = Callable[
+    [Scope, Callable[[], Awaitable[Message]], Callable[[Message], Awaitable[None]]],
+    Awaitable[None],
+]
+
+
+class LatencyHistogram:
+    """Log-scale histogram of durations in nanoseconds."""
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        # Last bucket catches everything above the largest bound
+        self._counts = [0] * (len(BUCKET_BOUNDS_NS) + 1)
+        self.count = 0
+        self.sum_ns = 0
+        self.max_ns = 0
+
+    def record(self, duration_ns: int) -> None:
+        """Add one observation."""
+        index = bisect.bisect_left(BUCKET_BOUNDS_NS, duration_ns)
+        with self._lock:
+            self._counts[index] += 1
+            self.count += 1
+            self.sum_ns += duration_ns
+            if duration_ns > self.max_ns:
+                self.max_ns = duration_ns
+
+    def quantile(self, q: float) -> int:
+        """
+        Estimate a quantile as the upper bound of the bucket containing it,
+        capped at the largest observation. 0 without observations.
+        """
+        with self._lock:
+            rank = q * self.count
+            seen = 0
+            for index, bucket_count in enumerate(self._counts):
+                seen += bucket_count
+                if bucket_count and seen >= rank:
+                    if index == len(BUCKET_BOUNDS_NS):
+                        return self.max_ns
+                    return min(BUCKET_BOUNDS_NS[index], self.max_ns)
+            return 0
+
+    def snapshot(self) -> dict[str, Any]:
+        """Count, sum and quantiles in milliseconds."""
+        quantiles = {label: self.quantile(q) / 1e6 for label, q in QUANTILES.items()}
+        return {"count": self.count, "sum_ms": self.sum_ns / 1e6, **quantiles}
+
+
+_histograms = {stage: LatencyHistogram() for stage in STAGES}
+
+
+def record_stage(stage: str, duration_ns: int) -> None:
+    """Record the duration of a stage, no-op when metrics are disabled."""
+    if settings.ML_METRICS_ENABLED:
+        _histograms[stage].record(duration_ns)
+
+
+def get_histogram(stage: str) -> LatencyHistogram:
+    """Histogram of one stage."""
+    return _histograms[stage]
+
+
+def reset_histograms() -> None:
+    """Drop all observations."""
+    for stage in STAGES:
+        _histograms[stage] = LatencyHistogram()
+
+
+def mark_parsed(scope: Scope) -> None:
+    """Record the parse stage, call first thing in the endpoint."""
+    received = scope.get("state", {}).get(_RECEIVED_KEY)
+    if received is not None:
+        record_stage("parse", time.perf_counter_ns() - received)
+
+
+def mark_handled(scope: Scope) -> None:
+    """Start the serialization stage, call right before returning."""
+    state = scope.get("state")
+    if state is not None and _RECEIVED_KEY in state:
+        state[_HANDLED_KEY] = time.perf_counter_ns()
+
+
+class StageTimingMiddleware:
+    """
+    ASGI middleware timestamping requests for the parse, serialization and
+    total stages.
+
+    Only requests whose endpoint called ``mark_handled`` are recorded, so
+    CRUD endpoints do not pollute the inference histograms.
+    """
+
+    def __init__(self, app: ASGIApp) -> None:
+        self.app = app
+
+    async def __call__(
+        self,
+        scope: Scope,
+        receive: Callable[[], Awaitable[Message]],
+        send: Callable[[Message], Awaitable[None]],
+    ) -> None:
+        if scope["type"] != "http" or not settings.ML_METRICS_ENABLED:
+            await self.app(scope, receive, send)
+            return
+
+        received = time.perf_counter_ns()
+        state = scope.setdefault("state", {})
+        state[_RECEIVED_KEY] = received
+
+        async def timed_send(message: Message) -> None:
+            if message["type"] == "http.response.start" and _HANDLED_KEY in state:
+                now = time.perf_counter_ns()
+                record_stage("serialization", now - state[_HANDLED_KEY])
+                record_stage("total", now - received)
+            await send(message)
+
+        await self.app(scope, receive, timed_send)
+
+
+def _format_value(value: float) -> str:
+    return repr(float(value))
+
+
+def render_summary(
+    name: str, description: str, label: str, histograms: dict[str, LatencyHistogram]
+) -> str:
+    """
+    Render histograms as one Prometheus summary in seconds.
+
+    Args:
+        name: Metric name
+        description: HELP text
+        label: Label distinguishing the histograms, e.g. ``stage``
+        histograms: Label value to histogram
+    """
+    lines = [f"# HELP {name} {description}", f"# TYPE {name} summary"]
+    for value, histogram in histograms.items():
+        for q in QUANTILES.values():
+            lines.append(
+                f'{name}{{{label}="{value}",quantile="{q}"}} '
+                f"{_format_value(histogram.quantile(q) / 1e9)}"
+            )
+        lines.append(
+            f'{name}_sum{{{label}="{value}"}} {_format_value(histogram.sum_ns / 1e9)}'
+        )
+        lines.append(f'{name}_count{{{label}="{value}"}} {histogram.count}')
+    return "\n".join(lines) + "\n"
+
+
+def render_histograms(name: str = "ml_stage_duration_seconds") -> str:
+    """Render the stage histograms as a Prometheus summary."""
+    return render_summary(
+        name,
+        "Time spent in each stage of the inference path.",
+        "stage",
+        {stage: _histograms[stage] for stage in STAGES},
+    )
+
+
+def render_gauges(
+    prefix: str, values: dict[str, float], counters: tuple[str, ...] = ()
+) -> str:
+    """
+    Render flat numeric stats as Prometheus gauges.
+
+    Args:
+        prefix: Metric name prefix, e.g. ``ml_executor``
+        values: Stat name to value
+        counters: Names in ``values`` that only go up, rendered as counters
+            with a ``_total`` suffix
+    """
+    lines = []
+    for key, value in values.items():
+        if key in counters:
+            metric = f"{prefix}_{key}_total"
+            lines.append(f"# TYPE {metric} counter")
+        else:
+            metric = f"{prefix}_{key}"
+            lines.append(f"# TYPE {metric} gauge")
+        lines.append(f"{metric} {_format_value(value)}")
+    return "\n".join(lines) + "\n"
@@ -1,84 +1,351 @@
-import os
+import hashlib
+import threading
 import time
+import warnings
 from pathlib import Path
+from typing import Any, NamedTuple
 
 import numpy as np
 import onnxruntime as ort
-from sklearn.ensemble import RandomForestRegressor
-from sklearn.preprocessing import StandardScaler
-from skl2onnx import convert_sklearn
-from skl2onnx.common.data_types import FloatTensorType
+
+from app.core.config import settings
+from app.ml.forest import TreeEnsemble, load_forest
+from app.ml.metrics import record_stage
+
+# ONNX metadata key marking artifacts whose graph already applies the scaler
+EMBEDDED_SCALER_KEY = "embedded_scaler"
+
+EXECUTION_MODES = {
+    "sequential": ort.ExecutionMode.ORT_SEQUENTIAL,
+    "parallel": ort.ExecutionMode.ORT_PARALLEL,
+}
+GRAPH_OPTIMIZATION_LEVELS = {
+    "disable": ort.GraphOptimizationLevel.ORT_DISABLE_ALL,
+    "basic": ort.GraphOptimizationLevel.ORT_ENABLE_BASIC,
+    "extended": ort.GraphOptimizationLevel.ORT_ENABLE_EXTENDED,
+    "all": ort.GraphOptimizationLevel.ORT_ENABLE_ALL,
+}
+
+
+def build_session_options() -> ort.SessionOptions:
+    """Build ONNX Runtime session options from settings."""
+    options = ort.SessionOptions()
+    options.intra_op_num_threads = settings.ML_ORT_INTRA_OP_NUM_THREADS
+    options.inter_op_num_threads = settings.ML_ORT_INTER_OP_NUM_THREADS
+    options.execution_mode = EXECUTION_MODES[settings.ML_ORT_EXECUTION_MODE]
+    options.graph_optimization_level = GRAPH_OPTIMIZATION_LEVELS[
+        settings.ML_ORT_GRAPH_OPTIMIZATION_LEVEL
+    ]
+    options.enable_cpu_mem_arena = settings.ML_ORT_ENABLE_CPU_MEM_ARENA
+    options.enable_mem_pattern = settings.ML_ORT_ENABLE_MEM_PATTERN
+    return options
+
+
+def get_execution_providers() -> list[str]:
+    """
+    Get the configured execution providers available in this build.
+
+    Unavailable providers (e.g. CUDA on a CPU-only image) are skipped with a
+    warning and the CPU provider is always kept as the last fallback.
+    """
+    available = ort.get_available_providers()
+    providers = []
+    for provider in settings.ONNXRUNTIME_EXECUTION_PROVIDERS:
+        if provider in available:
+            providers.append(provider)
+        else:
+            warnings.warn(
+                f"ONNX Runtime execution provider {provider} is not available, "
+                f"skipping it (available: {', '.join(available)})",
+                stacklevel=2,
+            )
+    if "CPUExecutionProvider" not in providers:
+        providers.append("CPUExecutionProvider")
+    return providers
+
+
+class ScalerParams(NamedTuple):
+    """Mean and scale of a fitted StandardScaler, for legacy artifacts."""
+
+    mean: np.ndarray[Any, Any]
+    scale: np.ndarray[Any, Any]
+
+    def transform(self, X: np.ndarray[Any, Any]) -> np.ndarray[Any, Any]:
+        """Standardize features like ``StandardScaler.transform``."""
+        scaled: np.ndarray[Any, Any] = ((X - self.mean) / self.scale).astype(np.float32)
+        return scaled
+
+
+def optimized_model_path(model_path: Path, model_format: str | None = None) -> Path:
+    """Path of the pre-optimized artifact stored next to ``model_path``."""
+    model_format = model_format or settings.ML_ORT_OPTIMIZED_MODEL_FORMAT
+    suffix = ".ort" if model_format == "ort" else ".optimized.onnx"
+    return model_path.with_suffix(suffix)
+
+
+def variant_path(model_path: Path, variant: str) -> Path:
+    """Path of a model variant stored next to ``model_path``."""
+    return model_path.with_name(f"{model_path.stem}.{variant}{model_path.suffix}")
+
+
+def save_optimized_model(
+    model_path: Path | None = None, model_format: str | None = None
+) -> Path:
+    """
+    Run ONNX Runtime graph optimizations once and serialize the result.
+
+    Meant to run at build time so workers can load the optimized graph with
+    optimizations disabled. Optimization is capped at the "extended" level,
+    the highest one whose output is portable across machines.
+
+    Args:
+        model_path: Source ONNX model, defaults to the bundled ``model.onnx``
+        model_format: "ort" (ORT flatbuffer format) or "onnx"
+
+    Returns:
+        Path of the written optimized model
+    """
+    model_path = model_path or Path(__file__).parent / "model.onnx"
+    output_path = optimized_model_path(model_path, model_format)
+
+    options = build_session_options()
+    options.graph_optimization_level = min(
+        options.graph_optimization_level,
+        ort.GraphOptimizationLevel.ORT_ENABLE_EXTENDED,
+        key=int,
+    )
+    options.optimized_model_filepath = str(output_path)
+    if output_path.suffix == ".ort":
+        options.add_session_config_entry("session.save_model_format", "ORT")
+    ort.InferenceSession(
+        str(model_path),
+        sess_options=options,
+        providers=get_execution_providers(),
+    )
+    return output_path
+
+
+def artifact_version(model_path: Path) -> str:
+    """Content hash of a model artifact, changes whenever it is replaced."""
+    return hashlib.sha256(model_path.read_bytes()).hexdigest()[:12]
 
 
 class MLModel:
     """ML Model wrapper with ONNX support and latency measurement."""
 
-    def __init__(self):
-        self.model_path = Path(__file__).parent / "model.onnx"
-        self.scaler_path = Path(__file__).parent / "scaler.npy"
-        self.session = None
-        self.scaler = None
+    def __init__(
+        self,
+        model_path: Path | None = None,
+        scaler_path: Path | None = None,
+        use_optimized_model: bool | None = None,
+        engine: str | None = None,
+        variant: str | None = None,
+    ):
+        self.model_path = model_path or Path(__file__).parent / "model.onnx"
+        # Path before the variant is applied, to rebuild the model on reload
+        self.base_model_path = self.model_path
+        if variant is None:
+            variant = settings.ML_MODEL_VARIANT
+        self.variant = variant or None
+        if self.variant:
+            self.model_path = variant_path(self.model_path, self.variant)
+        if use_optimized_model is None:
+            use_optimized_model = settings.ML_ORT_USE_OPTIMIZED_MODEL
+        self.use_optimized_model = use_optimized_model
+        self.engine = engine or settings.ML_INFERENCE_ENGINE
+        if self.engine not in ("onnx", "numpy"):
+            raise ValueError(f"Unknown inference engine: {self.engine}")
+        # File the session was actually loaded from
+        self.session_path = self.model_path
+        self.version: str | None = None
+        # Only used by legacy artifacts that keep the scaler outside the graph
+        self.scaler_path = scaler_path or self.model_path.with_name("scaler.npy")
+        # onnxruntime is untyped
+        self.session: Any = None
+        self.session_options: Any = None
+        self.scaler: ScalerParams | None = None
+        # Compiled tree ensemble, only with the "numpy" engine
+        self.forest: TreeEnsemble | None = None
+        self._input_name: str | None = None
+        self._output_name: str | None = None
+        # Per-thread preallocated single-row buffers, see _single_row_binding
+        self._local = threading.local()
         self._load_or_train_model()
 
-    def _load_or_train_model(self):
+    def _load_or_train_model(self) -> None:
         """Load model from ONNX or train and save if not exists."""
-        if self.model_path.exists() and self.scaler_path.exists():
+        if self.model_path.exists():
             self._load_model()
+        elif self.variant:
+            raise FileNotFoundError(
+                f"Model variant {self.variant!r} not found at {self.model_path}, "
+                "build it with scripts/build_model_variants.py"
+            )
         else:
             self._train_and_save_model()
 
-    def _train_and_save_model(self):
-        """Train a Random Forest model and save to ONNX format."""
-        # Generate synthetic training data
-        np.random.seed(42)
-        X_train = np.random.randn(1000, 5).astype(np.float32)
-        y_train = (
-            2 * X_train[:, 0]
-            + 3 * X_train[:, 1]
-            - X_train[:, 2]
-            + 0.5 * X_train[:, 3]
-            + np.random.randn(1000) * 0.1
-        )
+    def _train_and_save_model(self) -> None:
+        """Train and save the model, then load it."""
+        # Imported lazily: serving never needs scikit-learn or skl2onnx
+        from app.ml.training import train_and_save_model
+
+        train_and_save_model(self.model_path)
+        self._load_model()
+
+    def _load_model(self) -> None:
+        """Load ONNX model (and scaler for legacy artifacts) from disk."""
+        self.session_options = build_session_options()
+        self.session_path = self.model_path
+        self.version = artifact_version(self.model_path)
 
-        # Train scaler
-        self.scaler = StandardScaler()
-        X_train_scaled = self.scaler.fit_transform(X_train).astype(np.float32)
+        optimized_path = optimized_model_path(self.model_path)
+        if (
+            self.use_optimized_model
+            and optimized_path.exists()
+            and optimized_path.stat().st_mtime >= self.model_path.stat().st_mtime
+        ):
+            # Graph was optimized at build time, skip doing it again
+            self.session_path = optimized_path
+            self.session_options.graph_optimization_level = (
+                ort.GraphOptimizationLevel.ORT_DISABLE_ALL
+            )
 
-        # Train Random Forest model
-        model = RandomForestRegressor(
-            n_estimators=50,
-            max_depth=10,
-            random_state=42,
-            n_jobs=-1,
+        self.session = ort.InferenceSession(
+            str(self.session_path),
+            sess_options=self.session_options,
+            providers=get_execution_providers(),
         )
-        model.fit(X_train_scaled, y_train)
+        self._input_name = self.session.get_inputs()[0].name
+        self._output_name = self.session.get_outputs()[0].name
+        self.forest = load_forest(self.model_path) if self.engine == "numpy" else None
 
-        # Convert to ONNX
-        initial_type = [("float_input", FloatTensorType([None, 5]))]
-        onnx_model = convert_sklearn(model, initial_types=initial_type)
+        metadata = self.session.get_modelmeta().custom_metadata_map
+        if metadata.get(EMBEDDED_SCALER_KEY) == "true":
+            self.scaler = None
+            return
 
-        # Save ONNX model and scaler
-        with open(self.model_path, "wb") as f:
-            f.write(onnx_model.SerializeToString())
+        # Legacy model.onnx + scaler.npy pair: scale in Python before inference
+        if not self.scaler_path.exists():
+            raise FileNotFoundError(
+                f"{self.model_path} has no embedded scaler and "
+                f"{self.scaler_path} is missing"
+            )
+        scaler_data = np.load(self.scaler_path, allow_pickle=True)
+        self.scaler = ScalerParams(mean=scaler_data[0], scale=scaler_data[1])
 
-        np.save(self.scaler_path, [self.scaler.mean_, self.scaler.scale_])
+    def runtime_info(self) -> dict[str, Any]:
+        """Describe the ONNX Runtime configuration the session runs with."""
+        options = self.session_options
+        execution_modes = {v: k for k, v in EXECUTION_MODES.items()}
+        optimization_levels = {v: k for k, v in GRAPH_OPTIMIZATION_LEVELS.items()}
+        return {
+            "model_version": self.version,
+            "engine": self.engine,
+            "variant": self.variant,
+            "model_file": self.session_path.name,
+            "pre_optimized": self.session_path != self.model_path,
+            "providers": self.session.get_providers(),
+            "intra_op_num_threads": options.intra_op_num_threads,
+            "inter_op_num_threads": options.inter_op_num_threads,
+            "execution_mode": execution_modes[options.execution_mode],
+            "graph_optimization_level": optimization_levels[
+                options.graph_optimization_level
+            ],
+            "enable_cpu_mem_arena": options.enable_cpu_mem_arena,
+            "enable_mem_pattern": options.enable_mem_pattern,
+        }
 
-        # Load the model
-        self._load_model()
+    def warmup(self, batch_sizes: list[int], iterations: int = 1) -> None:
+        """
+        Run throwaway inferences so ONNX Runtime finishes its lazy
+        initialization (allocations, thread pools) before real traffic.
 
-    def _load_model(self):
-        """Load ONNX model and scaler from disk."""
-        self.session = ort.InferenceSession(
-            str(self.model_path),
-            providers=["CPUExecutionProvider"],
-        )
+        Args:
+            batch_sizes: Batch sizes to warm up, 1 also warms the fast path
+            iterations: Number of inferences per batch size
+        """
+        for batch_size in batch_sizes:
+            X = np.zeros((batch_size, 5), dtype=np.float32)
+            for _ in range(iterations):
+                if batch_size == 1:
+                    self._infer_one(X[0].tolist())
+                self._infer(X)
 
-        scaler_data = np.load(self.scaler_path, allow_pickle=True)
-        self.scaler = StandardScaler()
-        self.scaler.mean_ = scaler_data[0]
-        self.scaler.scale_ = scaler_data[1]
+    def _infer(self, X: np.ndarray[Any, Any]) -> np.ndarray[Any, Any]:
+        """
+        Scale and run inference on a stacked (N, 5) feature matrix.
+
+        Args:
+            X: Float32 array of shape (N, 5) with raw (unscaled) features
+
+        Returns:
+            Array of N predictions
+        """
+        if self.scaler is not None:
+            scaling_start = time.perf_counter_ns()
+            X = self.scaler.transform(X)
+            record_stage("scaling", time.perf_counter_ns() - scaling_start)
+        inference_start = time.perf_counter_ns()
+        if self.forest is not None:
+            predictions = self.forest.predict(X)
+        else:
+            predictions = self.session.run(
+                [self._output_name],
+                {self._input_name: X},
+            )[0].reshape(-1)
+        record_stage("inference", time.perf_counter_ns() - inference_start)
+        return predictions
+
+    def _single_row_binding(
+        self,
+    ) -> tuple[ort.IOBinding, np.ndarray[Any, Any], np.ndarray[Any, Any]]:
+        """
+        Get this thread's IOBinding with preallocated (1, 5) input and (1, 1)
+        output buffers.
+
+        The OrtValues wrap the NumPy buffers without copying, so writing
+        features into the input array and running the binding needs no
+        allocation per call. Buffers are rebuilt if the session changes.
+        """
+        state = getattr(self._local, "state", None)
+        if state is None or state[0] is not self.session:
+            X = np.zeros((1, 5), dtype=np.float32)
+            y = np.zeros((1, 1), dtype=np.float32)
+            binding = self.session.io_binding()
+            binding.bind_ortvalue_input(
+                self._input_name, ort.OrtValue.ortvalue_from_numpy(X)
+            )
+            binding.bind_ortvalue_output(
+                self._output_name, ort.OrtValue.ortvalue_from_numpy(y)
+            )
+            state = (self.session, binding, X, y)
+            self._local.state = state
+        return state[1], state[2], state[3]
+
+    def _infer_one(self, data: list[float]) -> float:
+        """
+        Run inference on a single row through the preallocated fast path.
+
+        Args:
+            data: List of 5 float values
 
-    def predict(self, data: list[float]) -> dict:
+        Returns:
+            The prediction
+        """
+        if self.scaler is not None or self.forest is not None:
+            # Legacy artifacts need Python-side scaling and the NumPy engine
+            # has no ONNX Runtime binding, no fast path
+            return float(
+                self._infer(np.array(data, dtype=np.float32).reshape(1, -1))[0]
+            )
+        binding, X, y = self._single_row_binding()
+        X[0] = data
+        inference_start = time.perf_counter_ns()
+        self.session.run_with_iobinding(binding)
+        record_stage("inference", time.perf_counter_ns() - inference_start)
+        return float(y[0, 0])
+
+    def predict(self, data: list[float]) -> dict[str, Any]:
         """
         Make prediction on input data.
 
@@ -88,53 +355,181 @@ class MLModel:
         Returns:
             Dictionary with prediction and latency info
         """
-        start_time = time.time()
+        start = time.perf_counter_ns()
 
         # Validate input
         if len(data) != 5:
             raise ValueError(f"Expected 5 features, got {len(data)}")
+        inference_start = time.perf_counter_ns()
+        record_stage("validation", inference_start - start)
 
-        # Prepare input
-        X = np.array(data, dtype=np.float32).reshape(1, -1)
+        # Run inference on preallocated buffers
+        prediction = self._infer_one(data)
+        end = time.perf_counter_ns()
 
-        # Scale features
-        X_scaled = self.scaler.transform(X).astype(np.float32)
+        return {
+            "prediction": prediction,
+            "latency_ms": round((end - inference_start) / 1e6, 4),
+            "total_time_ms": round((end - start) / 1e6, 4),
+            "model_format": "ONNX",
+            "features_count": 5,
+            "model_version": self.version,
+        }
 
-        # Run inference
-        inference_start = time.time()
-        input_name = self.session.get_inputs()[0].name
-        output_name = self.session.get_outputs()[0].name
-        prediction = self.session.run(
-            [output_name],
-            {input_name: X_scaled},
-        )
-        inference_time = (time.time() - inference_start) * 1000  # ms
+    def predict_batch(
+        self, data: np.ndarray[Any, Any] | list[list[float]]
+    ) -> dict[str, Any]:
+        """
+        Make predictions on a batch of rows in a single inference call.
+
+        Args:
+            data: Array-like of shape (N, 5)
+
+        Returns:
+            Dictionary with predictions array and latency info
+        """
+        start = time.perf_counter_ns()
+
+        # Validate input
+        X = np.asarray(data, dtype=np.float32)
+        if X.ndim != 2 or X.shape[1] != 5:
+            raise ValueError(f"Expected an (N, 5) array, got shape {X.shape}")
+        if X.shape[0] == 0:
+            raise ValueError("Expected at least one row")
+        inference_start = time.perf_counter_ns()
+        record_stage("validation", inference_start - start)
 
-        # Total time
-        total_time = (time.time() - start_time) * 1000  # ms
+        # Scale features and run inference
+        predictions = self._infer(X)
+        end = time.perf_counter_ns()
 
         return {
-            "prediction": float(prediction[0][0]),
-            "latency_ms": round(inference_time, 4),
-            "total_time_ms": round(total_time, 4),
+            "predictions": predictions,
+            "count": int(X.shape[0]),
+            "latency_ms": round((end - inference_start) / 1e6, 4),
+            "total_time_ms": round((end - start) / 1e6, 4),
             "model_format": "ONNX",
             "features_count": 5,
+            "model_version": self.version,
         }
 
 
 # Initialize model on module load
 _model_instance = None
+_model_lock = threading.RLock()
+# One of: not_loaded, loading, warming_up, ready, failed
+_model_status = "not_loaded"
+_model_error = None
+# Serializes hot reloads, readers never take it
+_reload_lock = threading.Lock()
+_last_reload_error = None
+
+
+def _set_model_status(status: str, error: str | None = None) -> None:
+    global _model_status, _model_error
+    _model_status = status
+    _model_error = error
+
+
+def get_model_status() -> dict[str, Any]:
+    """Report the model loading state without triggering loading."""
+    return {
+        "status": _model_status,
+        "error": _model_error,
+        "model_version": _model_instance.version if _model_instance else None,
+        "last_reload_error": _last_reload_error,
+    }
+
+
+def load_model(
+    warmup_batch_sizes: list[int] | None = None, warmup_iterations: int = 0
+) -> MLModel:
+    """
+    Load the model singleton and optionally warm it up before marking it ready.
+
+    Concurrent callers of ``get_model()`` wait until loading and warmup are
+    done instead of loading a second copy.
+
+    Args:
+        warmup_batch_sizes: Batch sizes to run warmup inferences with
+        warmup_iterations: Number of warmup inferences per batch size
+
+    Returns:
+        The loaded model
+    """
+    global _model_instance
+    with _model_lock:
+        if _model_instance is not None:
+            return _model_instance
+        _set_model_status("loading")
+        try:
+            model = MLModel()
+            if warmup_batch_sizes and warmup_iterations > 0:
+                _set_model_status("warming_up")
+                model.warmup(warmup_batch_sizes, warmup_iterations)
+        except Exception as e:
+            _set_model_status("failed", str(e))
+            raise
+        _model_instance = model
+        _set_model_status("ready")
+        return model
 
 
 def get_model() -> MLModel:
     """Get or create model instance (singleton)."""
-    global _model_instance
     if _model_instance is None:
-        _model_instance = MLModel()
+        return load_model()
     return _model_instance
 
 
-def predict(data: list[float]) -> dict:
-    """Convenience function to make predictions."""
+def reload_model(force: bool = False) -> bool:
+    """
+    Build and warm up a new model from the artifact, then swap it in.
+
+    The swap is a single reference assignment: requests that already got the
+    previous model from ``get_model()`` finish on its session, new requests
+    use the new one. On failure the current model keeps serving.
+
+    Args:
+        force: Reload even if the artifact content did not change
+
+    Returns:
+        True if a new model was swapped in, False if the artifact is unchanged
+    """
+    global _model_instance, _last_reload_error
+    with _reload_lock:
+        current = get_model()
+        try:
+            if not current.model_path.exists():
+                raise FileNotFoundError(f"{current.model_path} does not exist")
+            if not force and artifact_version(current.model_path) == current.version:
+                return False
+            model = MLModel(
+                model_path=current.base_model_path,
+                use_optimized_model=current.use_optimized_model,
+                engine=current.engine,
+                variant=current.variant or "",
+            )
+            model.warmup(settings.ML_WARMUP_BATCH_SIZES, settings.ML_WARMUP_ITERATIONS)
+        except Exception as e:
+            _last_reload_error = str(e)
+            raise
+        _model_instance = model
+        _last_reload_error = None
+        return True
+
+
+def predict(data: list[float]) -> dict[str, Any]:
+    """Convenience function to make predictions, through the cache if enabled."""
+    model = get_model()
+    if settings.ML_CACHE_ENABLED:
+        from app.ml.cache import get_prediction_cache
+
+        return get_prediction_cache().predict(model, data)
+    return model.predict(data)
+
+
+def predict_batch(data: np.ndarray[Any, Any] | list[list[float]]) -> dict[str, Any]:
+    """Convenience function to make batch predictions."""
     model = get_model()
-    return model.predict(data)
\ No newline at end of file
+    return model.predict_batch(data)
@@ -0,0 +1,514 @@
+"""
+Shared inference process for all web workers (``ML_INFERENCE_MODE=server``).
+
+With ``fastapi run --workers N`` every worker otherwise loads its own
+``InferenceSession`` and thread pool. In server mode a single process started
+with ``scripts/inference_server.py`` owns the model, and the web workers send
+it their inputs:
+
+- each worker (``InferenceClient``) creates a shared memory segment split
+  into ``ML_SERVER_SLOTS`` slots of ``ML_SERVER_SLOT_ROWS`` rows, an input
+  (rows, 5) float32 matrix and an output (rows,) float32 vector per slot
+- it connects to the Unix socket ``ML_INFERENCE_SOCKET`` and sends one JSON
+  line naming its segment, the server answers with the model version
+- a request writes its features into a free slot and sends a ``(slot, rows)``
+  frame, the server writes the predictions into the same slot and answers
+  ``(slot, status)``; feature data never goes through the socket
+- the server drains the requests of all workers into batches of up to
+  ``ML_SERVER_MAX_BATCH_ROWS`` rows scored with one inference call, on
+  ``ML_SERVER_WORKERS`` threads; at most ``ML_SERVER_MAX_QUEUE`` requests
+  wait for a batch, further ones are answered ``STATUS_BUSY`` and fail with
+  ``InferenceQueueFull`` in the web worker
+
+Larger requests are split over several slots. When all slots of a worker are
+busy, further requests wait for one to free up.
+
+The server maps any segment a client names, so the socket is only
+accessible to its owner (mode 0600): the web workers must run as the same
+user as the inference server.
+"""
+
+import asyncio
+import json
+import logging
+import os
+import struct
+import time
+from concurrent.futures import ThreadPoolExecutor
+from multiprocessing import resource_tracker, shared_memory
+from pathlib import Path
+from typing import Any, NamedTuple
+
+import numpy as np
+from fastapi import Request
+from fastapi.responses import JSONResponse
+
+from app.core.config import settings
+from app.ml.executor import InferenceQueueFull
+from app.ml.model import MLModel
+
+logger = logging.getLogger(__name__)
+
+N_FEATURES = 5
+
+# (slot, rows) requests and (slot, status) replies
+FRAME = struct.Struct("<II")
+STATUS_OK = 0
+STATUS_ERROR = 1
+STATUS_BUSY = 2
+
+_FLOAT32 = np.dtype(np.float32)
+
+
+class InferenceServerUnavailable(Exception):
+    """Raised when the inference server cannot be reached."""
+
+
+def segment_size(slots: int, slot_rows: int) -> int:
+    """Bytes of a client's shared memory segment."""
+    return slots * slot_rows * (N_FEATURES + 1) * _FLOAT32.itemsize
+
+
+def _slot_arrays(
+    buffer: Any, slots: int, slot_rows: int
+) -> tuple[np.ndarray[Any, Any], np.ndarray[Any, Any]]:
+    """Input (slots, rows, 5) and output (slots, rows) views of a segment."""
+    inputs: np.ndarray[Any, Any] = np.ndarray(
+        (slots, slot_rows, N_FEATURES), dtype=_FLOAT32, buffer=buffer
+    )
+    outputs: np.ndarray[Any, Any] = np.ndarray(
+        (slots, slot_rows), dtype=_FLOAT32, buffer=buffer, offset=inputs.nbytes
+    )
+    return inputs, outputs
+
+
+class _Connection:
+    """Server side of one client: its segment, released once idle and closed."""
+
+    def __init__(self, writer: asyncio.StreamWriter, hello: dict[str, Any]):
+        self.slots = int(hello["slots"])
+        self.slot_rows = int(hello["slot_rows"])
+        self.shm: shared_memory.SharedMemory | None = shared_memory.SharedMemory(
+            name=hello["shm"]
+        )
+        # The client owns the segment, do not let this process' resource
+        # tracker unlink it on exit (Python < 3.13 registers attached segments)
+        resource_tracker.unregister(self.shm._name, "shared_memory")  # type: ignore[attr-defined]
+        if self.shm.size < segment_size(self.slots, self.slot_rows):
+            self.shm.close()
+            raise ValueError("Shared memory segment is too small")
+        self.inputs, self.outputs = _slot_arrays(
+            self.shm.buf, self.slots, self.slot_rows
+        )
+        self.writer = writer
+        self.pending = 0
+        self.closed = False
+
+    def release(self) -> None:
+        """Unmap the segment once the client is gone and nothing is pending."""
+        if self.closed and not self.pending and self.shm is not None:
+            del self.inputs, self.outputs
+            self.shm.close()
+            self.shm = None
+
+
+class _Request(NamedTuple):
+    connection: _Connection
+    slot: int
+    rows: int
+
+
+class InferenceServer:
+    """
+    Serve inference requests of all web workers on a Unix socket.
+
+    Args:
+        model: Model scoring the requests
+        socket_path: Unix socket to listen on, replaced if it exists
+        max_batch_rows: Rows above which no more requests join a batch
+        window_ms: Time a batch waits for more requests, 0 only takes the
+            requests already queued
+        workers: Batches scored concurrently
+        max_queue: Requests waiting for a batch above which further ones are
+            answered ``STATUS_BUSY``
+    """
+
+    def __init__(
+        self,
+        model: MLModel,
+        socket_path: str | Path,
+        max_batch_rows: int = 8192,
+        window_ms: float = 0,
+        workers: int = 1,
+        max_queue: int = 1024,
+    ):
+        self.model = model
+        self.socket_path = Path(socket_path)
+        self.max_batch_rows = max_batch_rows
+        self.window_ms = window_ms
+        self.workers = workers
+        self._queue: asyncio.Queue[_Request] = asyncio.Queue(maxsize=max_queue)
+        self._pool = ThreadPoolExecutor(
+            max_workers=workers, thread_name_prefix="inference-server"
+        )
+        self._writers: set[asyncio.StreamWriter] = set()
+        self.batches = 0
+        self.rows = 0
+        self.rejected = 0
+
+    async def serve_forever(self, ready: asyncio.Event | None = None) -> None:
+        """Listen until cancelled, ``ready`` is set once accepting."""
+        self.socket_path.unlink(missing_ok=True)
+        # Listen only once the socket is private, see the module docstring
+        server = await asyncio.start_unix_server(
+            self._handle, path=self.socket_path, start_serving=False
+        )
+        os.chmod(self.socket_path, 0o600)
+        batchers = [
+            asyncio.create_task(self._batch_loop()) for _ in range(self.workers)
+        ]
+        logger.info(
+            "Inference server listening on %s, model %s",
+            self.socket_path,
+            self.model.version,
+        )
+        if ready is not None:
+            ready.set()
+        try:
+            async with server:
+                await server.serve_forever()
+        finally:
+            for batcher in batchers:
+                batcher.cancel()
+            # Python < 3.12 servers do not close client connections
+            for writer in self._writers:
+                writer.close()
+            self._pool.shutdown(wait=False)
+            self.socket_path.unlink(missing_ok=True)
+
+    async def _handle(
+        self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter
+    ) -> None:
+        try:
+            connection = _Connection(writer, json.loads(await reader.readline()))
+        except (ValueError, KeyError, TypeError, OSError) as e:
+            writer.write(json.dumps({"error": str(e)}).encode() + b"\n")
+            writer.close()
+            return
+        hello = {"model_version": self.model.version, "engine": self.model.engine}
+        writer.write(json.dumps(hello).encode() + b"\n")
+        self._writers.add(writer)
+        try:
+            while True:
+                slot, rows = FRAME.unpack(await reader.readexactly(FRAME.size))
+                if slot >= connection.slots or not 0 < rows <= connection.slot_rows:
+                    writer.write(FRAME.pack(slot, STATUS_ERROR))
+                    continue
+                try:
+                    self._queue.put_nowait(_Request(connection, slot, rows))
+                except asyncio.QueueFull:
+                    self.rejected += 1
+                    writer.write(FRAME.pack(slot, STATUS_BUSY))
+                    continue
+                connection.pending += 1
+        except (asyncio.IncompleteReadError, ConnectionError):
+            pass
+        finally:
+            self._writers.discard(writer)
+            connection.closed = True
+            connection.release()
+            writer.close()
+
+    async def _next_batch(self) -> list[_Request]:
+        batch = [await self._queue.get()]
+        rows = batch[0].rows
+        deadline = time.monotonic() + self.window_ms / 1000
+        while rows < self.max_batch_rows:
+            if self._queue.empty():
+                timeout = deadline - time.monotonic()
+                if timeout <= 0:
+                    break
+                try:
+                    request = await asyncio.wait_for(self._queue.get(), timeout)
+                except asyncio.TimeoutError:
+                    break
+            else:
+                request = self._queue.get_nowait()
+            batch.append(request)
+            rows += request.rows
+        return batch
+
+    async def _batch_loop(self) -> None:
+        loop = asyncio.get_running_loop()
+        while True:
+            batch = await self._next_batch()
+            live = [r for r in batch if not r.connection.closed]
+            status = STATUS_OK
+            if live:
+                # Copied out of the segments, so they can be released meanwhile
+                X = np.concatenate(
+                    [r.connection.inputs[r.slot, : r.rows] for r in live]
+                )
+                try:
+                    predictions = await loop.run_in_executor(
+                        self._pool, self.model._infer, X
+                    )
+                except Exception:
+                    logger.exception("Inference failed for a batch of %d rows", len(X))
+                    status = STATUS_ERROR
+                self.batches += 1
+                self.rows += len(X)
+
+            offset = 0
+            for request in live:
+                connection = request.connection
+                if not connection.closed:
+                    if status == STATUS_OK:
+                        connection.outputs[request.slot, : request.rows] = predictions[
+                            offset : offset + request.rows
+                        ]
+                    connection.writer.write(FRAME.pack(request.slot, status))
+                offset += request.rows
+            for request in batch:
+                request.connection.pending -= 1
+                request.connection.release()
+
+
+class InferenceClient:
+    """
+    Web worker side of the inference server.
+
+    Connects lazily and reconnects after the server restarts; the shared
+    memory segment lives as long as the client.
+    """
+
+    def __init__(self, socket_path: str | Path, slots: int = 64, slot_rows: int = 1024):
+        self.socket_path = Path(socket_path)
+        self.slots = slots
+        self.slot_rows = slot_rows
+        self.model_version: str | None = None
+        self.error: str | None = None
+        self._shm = shared_memory.SharedMemory(
+            create=True, size=segment_size(slots, slot_rows)
+        )
+        self._inputs, self._outputs = _slot_arrays(self._shm.buf, slots, slot_rows)
+        self._free: asyncio.Queue[int] = asyncio.Queue()
+        for slot in range(slots):
+            self._free.put_nowait(slot)
+        self._futures: dict[int, asyncio.Future[int]] = {}
+        # Slots of cancelled requests, still owned by the server until it
+        # replies: reusing them earlier would hand that reply to a new request
+        self._orphaned: set[int] = set()
+        self._writer: asyncio.StreamWriter | None = None
+        self._reader_task: asyncio.Task[None] | None = None
+        self._connect_lock = asyncio.Lock()
+
+    @property
+    def connected(self) -> bool:
+        return self._writer is not None and not self._writer.is_closing()
+
+    async def connect(self) -> None:
+        """
+        Connect to the server if not connected.
+
+        Raises:
+            InferenceServerUnavailable: If the server cannot be reached
+        """
+        async with self._connect_lock:
+            if self.connected:
+                return
+            try:
+                reader, writer = await asyncio.open_unix_connection(self.socket_path)
+                hello = {
+                    "shm": self._shm.name,
+                    "slots": self.slots,
+                    "slot_rows": self.slot_rows,
+                }
+                writer.write(json.dumps(hello).encode() + b"\n")
+                reply = json.loads(await reader.readline() or b"{}")
+            except (OSError, ValueError) as e:
+                self.error = f"Inference server unreachable: {e}"
+                raise InferenceServerUnavailable(self.error) from None
+            if "model_version" not in reply:
+                writer.close()
+                self.error = reply.get("error", "Inference server handshake failed")
+                raise InferenceServerUnavailable(self.error)
+            self.model_version = reply["model_version"]
+            self.error = None
+            self._writer = writer
+            self._reader_task = asyncio.create_task(self._read_replies(reader))
+
+    async def _read_replies(self, reader: asyncio.StreamReader) -> None:
+        try:
+            while True:
+                slot, status = FRAME.unpack(await reader.readexactly(FRAME.size))
+                future = self._futures.pop(slot, None)
+                if slot in self._orphaned:
+                    self._orphaned.discard(slot)
+                    self._free.put_nowait(slot)
+                elif future is not None and not future.done():
+                    future.set_result(status)
+        except (asyncio.IncompleteReadError, ConnectionError):
+            pass
+        finally:
+            self.error = "Connection to the inference server lost"
+            if self._writer is not None:
+                self._writer.close()
+            self._writer = None
+            for future in self._futures.values():
+                if not future.done():
+                    future.set_exception(InferenceServerUnavailable(self.error))
+            self._futures.clear()
+            # No reply will come for them on a new connection
+            for slot in self._orphaned:
+                self._free.put_nowait(slot)
+            self._orphaned.clear()
+
+    async def _run_slot(
+        self, X: np.ndarray[Any, Any], out: np.ndarray[Any, Any]
+    ) -> None:
+        slot = await self._free.get()
+        future: asyncio.Future[int] | None = None
+        try:
+            if self._writer is None:
+                raise InferenceServerUnavailable(self.error or "Not connected")
+            rows = len(X)
+            self._inputs[slot, :rows] = X
+            future = asyncio.get_running_loop().create_future()
+            self._futures[slot] = future
+            self._writer.write(FRAME.pack(slot, rows))
+            status = await future
+            if status == STATUS_BUSY:
+                raise InferenceQueueFull(settings.ML_EXECUTOR_RETRY_AFTER_SECONDS)
+            if status != STATUS_OK:
+                raise RuntimeError("Inference failed on the inference server")
+            out[:] = self._outputs[slot, :rows]
+        finally:
+            if (
+                future is not None
+                and future.cancelled()
+                and self._futures.get(slot) is future
+            ):
+                # Cancelled while the server owns the slot, _read_replies
+                # frees it on the reply
+                self._orphaned.add(slot)
+            else:
+                self._free.put_nowait(slot)
+
+    async def infer(self, X: np.ndarray[Any, Any]) -> np.ndarray[Any, Any]:
+        """
+        Score an (N, 5) float32 matrix on the server.
+
+        Raises:
+            InferenceServerUnavailable: If the server cannot be reached
+            InferenceQueueFull: If the server's queue is full
+        """
+        await self.connect()
+        predictions = np.empty(len(X), dtype=_FLOAT32)
+        await asyncio.gather(
+            *(
+                self._run_slot(
+                    X[i : i + self.slot_rows], predictions[i : i + self.slot_rows]
+                )
+                for i in range(0, len(X), self.slot_rows)
+            )
+        )
+        return predictions
+
+    async def predict(self, data: list[float]) -> dict[str, Any]:
+        """Same result as ``MLModel.predict``, scored on the server."""
+        start = time.perf_counter_ns()
+        if len(data) != N_FEATURES:
+            raise ValueError(f"Expected {N_FEATURES} features, got {len(data)}")
+        X = np.asarray([data], dtype=_FLOAT32)
+        inference_start = time.perf_counter_ns()
+        (prediction,) = await self.infer(X)
+        end = time.perf_counter_ns()
+        return {
+            "prediction": float(prediction),
+            "latency_ms": round((end - inference_start) / 1e6, 4),
+            "total_time_ms": round((end - start) / 1e6, 4),
+            "model_format": "ONNX",
+            "features_count": N_FEATURES,
+            "model_version": self.model_version,
+        }
+
+    async def predict_batch(
+        self, data: np.ndarray[Any, Any] | list[list[float]]
+    ) -> dict[str, Any]:
+        """Same result as ``MLModel.predict_batch``, scored on the server."""
+        start = time.perf_counter_ns()
+        X = np.asarray(data, dtype=_FLOAT32)
+        if X.ndim != 2 or X.shape[1] != N_FEATURES:
+            raise ValueError(f"Expected an (N, 5) array, got shape {X.shape}")
+        if X.shape[0] == 0:
+            raise ValueError("Expected at least one row")
+        inference_start = time.perf_counter_ns()
+        predictions = await self.infer(X)
+        end = time.perf_counter_ns()
+        return {
+            "predictions": predictions,
+            "count": int(X.shape[0]),
+            "latency_ms": round((end - inference_start) / 1e6, 4),
+            "total_time_ms": round((end - start) / 1e6, 4),
+            "model_format": "ONNX",
+            "features_count": N_FEATURES,
+            "model_version": self.model_version,
+        }
+
+    def status(self) -> dict[str, Any]:
+        """Connection state, for health checks."""
+        return {
+            "status": "ready" if self.connected else "unavailable",
+            "error": self.error,
+            "model_version": self.model_version,
+            "socket": str(self.socket_path),
+        }
+
+    def close(self) -> None:
+        """Disconnect and remove the shared memory segment."""
+        if self._reader_task is not None:
+            self._reader_task.cancel()
+        if self._writer is not None:
+            self._writer.close()
+            self._writer = None
+        del self._inputs, self._outputs
+        self._shm.close()
+        self._shm.unlink()
+
+
+async def inference_server_unavailable_handler(
+    request: Request,  # noqa: ARG001
+    exc: Exception,
+) -> JSONResponse:
+    """Turn an unreachable inference server into a 503 with ``Retry-After``."""
+    return JSONResponse(
+        status_code=503,
+        content={"detail": str(exc)},
+        headers={"Retry-After": str(settings.ML_EXECUTOR_RETRY_AFTER_SECONDS)},
+    )
+
+
+_client_instance: InferenceClient | None = None
+_client_loop: asyncio.AbstractEventLoop | None = None
+
+
+def get_inference_client() -> InferenceClient:
+    """
+    Get or create the inference server client of this process (singleton).
+
+    Must be called from the event loop; a client is bound to the loop it was
+    created on, a new loop (e.g. in tests) gets a new client.
+    """
+    global _client_instance, _client_loop
+    loop = asyncio.get_running_loop()
+    if _client_instance is None or _client_loop is not loop:
+        if _client_instance is not None:
+            _client_instance.close()
+        _client_instance = InferenceClient(
+            settings.ML_INFERENCE_SOCKET,
+            slots=settings.ML_SERVER_SLOTS,
+            slot_rows=settings.ML_SERVER_SLOT_ROWS,
+        )
+        _client_loop = loop
+    return _client_instance
@@ -0,0 +1,204 @@
+"""
+Streaming scoring of NDJSON and CSV bodies.
+
+The request body is read chunk by chunk and split into lines, rows are
+grouped into fixed-size batches scored with one ``predict_batch`` call each,
+and the predictions of every batch are written out before the next one is
+read. Memory stays bounded by the batch size (and the maximum line length)
+whatever the input size.
+
+Each input line gets one output line carrying its 1-based line number, with
+either the prediction or the reason the row was rejected; malformed rows do
+not stop the stream. Blank lines (and the CSV header, if any) are skipped.
+"""
+
+import asyncio
+import csv
+import io
+import json
+import math
+from collections.abc import AsyncIterator, Awaitable, Callable
+from typing import Any
+
+import numpy as np
+
+from app.ml.executor import InferenceQueueFull, get_inference_executor
+from app.ml.model import MLModel
+
+NDJSON = "application/x-ndjson"
+CSV = "text/csv"
+STREAM_MEDIA_TYPES = (NDJSON, CSV)
+
+N_FEATURES = 5
+
+# Wait between retries when the inference queue is full
+_QUEUE_FULL_RETRY_SECONDS = 0.05
+
+# Scores an (N, 5) float32 chunk
+PredictChunk = Callable[[np.ndarray[Any, Any]], Awaitable[np.ndarray[Any, Any]]]
+
+
+async def iter_lines(
+    chunks: AsyncIterator[bytes], max_line_bytes: int
+) -> AsyncIterator[tuple[int, bytes | None]]:
+    """
+    Split a byte stream into lines.
+
+    Yields:
+        (line number, line without the newline), or (line number, None) for
+        lines longer than ``max_line_bytes``, whose content is dropped
+    """
+    buffer = b""
+    line_number = 0
+    too_long = False
+    async for chunk in chunks:
+        buffer += chunk
+        *lines, buffer = buffer.split(b"\n")
+        for line in lines:
+            line_number += 1
+            if too_long or len(line) > max_line_bytes:
+                too_long = False
+                yield line_number, None
+            else:
+                yield line_number, line
+        if len(buffer) > max_line_bytes:
+            # Keep reading until the newline, without keeping the content
+            too_long = True
+            buffer = b""
+    if buffer or too_long:
+        yield line_number + 1, None if too_long else buffer
+
+
+def _check_row(values: list[float]) -> list[float]:
+    if len(values) != N_FEATURES:
+        raise ValueError(f"Expected {N_FEATURES} features, got {len(values)}")
+    if not all(math.isfinite(value) for value in values):
+        raise ValueError("Features must be finite numbers")
+    return values
+
+
+def parse_ndjson_row(line: bytes) -> list[float]:
+    """Parse a JSON array of 5 numbers."""
+    try:
+        row = json.loads(line)
+    except ValueError:
+        raise ValueError("Invalid JSON") from None
+    if not isinstance(row, list) or not all(
+        isinstance(value, int | float) and not isinstance(value, bool) for value in row
+    ):
+        raise ValueError("Expected a JSON array of numbers")
+    return _check_row([float(value) for value in row])
+
+
+def parse_csv_row(line: bytes) -> list[float]:
+    """Parse 5 comma-separated numbers."""
+    try:
+        values = [float(value) for value in line.split(b",")]
+    except ValueError:
+        raise ValueError("Expected comma-separated numbers") from None
+    return _check_row(values)
+
+
+def _format_ndjson(results: list[tuple[int, float | None, str | None]]) -> bytes:
+    lines = []
+    for line_number, prediction, error in results:
+        if error is None:
+            lines.append(f'{{"line":{line_number},"prediction":{prediction!r}}}\n')
+        else:
+            lines.append(json.dumps({"line": line_number, "error": error}) + "\n")
+    return "".join(lines).encode()
+
+
+def _format_csv(results: list[tuple[int, float | None, str | None]]) -> bytes:
+    output = io.StringIO()
+    writer = csv.writer(output, lineterminator="\n")
+    for line_number, prediction, error in results:
+        writer.writerow([line_number, "" if prediction is None else prediction, error])
+    return output.getvalue().encode()
+
+
+def executor_predictor(model: MLModel) -> PredictChunk:
+    """Score chunks with ``model`` on the inference executor."""
+
+    async def predict_chunk(X: np.ndarray[Any, Any]) -> np.ndarray[Any, Any]:
+        # A stream waits for capacity instead of failing halfway through
+        while True:
+            try:
+                result = await get_inference_executor().run(model.predict_batch, X)
+            except InferenceQueueFull:
+                await asyncio.sleep(_QUEUE_FULL_RETRY_SECONDS)
+                continue
+            predictions: np.ndarray[Any, Any] = result["predictions"]
+            return predictions
+
+    return predict_chunk
+
+
+async def score_stream(
+    chunks: AsyncIterator[bytes],
+    media_type: str,
+    predict_chunk: PredictChunk,
+    chunk_rows: int = 1024,
+    max_line_bytes: int = 65536,
+    csv_header: bool = False,
+) -> AsyncIterator[bytes]:
+    """
+    Score an NDJSON or CSV byte stream, yielding encoded results per chunk.
+
+    Args:
+        chunks: Request body chunks
+        media_type: ``NDJSON`` or ``CSV``, also the output format
+        predict_chunk: Scores every chunk, e.g. ``executor_predictor(model)``
+        chunk_rows: Rows per inference call
+        max_line_bytes: Longer lines are rejected without being buffered
+        csv_header: Skip the first CSV line
+
+    Yields:
+        NDJSON lines ``{"line": n, "prediction": x}`` / ``{"line": n,
+        "error": "..."}``, or CSV rows ``line,prediction,error`` after a
+        header row
+    """
+    if media_type == NDJSON:
+        parse, encode = parse_ndjson_row, _format_ndjson
+    else:
+        parse, encode = parse_csv_row, _format_csv
+        yield b"line,prediction,error\n"
+
+    # (line number, prediction, error) in input order for the current chunk
+    results: list[tuple[int, float | None, str | None]] = []
+    rows: list[list[float]] = []
+    row_indexes: list[int] = []
+
+    async def flush() -> bytes:
+        if rows:
+            predictions = await predict_chunk(np.array(rows, dtype=np.float32))
+            for index, prediction in zip(row_indexes, predictions, strict=True):
+                results[index] = (results[index][0], float(prediction), None)
+        output = encode(results)
+        results.clear()
+        rows.clear()
+        row_indexes.clear()
+        return output
+
+    async for line_number, line in iter_lines(chunks, max_line_bytes):
+        if line is None:
+            results.append((line_number, None, "Line too long"))
+        else:
+            line = line.strip()
+            if not line or (csv_header and media_type == CSV and line_number == 1):
+                continue
+            try:
+                row = parse(line)
+            except ValueError as e:
+                results.append((line_number, None, str(e)))
+            else:
+                row_indexes.append(len(results))
+                results.append((line_number, None, None))
+                rows.append(row)
+        # Error lines count towards the chunk too, so a long run of them is
+        # not held until the end of the stream
+        if len(results) >= chunk_rows:
+            yield await flush()
+
+    if results:
+        yield await flush()
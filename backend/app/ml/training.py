@@ -0,0 +1,104 @@
+"""
+Model training and ONNX export.
+
+Kept separate from ``app.ml.model`` so serving processes never import
+scikit-learn or skl2onnx, this module is only imported when the model
+artifact is missing.
+"""
+
+from pathlib import Path
+from typing import Any
+
+import numpy as np
+from skl2onnx import convert_sklearn
+from skl2onnx.common.data_types import FloatTensorType
+from sklearn.ensemble import RandomForestRegressor
+from sklearn.pipeline import Pipeline
+from sklearn.preprocessing import StandardScaler
+
+from app.ml.model import EMBEDDED_SCALER_KEY
+
+
+def generate_data(
+    n_samples: int = 1000, seed: int = 42
+) -> tuple[np.ndarray[Any, Any], np.ndarray[Any, Any]]:
+    """
+    Generate the synthetic regression dataset.
+
+    Args:
+        n_samples: Number of rows
+        seed: Random seed, the bundled model is trained with 42
+
+    Returns:
+        Tuple of float32 features (n_samples, 5) and targets (n_samples,)
+    """
+    rng = np.random.RandomState(seed)
+    X = rng.randn(n_samples, 5).astype(np.float32)
+    y = 2 * X[:, 0] + 3 * X[:, 1] - X[:, 2] + 0.5 * X[:, 3] + rng.randn(n_samples) * 0.1
+    return X, y
+
+
+def train_pipeline(
+    X: np.ndarray[Any, Any],
+    y: np.ndarray[Any, Any],
+    n_estimators: int = 50,
+    max_depth: int = 10,
+) -> Pipeline:
+    """
+    Fit the scaler + Random Forest pipeline.
+
+    Args:
+        X: Training features
+        y: Training targets
+        n_estimators: Number of trees
+        max_depth: Maximum depth of each tree
+
+    Returns:
+        The fitted pipeline
+    """
+    pipeline = Pipeline(
+        [
+            ("scaler", StandardScaler()),
+            (
+                "model",
+                RandomForestRegressor(
+                    n_estimators=n_estimators,
+                    max_depth=max_depth,
+                    random_state=42,
+                    n_jobs=-1,
+                ),
+            ),
+        ]
+    )
+    pipeline.fit(X, y)
+    return pipeline
+
+
+def export_onnx(pipeline: Pipeline, model_path: Path) -> None:
+    """
+    Convert a fitted pipeline to one ONNX graph and save it.
+
+    Args:
+        pipeline: Scaler followed by a regressor
+        model_path: Where to write the ONNX model
+    """
+    # Scaling becomes the first node of the graph
+    initial_type = [("float_input", FloatTensorType([None, 5]))]
+    onnx_model = convert_sklearn(pipeline, initial_types=initial_type)
+    entry = onnx_model.metadata_props.add()
+    entry.key = EMBEDDED_SCALER_KEY
+    entry.value = "true"
+
+    with open(model_path, "wb") as f:
+        f.write(onnx_model.SerializeToString())
+
+
+def train_and_save_model(model_path: Path) -> None:
+    """
+    Train a scaler + Random Forest pipeline and save it as one ONNX graph.
+
+    Args:
+        model_path: Where to write the ONNX model
+    """
+    X_train, y_train = generate_data()
+    export_onnx(train_pipeline(X_train, y_train), model_path)
@@ -0,0 +1,275 @@
+"""
+Smaller and faster variants of the model, gated on held-out accuracy.
+
+Each variant is derived from the model being served, saved as
+``model.<variant>.onnx`` next to it and measured on a held-out set:
+pruned forests keep the first trees of the artifact's own tree ensemble,
+the distilled tree learns the artifact's predictions, and shallower
+forests are retrained (see ``app.ml.training``) only after checking that
+the deterministic training run reproduces the artifact. Variants whose
+RMSE exceeds the full model's by more than the accuracy budget are deleted
+instead of emitted. ``MLModel(variant=...)`` (or ``ML_MODEL_VARIANT``)
+serves an emitted variant.
+
+There is no float16 variant: ONNX Runtime's CPU tree ensemble kernels only
+accept float32 and float64 thresholds and leaves.
+
+Like training, this imports scikit-learn and is never imported by serving.
+"""
+
+import json
+import time
+from collections.abc import Callable
+from pathlib import Path
+from typing import Any
+
+import numpy as np
+import onnx
+from onnx import helper
+from sklearn.pipeline import Pipeline
+from sklearn.preprocessing import StandardScaler
+from sklearn.tree import DecisionTreeRegressor
+
+from app.core.config import settings
+from app.ml.model import MLModel, variant_path
+from app.ml.training import export_onnx, generate_data, train_pipeline
+
+# Seeds of the held-out and distillation sets, distinct from training (42)
+HOLDOUT_SEED = 7
+DISTILLATION_SEED = 8
+
+# Largest difference allowed between the retrained forest and the artifact,
+# covers float32 (ONNX) vs float64 (scikit-learn) accumulation
+RETRAIN_TOLERANCE = 1e-4
+
+# builder(full model, held-out features, output path) writes the variant
+VariantBuilder = Callable[[MLModel, np.ndarray[Any, Any], Path], None]
+
+
+def _load_tree_ensemble(
+    model_path: Path,
+) -> tuple[onnx.ModelProto, onnx.NodeProto, dict[str, Any]]:
+    """Load an ONNX model, its tree ensemble node and the node's attributes."""
+    model = onnx.load(str(model_path))
+    node = next(
+        (n for n in model.graph.node if n.op_type == "TreeEnsembleRegressor"), None
+    )
+    if node is None:
+        raise ValueError(f"{model_path} has no TreeEnsembleRegressor node")
+    attrs = {a.name: helper.get_attribute_value(a) for a in node.attribute}
+    if any(name.endswith("_as_tensor") for name in attrs):
+        raise ValueError("Tensor tree ensemble attributes are not supported")
+    return model, node, attrs
+
+
+def _prune_trees(n_trees: int) -> VariantBuilder:
+    """Keep the first ``n_trees`` trees of the artifact's forest."""
+
+    def build(
+        full: MLModel,
+        X: np.ndarray[Any, Any],  # noqa: ARG001
+        path: Path,
+    ) -> None:
+        model, node, attrs = _load_tree_ensemble(full.model_path)
+        total = max(attrs["nodes_treeids"]) + 1
+        if n_trees >= total:
+            raise ValueError(f"{full.model_path} only has {total} trees")
+
+        kept_nodes = [i for i, t in enumerate(attrs["nodes_treeids"]) if t < n_trees]
+        kept_targets = [i for i, t in enumerate(attrs["target_treeids"]) if t < n_trees]
+        for name, value in attrs.items():
+            if name.startswith("nodes_"):
+                attrs[name] = [value[i] for i in kept_nodes]
+            elif name.startswith("target_") and name != "target_weights":
+                attrs[name] = [value[i] for i in kept_targets]
+        weights = [attrs["target_weights"][i] for i in kept_targets]
+        if attrs.get("aggregate_function", b"SUM") == b"SUM":
+            # Random forests are exported as a SUM of leaves already divided
+            # by the number of trees, rescale so the kept trees average
+            weights = [w * total / n_trees for w in weights]
+        attrs["target_weights"] = weights
+
+        del node.attribute[:]
+        node.attribute.extend(helper.make_attribute(k, v) for k, v in attrs.items())
+        onnx.save(model, str(path))
+
+    return build
+
+
+def _retrained_training_set(
+    full: MLModel, X: np.ndarray[Any, Any]
+) -> tuple[np.ndarray[Any, Any], np.ndarray[Any, Any], int]:
+    """
+    Training set of the artifact, checked by retraining the full forest.
+
+    Args:
+        full: Model being served
+        X: Held-out features the retrained forest is compared on
+
+    Returns:
+        Tuple of training features, targets and number of trees
+
+    Raises:
+        ValueError: If the retrained forest does not reproduce the artifact,
+            e.g. after it was replaced by a model trained elsewhere
+    """
+    X_train, y_train = generate_data()
+    _, _, attrs = _load_tree_ensemble(full.model_path)
+    n_trees = max(attrs["nodes_treeids"]) + 1
+    retrained = train_pipeline(X_train, y_train, n_estimators=n_trees)
+    difference = np.abs(retrained.predict(X) - full._infer(X)).max()
+    if difference > RETRAIN_TOLERANCE:
+        raise ValueError(
+            f"{full.model_path} does not match the retrained forest "
+            f"(max difference {difference:.3g}), its training data is unknown "
+            "so retrained variants cannot be derived from it"
+        )
+    return X_train, y_train, n_trees
+
+
+def _shallower(max_depth: int) -> VariantBuilder:
+    """Retrain the forest with a lower maximum depth."""
+
+    def build(full: MLModel, X: np.ndarray[Any, Any], path: Path) -> None:
+        X_train, y_train, n_trees = _retrained_training_set(full, X)
+        pipeline = train_pipeline(
+            X_train, y_train, n_estimators=n_trees, max_depth=max_depth
+        )
+        export_onnx(pipeline, path)
+
+    return build
+
+
+def _distilled(max_depth: int) -> VariantBuilder:
+    """Fit a single decision tree on the artifact's predictions."""
+
+    def build(
+        full: MLModel,
+        X: np.ndarray[Any, Any],  # noqa: ARG001
+        path: Path,
+    ) -> None:
+        # Label a larger sample with the forest so the student sees more of
+        # the input space than the 1000 training rows
+        X_distill, _ = generate_data(20_000, seed=DISTILLATION_SEED)
+        student = Pipeline(
+            [
+                ("scaler", StandardScaler()),
+                (
+                    "model",
+                    DecisionTreeRegressor(max_depth=max_depth, random_state=42),
+                ),
+            ]
+        )
+        student.fit(X_distill, full._infer(X_distill))
+        export_onnx(student, path)
+
+    return build
+
+
+VARIANTS: dict[str, VariantBuilder] = {
+    "trees25": _prune_trees(25),
+    "trees10": _prune_trees(10),
+    "depth8": _shallower(8),
+    "depth6": _shallower(6),
+    "distilled": _distilled(12),
+}
+
+
+def measure_model(
+    model: MLModel,
+    X: np.ndarray[Any, Any],
+    y: np.ndarray[Any, Any],
+    latency_rows: int = 500,
+) -> dict[str, Any]:
+    """
+    Measure accuracy and latency of a model on a held-out set.
+
+    Args:
+        model: Model to measure
+        X: Held-out features
+        y: Held-out targets
+        latency_rows: Number of single-row predictions timed
+
+    Returns:
+        Dictionary with rmse, single-row p50/p99 latency, time to score the
+        whole set at once, and the artifact size
+    """
+    predictions = model._infer(X)
+    rmse = float(np.sqrt(np.mean((predictions - y) ** 2)))
+
+    rows = X[:latency_rows].tolist()
+    model.warmup([1], iterations=10)
+    samples = np.empty(len(rows))
+    for i, row in enumerate(rows):
+        start = time.perf_counter()
+        model._infer_one(row)
+        samples[i] = (time.perf_counter() - start) * 1000
+
+    start = time.perf_counter()
+    model._infer(X)
+    batch_ms = (time.perf_counter() - start) * 1000
+
+    return {
+        "rmse": round(rmse, 6),
+        "p50_ms": round(float(np.percentile(samples, 50)), 4),
+        "p99_ms": round(float(np.percentile(samples, 99)), 4),
+        "batch_ms": round(batch_ms, 4),
+        "size_bytes": model.model_path.stat().st_size,
+    }
+
+
+def build_model_variants(
+    model_path: Path | None = None,
+    variants: list[str] | None = None,
+    max_rmse_increase: float | None = None,
+    holdout_size: int = 5000,
+) -> dict[str, Any]:
+    """
+    Build, measure and gate the model variants.
+
+    Args:
+        model_path: Full model, variants are written next to it
+        variants: Names from ``VARIANTS`` to build, all by default
+        max_rmse_increase: Accuracy budget as a fraction of the full model's
+            RMSE, ``ML_VARIANT_MAX_RMSE_INCREASE`` by default
+        holdout_size: Number of held-out rows
+
+    Returns:
+        Report with the full model's metrics and, per variant, its metrics
+        and whether it was emitted. Also written to ``variants.json``.
+    """
+    model_path = model_path or Path(__file__).parent / "model.onnx"
+    if max_rmse_increase is None:
+        max_rmse_increase = settings.ML_VARIANT_MAX_RMSE_INCREASE
+    names = variants or list(VARIANTS)
+    unknown = set(names) - set(VARIANTS)
+    if unknown:
+        raise ValueError(f"Unknown model variants: {sorted(unknown)}")
+
+    X_holdout, y_holdout = generate_data(holdout_size, seed=HOLDOUT_SEED)
+
+    # Measure through the same code path as serving, without pre-optimized
+    # artifacts that may be stale
+    base = MLModel(model_path=model_path, use_optimized_model=False, variant="")
+    baseline = measure_model(base, X_holdout, y_holdout)
+    rmse_budget = baseline["rmse"] * (1 + max_rmse_increase)
+
+    report: dict[str, Any] = {
+        "max_rmse_increase": max_rmse_increase,
+        "holdout_size": holdout_size,
+        "full": baseline,
+        "variants": {},
+    }
+    for name in names:
+        path = variant_path(model_path, name)
+        VARIANTS[name](base, X_holdout, path)
+        model = MLModel(model_path=model_path, use_optimized_model=False, variant=name)
+        metrics = measure_model(model, X_holdout, y_holdout)
+        metrics["emitted"] = metrics["rmse"] <= rmse_budget
+        if not metrics["emitted"]:
+            path.unlink()
+        report["variants"][name] = metrics
+
+    with open(model_path.with_name("variants.json"), "w") as f:
+        json.dump(report, f, indent=2)
+    return report
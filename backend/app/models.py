@@ -2,8 +2,8 @@ import uuid
 from datetime import datetime, timezone
 
 from pydantic import EmailStr
-from sqlalchemy import DateTime
-from sqlmodel import Field, Relationship, SQLModel
+from sqlalchemy import DateTime, Index
+from sqlmodel import Field, Relationship, SQLModel, col
 
 
 def get_datetime_utc() -> datetime:
@@ -53,6 +53,9 @@ class User(UserBase, table=True):
         default_factory=get_datetime_utc,
         sa_type=DateTime(timezone=True),  # type: ignore
     )
+    # Number of items owned, maintained with every item insert and delete
+    # (app/crud.py item_count_update), checked by scripts/check_item_counts.py
+    item_count: int = Field(default=0, sa_column_kwargs={"server_default": "0"})
     items: list["Item"] = Relationship(back_populates="owner", cascade_delete=True)
 
 
@@ -64,7 +67,12 @@ class UserPublic(UserBase):
 
 class UsersPublic(SQLModel):
     data: list[UserPublic]
-    count: int
+    # None when not requested (the default in cursor mode)
+    count: int | None = None
+    # Opaque cursors of the next (older) and previous (newer) pages, None at
+    # either end
+    next_cursor: str | None = None
+    prev_cursor: str | None = None
 
 
 # Shared properties
@@ -96,6 +104,18 @@ class Item(ItemBase, table=True):
     owner: User | None = Relationship(back_populates="items")
 
 
+# Listings are ordered by (created_at DESC, id DESC), see app/pagination.py.
+# Created concurrently by migration 3f7c9a2d1b64, declared here so that
+# autogenerate keeps them
+Index(
+    "ix_item_owner_id_created_at_id",
+    col(Item.owner_id),
+    col(Item.created_at).desc(),
+    col(Item.id).desc(),
+)
+Index("ix_user_created_at_id", col(User.created_at).desc(), col(User.id).desc())
+
+
 # Properties to return via API, id is always required
 class ItemPublic(ItemBase):
     id: uuid.UUID
@@ -105,7 +125,12 @@ class ItemPublic(ItemBase):
 
 class ItemsPublic(SQLModel):
     data: list[ItemPublic]
-    count: int
+    # None when not requested (the default in cursor mode)
+    count: int | None = None
+    # Opaque cursors of the next (older) and previous (newer) pages, None at
+    # either end
+    next_cursor: str | None = None
+    prev_cursor: str | None = None
 
 
 # Generic message
@@ -0,0 +1,154 @@
+"""
+Keyset (cursor) pagination over ``(created_at, id)``, newest first.
+
+A cursor holds the ``created_at`` and ``id`` of the row a page starts from
+and the direction to read in, as URL-safe base64 JSON that clients treat as
+opaque. Reading after a cursor is a range scan of the listing's index (see
+app/models.py) starting at that row, so deep pages cost the same as the first
+one; ``OFFSET`` reads and discards every skipped row.
+
+Rows with a NULL ``created_at`` (created before the column existed) come
+first, as with ``ORDER BY created_at DESC`` in PostgreSQL.
+"""
+
+import base64
+import json
+import uuid
+from datetime import datetime
+from typing import Any, NamedTuple
+
+from sqlalchemy import ColumnElement, and_, or_, tuple_
+from sqlmodel import col
+from sqlmodel.ext.asyncio.session import AsyncSession
+from sqlmodel.sql.expression import SelectOfScalar
+
+
+class Cursor(NamedTuple):
+    created_at: datetime | None
+    id: uuid.UUID
+    # Prev cursors read the rows before this one, next cursors the rows after
+    before: bool = False
+
+
+def encode_cursor(row: Any, before: bool = False) -> str:
+    """Cursor pointing at ``row``, a model with ``created_at`` and ``id``."""
+    created_at = row.created_at.isoformat() if row.created_at else None
+    data = {"c": created_at, "i": str(row.id), "b": before}
+    return base64.urlsafe_b64encode(json.dumps(data).encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str) -> Cursor:
+    """
+    Decode a cursor from ``encode_cursor``.
+
+    Raises:
+        ValueError: If the cursor is malformed
+    """
+    try:
+        data = json.loads(base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)))
+        created_at = datetime.fromisoformat(data["c"]) if data["c"] else None
+        return Cursor(created_at, uuid.UUID(data["i"]), bool(data["b"]))
+    except (ValueError, TypeError, KeyError):
+        raise ValueError("Invalid cursor") from None
+
+
+def _after(created_at: Any, id_: Any, cursor: Cursor) -> ColumnElement[bool]:
+    if cursor.created_at is None:
+        return or_(created_at.is_not(None), and_(created_at.is_(None), id_ < cursor.id))
+    return tuple_(created_at, id_) < (cursor.created_at, cursor.id)
+
+
+def _before(created_at: Any, id_: Any, cursor: Cursor) -> ColumnElement[bool]:
+    if cursor.created_at is None:
+        return and_(created_at.is_(None), id_ > cursor.id)
+    # Without the NULL created_at rows, fetch_page reads them separately: an
+    # OR would not be usable as an index condition
+    return tuple_(created_at, id_) > (cursor.created_at, cursor.id)
+
+
+def paginate(
+    statement: SelectOfScalar[Any],
+    model: Any,
+    cursor: Cursor | None,
+    skip: int,
+    limit: int,
+) -> SelectOfScalar[Any]:
+    """
+    Order ``statement`` newest first and select one page, plus one row to
+    tell whether there are more. See ``fetch_page``.
+
+    Args:
+        statement: Select of ``model``, with any filter already applied
+        model: Table model with ``created_at`` and ``id`` columns
+        cursor: Page to read, by offset (``skip``) if None
+        skip: Rows to skip, only without a cursor
+        limit: Page size
+    """
+    created_at, id_ = col(model.created_at), col(model.id)
+    if cursor is None:
+        statement = statement.order_by(created_at.desc(), id_.desc()).offset(skip)
+    elif cursor.before:
+        # Read backwards from the cursor, page_rows restores the order
+        statement = statement.where(_before(created_at, id_, cursor)).order_by(
+            created_at.asc(), id_.asc()
+        )
+    else:
+        statement = statement.where(_after(created_at, id_, cursor)).order_by(
+            created_at.desc(), id_.desc()
+        )
+    return statement.limit(limit + 1)
+
+
+def page_rows(
+    rows: list[Any], cursor: Cursor | None, skip: int, limit: int
+) -> tuple[list[Any], str | None, str | None]:
+    """
+    Trim the rows of a ``paginate`` query to the page.
+
+    Returns:
+        (rows newest first, next cursor, prev cursor), cursors are None at
+        either end of the listing
+    """
+    has_more = len(rows) > limit
+    rows = rows[:limit]
+    if cursor is not None and cursor.before:
+        rows.reverse()
+        has_before, has_after = has_more, True
+    else:
+        has_before, has_after = cursor is not None or skip > 0, has_more
+    next_cursor = encode_cursor(rows[-1]) if rows and has_after else None
+    prev_cursor = encode_cursor(rows[0], before=True) if rows and has_before else None
+    return rows, next_cursor, prev_cursor
+
+
+async def fetch_page(
+    session: AsyncSession,
+    statement: SelectOfScalar[Any],
+    model: Any,
+    cursor: Cursor | None,
+    skip: int,
+    limit: int,
+) -> tuple[list[Any], str | None, str | None]:
+    """
+    Read one page of ``statement``, see ``paginate`` and ``page_rows``.
+
+    Returns:
+        (rows newest first, next cursor, prev cursor)
+    """
+    rows = list(
+        (await session.exec(paginate(statement, model, cursor, skip, limit))).all()
+    )
+    if (
+        cursor
+        and cursor.before
+        and cursor.created_at is not None
+        and len(rows) <= limit
+    ):
+        # Reached the newest row with a created_at, the NULL ones come before
+        nulls = (
+            statement.where(col(model.created_at).is_(None))
+            .order_by(col(model.id).asc())
+            .limit(limit + 1 - len(rows))
+        )
+        rows += (await session.exec(nulls)).all()
+    return page_rows(rows, cursor, skip, limit)
@@ -0,0 +1,161 @@
+#!/usr/bin/env python3
+"""
+Compare sync and async database access under concurrent load.
+
+Serves the items listing (count + first page, as in ``GET /items/``) twice:
+from a ``def`` route on the sync engine, which FastAPI runs in its thread
+pool, and from an ``async def`` route on the async engine. Both engines get
+the same pool size, 40 by default: the sync route's ``get_db`` teardown
+needs one of the 40 thread pool slots to return its connection, with a
+smaller pool the threads blocked on checkout take every slot and the sync
+mode deadlocks. Requests are sent in-process through ``httpx`` with a fixed
+number in flight; ``--db-latency-ms`` adds a ``pg_sleep`` to every request
+to simulate a remote database.
+"""
+
+import argparse
+import asyncio
+import json
+import statistics
+import time
+from pathlib import Path
+from typing import Annotated, Any
+
+import httpx
+from fastapi import Depends, FastAPI
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import create_async_engine
+from sqlmodel import Session, col, create_engine, func, select
+from sqlmodel.ext.asyncio.session import AsyncSession
+
+from app.core.config import settings
+from app.models import Item
+
+
+def build_app(pool_size: int, db_latency_ms: float) -> tuple[FastAPI, Any, Any]:
+    """Build the benchmark app and its two engines."""
+    url = str(settings.SQLALCHEMY_DATABASE_URI)
+    engine = create_engine(url, pool_size=pool_size, max_overflow=0)
+    async_engine = create_async_engine(url, pool_size=pool_size, max_overflow=0)
+    sleep = text("SELECT pg_sleep(:seconds)").bindparams(seconds=db_latency_ms / 1000)
+    count_statement = select(func.count()).select_from(Item)
+    statement = select(Item).order_by(col(Item.created_at).desc()).limit(100)
+
+    def get_db() -> Any:
+        with Session(engine) as session:
+            yield session
+
+    async def get_async_db() -> Any:
+        async with AsyncSession(async_engine, expire_on_commit=False) as session:
+            yield session
+
+    app = FastAPI()
+
+    @app.get("/sync")
+    def read_sync(session: Annotated[Session, Depends(get_db)]) -> int:
+        if db_latency_ms:
+            session.exec(sleep)  # type: ignore[call-overload]
+        count = session.exec(count_statement).one()
+        session.exec(statement).all()
+        return count
+
+    @app.get("/async")
+    async def read_async(
+        session: Annotated[AsyncSession, Depends(get_async_db)],
+    ) -> int:
+        if db_latency_ms:
+            await session.exec(sleep)  # type: ignore[call-overload]
+        count = (await session.exec(count_statement)).one()
+        (await session.exec(statement)).all()
+        return count
+
+    return app, engine, async_engine
+
+
+async def run_load(
+    app: FastAPI, path: str, concurrency: int, duration: float
+) -> dict[str, float]:
+    """Send requests to ``path`` with ``concurrency`` in flight for ``duration``."""
+    latencies: list[float] = []
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(
+        transport=transport, base_url="http://bench"
+    ) as client:
+        # Warm up the pool
+        await asyncio.gather(*(client.get(path) for _ in range(concurrency)))
+        deadline = time.perf_counter() + duration
+
+        async def user() -> None:
+            while time.perf_counter() < deadline:
+                start = time.perf_counter()
+                response = await client.get(path)
+                response.raise_for_status()
+                latencies.append(time.perf_counter() - start)
+
+        start = time.perf_counter()
+        await asyncio.gather(*(user() for _ in range(concurrency)))
+        elapsed = time.perf_counter() - start
+
+    latencies.sort()
+    return {
+        "requests": len(latencies),
+        "requests_per_s": round(len(latencies) / elapsed, 1),
+        "p50_ms": round(statistics.median(latencies) * 1000, 2),
+        "p99_ms": round(latencies[int(len(latencies) * 0.99)] * 1000, 2),
+    }
+
+
+async def compare(
+    concurrency: int, duration: float, pool_size: int, db_latency_ms: float
+) -> dict[str, Any]:
+    app, engine, async_engine = build_app(pool_size, db_latency_ms)
+    try:
+        results: dict[str, Any] = {
+            "metadata": {
+                "concurrency": concurrency,
+                "duration": duration,
+                "pool_size": pool_size,
+                "db_latency_ms": db_latency_ms,
+            }
+        }
+        for mode in ("sync", "async"):
+            results[mode] = await run_load(app, f"/{mode}", concurrency, duration)
+        return results
+    finally:
+        engine.dispose()
+        await async_engine.dispose()
+
+
+def main() -> None:
+    """Run both modes and print throughput and latencies."""
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--concurrency", type=int, default=64)
+    parser.add_argument("--duration", type=float, default=5.0, help="Seconds per mode")
+    parser.add_argument("--pool-size", type=int, default=40)
+    parser.add_argument("--db-latency-ms", type=float, default=0.0)
+    parser.add_argument("--output", type=Path, help="Write results as JSON")
+    args = parser.parse_args()
+
+    results = asyncio.run(
+        compare(args.concurrency, args.duration, args.pool_size, args.db_latency_ms)
+    )
+
+    metadata = results["metadata"]
+    print(
+        f"{metadata['concurrency']} requests in flight, pool of "
+        f"{metadata['pool_size']}, +{metadata['db_latency_ms']} ms per request"
+    )
+    print(f"{'mode':>6} {'req/s':>10} {'p50 ms':>8} {'p99 ms':>8}")
+    for mode in ("sync", "async"):
+        result = results[mode]
+        print(
+            f"{mode:>6} {result['requests_per_s']:>10,.1f} "
+            f"{result['p50_ms']:>8.2f} {result['p99_ms']:>8.2f}"
+        )
+    if args.output:
+        args.output.write_text(json.dumps(results, indent=2))
+        print(f"Results written to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
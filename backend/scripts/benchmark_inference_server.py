@@ -0,0 +1,47 @@
+#!/usr/bin/env python3
+"""Compare in-worker inference with the shared inference server."""
+
+import argparse
+import json
+from pathlib import Path
+
+from app.ml.benchmark import compare_serving_modes
+
+
+def main() -> None:
+    """Run both serving modes and print throughput and memory."""
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--web-workers", type=int, default=4)
+    parser.add_argument(
+        "--concurrency", type=int, default=8, help="Requests in flight per worker"
+    )
+    parser.add_argument("--batch-size", type=int, default=1, help="Rows per request")
+    parser.add_argument("--duration", type=float, default=5.0, help="Seconds per mode")
+    parser.add_argument("--output", type=Path, help="Write results as JSON")
+    args = parser.parse_args()
+
+    results = compare_serving_modes(
+        web_workers=args.web_workers,
+        concurrency=args.concurrency,
+        batch_size=args.batch_size,
+        duration=args.duration,
+    )
+
+    metadata = results["metadata"]
+    print(
+        f"{metadata['web_workers']} web workers x {metadata['concurrency']} "
+        f"requests of {metadata['batch_size']} rows, cpus={metadata['cpu_count']}"
+    )
+    print(f"{'mode':>8} {'rows/s':>12} {'memory MB':>10}")
+    for mode in ("local", "server"):
+        print(
+            f"{mode:>8} {results[mode]['rows_per_s']:>12,.0f} "
+            f"{results[mode]['memory_mb']:>10.1f}"
+        )
+    if args.output:
+        args.output.write_text(json.dumps(results, indent=2))
+        print(f"Results written to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
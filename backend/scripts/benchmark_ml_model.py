@@ -0,0 +1,95 @@
+#!/usr/bin/env python3
+"""Benchmark MLModel and optionally gate on regressions against a baseline."""
+
+import argparse
+import json
+import sys
+from pathlib import Path
+
+from app.ml.benchmark import compare_results, run_benchmark
+
+
+def main() -> int:
+    """Run the benchmark, save and compare results. Returns the exit code."""
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument(
+        "--batch-sizes", nargs="+", type=int, default=[1, 32, 1024, 16384]
+    )
+    parser.add_argument(
+        "--threads", nargs="+", type=int, default=[1, 4], help="Concurrent callers"
+    )
+    parser.add_argument(
+        "--intra-op-threads",
+        nargs="+",
+        type=int,
+        default=[0],
+        help="ONNX Runtime intra-op threads, 0 lets ONNX Runtime decide",
+    )
+    parser.add_argument(
+        "--iterations", type=int, default=200, help="Timed calls per thread"
+    )
+    parser.add_argument("--model-path", type=Path, help="Default: app/ml/model.onnx")
+    parser.add_argument("--output", type=Path, help="Write results as JSON")
+    parser.add_argument("--baseline", type=Path, help="Results JSON to compare with")
+    parser.add_argument(
+        "--threshold",
+        type=float,
+        default=0.10,
+        help="Allowed relative regression before failing (default: 0.10)",
+    )
+    args = parser.parse_args()
+
+    results = run_benchmark(
+        batch_sizes=args.batch_sizes,
+        threads=args.threads,
+        intra_op_threads=args.intra_op_threads,
+        iterations=args.iterations,
+        model_path=args.model_path,
+    )
+
+    metadata = results["metadata"]
+    print(
+        f"model {metadata['model_version']} engine={metadata['engine']} "
+        f"onnxruntime {metadata['onnxruntime']} cpus={metadata['cpu_count']}"
+    )
+    for intra_op, cold in results["cold"].items():
+        first_calls = ", ".join(
+            f"batch {size}: {ms:.3f}ms" for size, ms in cold["first_call_ms"].items()
+        )
+        print(
+            f"cold intra_op={intra_op}: load {cold['load_ms']:.1f}ms, "
+            f"first call {first_calls}"
+        )
+    print(
+        f"{'intra_op':>8} {'threads':>7} {'batch':>6} {'rows/s':>12} "
+        f"{'p50 ms':>9} {'p90 ms':>9} {'p99 ms':>9} {'p999 ms':>9}"
+    )
+    for case in results["warm"]:
+        print(
+            f"{case['intra_op_threads']:>8} {case['threads']:>7} "
+            f"{case['batch_size']:>6} {case['throughput_rows_per_s']:>12,.0f} "
+            f"{case['p50']:>9.4f} {case['p90']:>9.4f} {case['p99']:>9.4f} "
+            f"{case['p999']:>9.4f}"
+        )
+
+    if args.output:
+        args.output.write_text(json.dumps(results, indent=2))
+        print(f"Results written to {args.output}")
+
+    if args.baseline:
+        baseline = json.loads(args.baseline.read_text())
+        regressions = compare_results(results, baseline, args.threshold)
+        if regressions:
+            print(f"\n{len(regressions)} regression(s) over {args.threshold:.0%}:")
+            for r in regressions:
+                print(
+                    f"  {r['case']} {r['metric']}: {r['baseline']} -> "
+                    f"{r['current']} ({r['change']:+.1%})"
+                )
+            return 1
+        print(f"\nNo regression over {args.threshold:.0%} against {args.baseline}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,128 @@
+#!/usr/bin/env python3
+"""
+Compare offset and keyset (cursor) pagination on deep pages.
+
+Inserts ``--rows`` items for a scratch user, then times the page query of
+``GET /items/`` for that user at increasing depths, once with ``OFFSET`` and
+once from a cursor at the same position. The scratch user and its items are
+deleted afterwards.
+"""
+
+import argparse
+import json
+import statistics
+import time
+import uuid
+from pathlib import Path
+from typing import Any
+
+from sqlalchemy import text
+from sqlmodel import Session, select
+
+from app.core.db import engine
+from app.core.security import get_password_hash
+from app.crud import item_count_update
+from app.models import Item, User
+from app.pagination import Cursor, paginate
+
+_INSERT_ITEMS = text(
+    """
+    INSERT INTO item (id, title, owner_id, created_at)
+    SELECT gen_random_uuid(), 'item ' || n, :owner_id,
+           now() - n * interval '1 second'
+    FROM generate_series(1, :rows) AS n
+    """
+)
+
+
+def _time_query(session: Session, statement: Any, repeat: int) -> float:
+    """Median execution time of ``statement`` in milliseconds."""
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        session.exec(statement).all()
+        timings.append((time.perf_counter() - start) * 1000)
+    return round(statistics.median(timings), 2)
+
+
+def run(rows: int, depths: list[int], limit: int, repeat: int) -> dict[str, Any]:
+    with Session(engine) as session:
+        owner = User(
+            email=f"pagination-{uuid.uuid4().hex[:8]}@example.com",
+            hashed_password=get_password_hash(uuid.uuid4().hex),
+        )
+        session.add(owner)
+        session.commit()
+        try:
+            start = time.perf_counter()
+            session.execute(_INSERT_ITEMS, {"owner_id": owner.id, "rows": rows})
+            session.exec(item_count_update(owner.id, rows))  # type: ignore[call-overload]
+            session.commit()
+            session.execute(text("ANALYZE item"))
+            insert_s = time.perf_counter() - start
+
+            listing = select(Item).where(Item.owner_id == owner.id)
+            results = []
+            for depth in depths:
+                if depth >= rows:
+                    continue
+                offset_ms = _time_query(
+                    session, paginate(listing, Item, None, depth, limit), repeat
+                )
+                # Cursor of the row just before the page
+                row = (
+                    session.exec(paginate(listing, Item, None, depth - 1, 0)).first()
+                    if depth
+                    else None
+                )
+                cursor = Cursor(row.created_at, row.id) if row else None
+                keyset_ms = _time_query(
+                    session, paginate(listing, Item, cursor, 0, limit), repeat
+                )
+                results.append(
+                    {"depth": depth, "offset_ms": offset_ms, "keyset_ms": keyset_ms}
+                )
+        finally:
+            session.delete(owner)
+            session.commit()
+    return {
+        "metadata": {"rows": rows, "limit": limit, "insert_s": round(insert_s, 1)},
+        "results": results,
+    }
+
+
+def main() -> None:
+    """Time both pagination modes and print a table."""
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--rows", type=int, default=2_000_000)
+    parser.add_argument(
+        "--depths",
+        type=lambda value: [int(depth) for depth in value.split(",")],
+        default=[0, 10_000, 100_000, 500_000, 1_000_000, 1_900_000],
+        help="Comma-separated page offsets",
+    )
+    parser.add_argument("--limit", type=int, default=100, help="Page size")
+    parser.add_argument("--repeat", type=int, default=5, help="Runs per query")
+    parser.add_argument("--output", type=Path, help="Write results as JSON")
+    args = parser.parse_args()
+
+    results = run(args.rows, args.depths, args.limit, args.repeat)
+
+    metadata = results["metadata"]
+    print(
+        f"{metadata['rows']:,} items for one owner (inserted in "
+        f"{metadata['insert_s']} s), pages of {metadata['limit']}"
+    )
+    print(f"{'depth':>12} {'offset ms':>10} {'keyset ms':>10}")
+    for result in results["results"]:
+        print(
+            f"{result['depth']:>12,} {result['offset_ms']:>10.2f} "
+            f"{result['keyset_ms']:>10.2f}"
+        )
+    if args.output:
+        args.output.write_text(json.dumps(results, indent=2))
+        print(f"Results written to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
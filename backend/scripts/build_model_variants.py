@@ -0,0 +1,62 @@
+#!/usr/bin/env python3
+"""Build the model variants that stay within the accuracy budget."""
+
+import argparse
+
+from app.ml.forest import load_forest
+from app.ml.model import MLModel, save_optimized_model, variant_path
+from app.ml.variants import VARIANTS, build_model_variants
+
+
+def main() -> None:
+    """Build, measure and report the model variants."""
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument(
+        "--variants",
+        nargs="+",
+        choices=list(VARIANTS),
+        help="Variants to build (default: all)",
+    )
+    parser.add_argument(
+        "--max-rmse-increase",
+        type=float,
+        help="Accuracy budget as a fraction of the full model's RMSE "
+        "(default: ML_VARIANT_MAX_RMSE_INCREASE)",
+    )
+    args = parser.parse_args()
+
+    model_path = MLModel(variant="").model_path
+    report = build_model_variants(
+        model_path,
+        variants=args.variants,
+        max_rmse_increase=args.max_rmse_increase,
+    )
+
+    print(
+        f"Held-out rows: {report['holdout_size']}, "
+        f"budget: RMSE +{report['max_rmse_increase']:.0%}"
+    )
+    print(
+        f"{'variant':<10} {'rmse':>9} {'p50 ms':>8} {'p99 ms':>8} "
+        f"{'batch ms':>9} {'size KB':>8}  emitted"
+    )
+    rows = [("full", {**report["full"], "emitted": True})]
+    rows += list(report["variants"].items())
+    for name, metrics in rows:
+        print(
+            f"{name:<10} {metrics['rmse']:>9.4f} {metrics['p50_ms']:>8.4f} "
+            f"{metrics['p99_ms']:>8.4f} {metrics['batch_ms']:>9.2f} "
+            f"{metrics['size_bytes'] / 1024:>8.0f}  "
+            f"{'yes' if metrics['emitted'] else 'no'}"
+        )
+
+    # Same build-time artifacts as the full model
+    for name, metrics in report["variants"].items():
+        if metrics["emitted"]:
+            path = variant_path(model_path, name)
+            save_optimized_model(path)
+            load_forest(path)
+
+
+if __name__ == "__main__":
+    main()
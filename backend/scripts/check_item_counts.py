@@ -0,0 +1,40 @@
+#!/usr/bin/env python3
+"""
+Check the per-user item counters against the item table.
+
+Lists users whose ``item_count`` is wrong (items written outside the app,
+e.g. by hand or by a migration) and, with ``--repair``, recounts them. Exits
+with status 1 when mismatches are left unrepaired, for use in cron jobs.
+"""
+
+import argparse
+import sys
+
+from sqlmodel import Session
+
+from app import crud
+from app.core.db import engine
+
+
+def main() -> None:
+    """Report, and optionally repair, counter mismatches."""
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--repair", action="store_true", help="Fix the counters")
+    args = parser.parse_args()
+
+    with Session(engine) as session:
+        mismatches = crud.check_item_counts(session=session)
+        for user_id, stored, actual in mismatches:
+            print(f"{user_id}: item_count {stored}, {actual} items")
+        if not mismatches:
+            print("All item counters are consistent")
+            return
+        if not args.repair:
+            print(f"{len(mismatches)} inconsistent counters, run with --repair")
+            sys.exit(1)
+        repaired = crud.repair_item_counts(session=session)
+        print(f"Repaired {repaired} counters")
+
+
+if __name__ == "__main__":
+    main()
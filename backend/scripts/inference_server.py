@@ -0,0 +1,47 @@
+#!/usr/bin/env python3
+"""Run the shared inference server used with ML_INFERENCE_MODE=server."""
+
+import argparse
+import asyncio
+import logging
+
+from app.core.config import settings
+from app.ml.model import load_model
+from app.ml.server import InferenceServer
+
+
+def main() -> None:
+    """Load and warm up the model, then serve the web workers until killed."""
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--socket", default=settings.ML_INFERENCE_SOCKET)
+    parser.add_argument(
+        "--max-batch-rows", type=int, default=settings.ML_SERVER_MAX_BATCH_ROWS
+    )
+    parser.add_argument(
+        "--window-ms", type=float, default=settings.ML_SERVER_BATCH_WINDOW_MS
+    )
+    parser.add_argument("--workers", type=int, default=settings.ML_SERVER_WORKERS)
+    parser.add_argument("--max-queue", type=int, default=settings.ML_SERVER_MAX_QUEUE)
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.INFO)
+
+    model = load_model(
+        warmup_batch_sizes=settings.ML_WARMUP_BATCH_SIZES,
+        warmup_iterations=settings.ML_WARMUP_ITERATIONS,
+    )
+    server = InferenceServer(
+        model,
+        args.socket,
+        max_batch_rows=args.max_batch_rows,
+        window_ms=args.window_ms,
+        workers=args.workers,
+        max_queue=args.max_queue,
+    )
+    try:
+        asyncio.run(server.serve_forever())
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
@@ -2,10 +2,46 @@
 """Initialize and benchmark the ML model."""
 
 import json
+import subprocess
+import sys
 import time
 from pathlib import Path
 
-from app.ml.model import get_model, predict
+import numpy as np
+
+from app.ml.model import MLModel, get_model, predict, save_optimized_model
+
+
+# Matches `fastapi run --workers 4` in the Dockerfile
+WORKERS = 4
+
+# Batch sizes compared between ONNX Runtime and the NumPy engine
+ENGINE_BATCH_SIZES = [1, 10, 100, 1_000, 10_000, 100_000]
+
+# What app.ml.model used to import at module level before training was split out
+TRAINING_IMPORTS = "import sklearn.ensemble, sklearn.preprocessing, skl2onnx"
+
+FOOTPRINT_SNIPPET = """
+import resource, time
+start = time.perf_counter()
+{extra_imports}
+from app.ml.model import get_model
+get_model()
+elapsed_ms = (time.perf_counter() - start) * 1000
+print(elapsed_ms, resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024)
+"""
+
+
+def measure_worker_footprint(extra_imports: str = "") -> tuple[float, float]:
+    """Import and load the model in a fresh interpreter, return (ms, peak RSS MB)."""
+    output = subprocess.run(
+        [sys.executable, "-c", FOOTPRINT_SNIPPET.format(extra_imports=extra_imports)],
+        check=True,
+        capture_output=True,
+        text=True,
+    ).stdout
+    import_ms, rss_mb = output.split()
+    return float(import_ms), float(rss_mb)
 
 
 def print_section(title: str) -> None:
@@ -27,9 +63,8 @@ def main() -> None:
 
     print(f"✓ Model initialized in {init_time:.2f}ms")
     print(f"  - ONNX Session: {'✓' if model.session else '✗'}")
-    print(f"  - Scaler: {'✓' if model.scaler else '✗'}")
+    print(f"  - Scaler: {'embedded in graph' if model.scaler is None else 'scaler.npy'}")
     print(f"  - Model file: {model.model_path.exists()}")
-    print(f"  - Scaler file: {model.scaler_path.exists()}")
 
     # 2. Test predictions
     print("\n[2] Testing predictions...")
@@ -58,8 +93,79 @@ def main() -> None:
     print(f"  - Avg: {sum(latencies)/len(latencies):.4f}ms")
     print(f"  - Max: {max(latencies):.4f}ms")
 
-    # 4. Model info
-    print("\n[4] Model Information")
+    # 4. Single-row overhead: generic session.run vs IOBinding fast path
+    print("\n[4] Single-row overhead (batch size 1, 10000 calls)...")
+    row = [0.1, 0.2, 0.3, 0.4, 0.5]
+    n_calls = 10000
+
+    start = time.perf_counter()
+    for _ in range(n_calls):
+        model._infer(np.array(row, dtype=np.float32).reshape(1, -1))
+    generic_us = (time.perf_counter() - start) / n_calls * 1e6
+
+    start = time.perf_counter()
+    for _ in range(n_calls):
+        model._infer_one(row)
+    fast_us = (time.perf_counter() - start) / n_calls * 1e6
+
+    print(f"✓ session.run (new arrays per call): {generic_us:.2f}us/call")
+    print(f"✓ IOBinding fast path:               {fast_us:.2f}us/call")
+    print(f"  - Speedup: {generic_us / fast_us:.2f}x")
+
+    # 5. Worker cold start: optimize at load vs pre-optimized artifact
+    print("\n[5] Worker cold start (session creation, 5 runs each)...")
+    optimized_path = save_optimized_model(model.model_path)
+    print(f"✓ Saved optimized model to {optimized_path.name}")
+    for label, use_optimized in [
+        ("model.onnx + graph optimization", False),
+        (f"{optimized_path.name}, optimization disabled", True),
+    ]:
+        timings = []
+        for _ in range(5):
+            start = time.perf_counter()
+            MLModel(model_path=model.model_path, use_optimized_model=use_optimized)
+            timings.append((time.perf_counter() - start) * 1000)
+        print(f"  - {label:45} min={min(timings):.2f}ms avg={sum(timings) / 5:.2f}ms")
+
+    # 6. Serving footprint per worker: lean serving vs training imports loaded
+    print(f"\n[6] Import time and RSS per worker (x{WORKERS} workers)...")
+    for label, extra_imports in [
+        ("serving only (numpy + onnxruntime)", ""),
+        ("with scikit-learn + skl2onnx", TRAINING_IMPORTS),
+    ]:
+        import_ms, rss_mb = measure_worker_footprint(extra_imports)
+        print(
+            f"  - {label:38} import+load={import_ms:.0f}ms "
+            f"rss={rss_mb:.0f}MB (x{WORKERS}: {rss_mb * WORKERS:.0f}MB)"
+        )
+
+    # 7. Inference engines
+    print("\n[7] ONNX Runtime vs NumPy engine (ms per batch, median)...")
+    engines = {
+        "onnx": model if model.engine == "onnx" else MLModel(engine="onnx"),
+        "numpy": model if model.engine == "numpy" else MLModel(engine="numpy"),
+    }
+    rng = np.random.default_rng(0)
+    for batch_size in ENGINE_BATCH_SIZES:
+        X = rng.standard_normal((batch_size, 5)).astype(np.float32)
+        runs = max(3, min(200, 100_000 // batch_size))
+        timings = {}
+        for name, engine_model in engines.items():
+            engine_model._infer(X)
+            samples = []
+            for _ in range(runs):
+                start = time.perf_counter()
+                engine_model._infer(X)
+                samples.append((time.perf_counter() - start) * 1000)
+            timings[name] = float(np.median(samples))
+        print(
+            f"  - batch={batch_size:>6}: onnx={timings['onnx']:9.3f}ms "
+            f"numpy={timings['numpy']:9.3f}ms "
+            f"(numpy/onnx x{timings['numpy'] / timings['onnx']:.2f})"
+        )
+
+    # 8. Model info
+    print("\n[8] Model Information")
     print(f"  - Format: ONNX")
     print(f"  - Framework: scikit-learn (Random Forest)")
     print(f"  - Input features: 5")
@@ -69,8 +175,8 @@ def main() -> None:
 
     print_section("Initialization Complete ✓")
 
-    # 5. Sample response
-    print("\n[5] Sample API Response")
+    # 9. Sample response
+    print("\n[9] Sample API Response")
     sample = predict([0.1, 0.2, 0.3, 0.4, 0.5])
     print(json.dumps(sample, indent=2))
 
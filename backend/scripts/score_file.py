@@ -0,0 +1,62 @@
+#!/usr/bin/env python3
+"""Score a .npy, CSV or Parquet feature file offline with a process pool."""
+
+import argparse
+import sys
+from pathlib import Path
+
+from app.ml.bulk import score_file
+
+
+def main() -> int:
+    """Score the input file and report throughput. Returns the exit code."""
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("input", type=Path, help=".npy, .csv or .parquet file")
+    parser.add_argument("output", type=Path, help="Predictions .npy file")
+    parser.add_argument(
+        "--workers", type=int, help="Worker processes (default: one per CPU)"
+    )
+    parser.add_argument("--shard-rows", type=int, default=65_536)
+    parser.add_argument(
+        "--intra-op-threads",
+        type=int,
+        default=1,
+        help="ONNX Runtime intra-op threads per worker (default: 1)",
+    )
+    parser.add_argument("--model-path", type=Path, help="Default: app/ml/model.onnx")
+    parser.add_argument(
+        "--csv-header", action="store_true", help="Skip the first CSV line"
+    )
+    parser.add_argument(
+        "--columns", nargs="+", help="Parquet feature columns (default: all)"
+    )
+    args = parser.parse_args()
+
+    try:
+        result = score_file(
+            args.input,
+            args.output,
+            workers=args.workers,
+            shard_rows=args.shard_rows,
+            intra_op_threads=args.intra_op_threads,
+            model_path=args.model_path,
+            csv_header=args.csv_header,
+            columns=args.columns,
+        )
+    except (OSError, ValueError) as e:
+        print(f"error: {e}", file=sys.stderr)
+        return 1
+
+    if result["convert_s"] and args.input.suffix.lower() != ".npy":
+        print(f"converted {args.input} in {result['convert_s']:.2f}s")
+    print(
+        f"scored {result['rows']:,} rows in {result['score_s']:.2f}s "
+        f"({result['rows_per_s']:,.0f} rows/s) with {result['workers']} workers, "
+        f"{result['shards']} shards, model {result['model_version']}"
+    )
+    print(f"predictions written to {args.output}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,10 +1,19 @@
+import asyncio
 import uuid
 
 from fastapi.testclient import TestClient
-from sqlmodel import Session
+from sqlmodel import Session, select
+from sqlmodel.ext.asyncio.session import AsyncSession
 
+from app import crud
+from app.api.routes.items import delete_item
 from app.core.config import settings
+from app.core.db import async_engine
+from app.crud import item_count_update
+from app.models import Item, ItemCreate, User, UserCreate
 from tests.utils.item import create_random_item
+from tests.utils.user import user_authentication_headers
+from tests.utils.utils import random_email, random_lower_string
 
 
 def test_create_item(
@@ -79,6 +88,69 @@ def test_read_items(
     assert len(content["data"]) >= 2
 
 
+def test_read_items_cursor_pagination(client: TestClient, db: Session) -> None:
+    password = random_lower_string()
+    user = crud.create_user(
+        session=db, user_create=UserCreate(email=random_email(), password=password)
+    )
+    for i in range(6):
+        crud.create_item(
+            session=db, item_in=ItemCreate(title=f"Item {i}"), owner_id=user.id
+        )
+    # Legacy row without created_at
+    legacy = crud.create_item(
+        session=db, item_in=ItemCreate(title="Legacy"), owner_id=user.id
+    )
+    legacy.created_at = None
+    db.add(legacy)
+    db.commit()
+    headers = user_authentication_headers(
+        client=client, email=user.email, password=password
+    )
+    url = f"{settings.API_V1_STR}/items/"
+
+    response = client.get(url, headers=headers, params={"limit": 100})
+    content = response.json()
+    assert content["count"] == 7
+    assert content["next_cursor"] is None
+    assert content["prev_cursor"] is None
+    all_ids = [item["id"] for item in content["data"]]
+    assert len(all_ids) == 7
+
+    # Forward through pages of 3 from the first offset page
+    content = client.get(url, headers=headers, params={"limit": 3}).json()
+    pages = [content]
+    while content["next_cursor"]:
+        params = {"limit": 3, "cursor": content["next_cursor"]}
+        content = client.get(url, headers=headers, params=params).json()
+        assert content["count"] is None
+        pages.append(content)
+    assert [len(page["data"]) for page in pages] == [3, 3, 1]
+    assert [item["id"] for page in pages for item in page["data"]] == all_ids
+
+    # And back
+    content = pages[-1]
+    back = []
+    while content["prev_cursor"]:
+        params = {"limit": 3, "cursor": content["prev_cursor"], "include_count": True}
+        content = client.get(url, headers=headers, params=params).json()
+        assert content["count"] == 7
+        back.append(content)
+    assert [[item["id"] for item in page["data"]] for page in back] == [
+        all_ids[3:6],
+        all_ids[0:3],
+    ]
+
+    # Offset pages also return cursors
+    content = client.get(url, headers=headers, params={"skip": 3, "limit": 3}).json()
+    assert [item["id"] for item in content["data"]] == all_ids[3:6]
+    assert content["prev_cursor"] and content["next_cursor"]
+
+    response = client.get(url, headers=headers, params={"cursor": "nope"})
+    assert response.status_code == 400
+    assert response.json() == {"detail": "Invalid cursor"}
+
+
 def test_update_item(
     client: TestClient, superuser_token_headers: dict[str, str], db: Session
 ) -> None:
@@ -139,6 +211,62 @@ def test_delete_item(
     assert content["message"] == "Item deleted successfully"
 
 
+def test_item_counts(
+    client: TestClient, superuser_token_headers: dict[str, str], db: Session
+) -> None:
+    password = random_lower_string()
+    user = crud.create_user(
+        session=db, user_create=UserCreate(email=random_email(), password=password)
+    )
+    headers = user_authentication_headers(
+        client=client, email=user.email, password=password
+    )
+    url = f"{settings.API_V1_STR}/items/"
+    ids = [
+        client.post(url, headers=headers, json={"title": f"Item {i}"}).json()["id"]
+        for i in range(3)
+    ]
+    client.delete(f"{url}{ids[0]}", headers=headers)
+
+    assert client.get(url, headers=headers).json()["count"] == 2
+    db_user = db.get(User, user.id)
+    assert db_user
+    db.refresh(db_user)
+    assert db_user.item_count == 2
+
+    # Superusers: total of all counters, or the planner estimate
+    total = client.get(url, headers=superuser_token_headers).json()["count"]
+    assert total == sum(db.exec(select(User.item_count)).all())
+    params = {"estimate_count": True}
+    response = client.get(url, headers=superuser_token_headers, params=params)
+    assert isinstance(response.json()["count"], int)
+
+
+def test_delete_item_deleted_concurrently(db: Session) -> None:
+    """An item deleted by another request meanwhile is not counted twice."""
+    item = create_random_item(db)
+    owner = db.get(User, item.owner_id)
+    assert owner
+
+    async def delete_concurrently() -> None:
+        try:
+            async with AsyncSession(async_engine, expire_on_commit=False) as session:
+                # Loaded before the other request deletes it
+                loaded = await session.get(Item, item.id)
+                assert loaded
+                db.delete(db.get(Item, item.id))
+                db.exec(item_count_update(item.owner_id, -1))  # type: ignore[call-overload]
+                db.commit()
+                await delete_item(session=session, current_user=owner, id=item.id)
+        finally:
+            await async_engine.dispose()
+
+    asyncio.run(delete_concurrently())
+
+    db.refresh(owner)
+    assert owner.item_count == 0
+
+
 def test_delete_item_not_found(
     client: TestClient, superuser_token_headers: dict[str, str]
 ) -> None:
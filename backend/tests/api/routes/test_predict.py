@@ -0,0 +1,360 @@
+import asyncio
+import io
+import json
+import threading
+
+import numpy as np
+import pytest
+from fastapi.testclient import TestClient
+
+from app.api.api_v1 import ml_example
+from app.core.config import settings
+from app.ml import executor as ml_executor
+from app.ml import model as ml_model
+from app.ml import server as ml_server
+from app.ml.executor import InferenceExecutor
+from app.ml.metrics import get_histogram, reset_histograms
+from app.ml.model import get_model, load_model
+from app.ml.server import InferenceServer
+
+
+def test_predict(client: TestClient) -> None:
+    response = client.post(
+        f"{settings.API_V1_STR}/predict/predict", json=[0.1, 0.2, 0.3, 0.4, 0.5]
+    )
+    assert response.status_code == 200
+    content = response.json()
+    assert isinstance(content["prediction"], float)
+    assert content["model_format"] == "ONNX"
+
+
+def test_predict_invalid_length(client: TestClient) -> None:
+    response = client.post(f"{settings.API_V1_STR}/predict/predict", json=[0.1])
+    assert response.status_code == 400
+
+
+def test_predict_batch(client: TestClient) -> None:
+    rows = [[0.1, 0.2, 0.3, 0.4, 0.5]] * 3
+    response = client.post(f"{settings.API_V1_STR}/predict/batch", json=rows)
+    assert response.status_code == 200
+    content = response.json()
+    assert content["count"] == 3
+    assert len(content["predictions"]) == 3
+
+
+def test_predict_batch_too_large(
+    client: TestClient, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    monkeypatch.setattr(settings, "ML_PREDICT_BATCH_MAX_ROWS", 2)
+    rows = [[0.1, 0.2, 0.3, 0.4, 0.5]] * 3
+    response = client.post(f"{settings.API_V1_STR}/predict/batch", json=rows)
+    assert response.status_code == 413
+    example = TestClient(ml_example.app)
+    response = example.post("/predict/batch", json={"data": rows})
+    assert response.status_code == 413
+    response = example.post("/predict/batch", json={"data": rows[:2]})
+    assert response.status_code == 200
+    assert response.json()["count"] == 2
+
+
+def test_live(client: TestClient) -> None:
+    response = client.get(f"{settings.API_V1_STR}/predict/live")
+    assert response.status_code == 200
+    assert response.json() == {"status": "alive"}
+
+
+def test_ready(client: TestClient) -> None:
+    load_model()
+    response = client.get(f"{settings.API_V1_STR}/predict/ready")
+    assert response.status_code == 200
+    assert response.json()["status"] == "ready"
+
+    response = client.get(f"{settings.API_V1_STR}/predict/health")
+    assert response.json()["status"] == "healthy"
+
+
+def test_not_ready_does_not_trigger_loading(
+    client: TestClient, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    monkeypatch.setattr(ml_model, "_model_instance", None)
+    monkeypatch.setattr(ml_model, "_model_status", "loading")
+
+    response = client.get(f"{settings.API_V1_STR}/predict/ready")
+    assert response.status_code == 503
+    assert response.json()["status"] == "loading"
+
+    response = client.get(f"{settings.API_V1_STR}/predict/health")
+    assert response.json()["status"] == "unhealthy"
+    assert ml_model._model_instance is None
+
+
+def test_reload_requires_superuser(
+    client: TestClient, normal_user_token_headers: dict[str, str]
+) -> None:
+    response = client.post(
+        f"{settings.API_V1_STR}/predict/reload", headers=normal_user_token_headers
+    )
+    assert response.status_code == 403
+
+
+def test_reload_unchanged(
+    client: TestClient, superuser_token_headers: dict[str, str]
+) -> None:
+    response = client.post(
+        f"{settings.API_V1_STR}/predict/reload", headers=superuser_token_headers
+    )
+    assert response.status_code == 200
+    content = response.json()
+    assert content["reloaded"] is False
+    assert content["model_version"] == get_model().version
+
+
+def test_predict_queue_full(
+    client: TestClient, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    executor = InferenceExecutor(max_workers=1, max_queue=0, retry_after=2)
+    # Every slot taken by a request that has not finished yet
+    executor._pending = 1
+    monkeypatch.setattr(ml_executor, "_executor_instance", executor)
+    monkeypatch.setattr(settings, "ML_EXECUTOR_REJECT_STATUS_CODE", 429)
+
+    for path, payload in [
+        ("predict", [0.1, 0.2, 0.3, 0.4, 0.5]),
+        ("batch", [[0.1, 0.2, 0.3, 0.4, 0.5]]),
+    ]:
+        response = client.post(f"{settings.API_V1_STR}/predict/{path}", json=payload)
+        assert response.status_code == 429
+        assert response.headers["Retry-After"] == "2"
+    assert executor.stats()["rejected"] == 2
+
+
+def test_health_reports_executor(client: TestClient) -> None:
+    load_model()
+    response = client.get(f"{settings.API_V1_STR}/predict/health")
+    executor = response.json()["executor"]
+    assert executor["workers"] == settings.ML_EXECUTOR_WORKERS
+    assert executor["queue_depth"] >= 0
+
+
+def test_metrics(client: TestClient) -> None:
+    reset_histograms()
+    client.post(f"{settings.API_V1_STR}/predict/predict", json=[0.1] * 5)
+    client.post(f"{settings.API_V1_STR}/predict/batch", json=[[0.1] * 5] * 2)
+    # CRUD endpoints are not recorded
+    client.get(f"{settings.API_V1_STR}/utils/health-check/")
+
+    response = client.get("/metrics")
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/plain")
+    for stage in ["parse", "validation", "inference", "serialization", "total"]:
+        assert get_histogram(stage).count == 2
+        assert f'ml_stage_duration_seconds_count{{stage="{stage}"}} 2' in response.text
+    assert "ml_executor_queue_depth" in response.text
+
+
+def test_predict_batch_binary_formats(client: TestClient) -> None:
+    rows = np.random.default_rng(0).standard_normal((4, 5)).astype(np.float32)
+    expected = client.post(
+        f"{settings.API_V1_STR}/predict/batch", json=rows.tolist()
+    ).json()["predictions"]
+
+    f = io.BytesIO()
+    np.save(f, rows)
+    for content_type, body in [
+        ("application/octet-stream", rows.tobytes()),
+        ("application/x-npy", f.getvalue()),
+    ]:
+        response = client.post(
+            f"{settings.API_V1_STR}/predict/batch",
+            content=body,
+            headers={"Content-Type": content_type},
+        )
+        assert response.status_code == 200
+        np.testing.assert_allclose(response.json()["predictions"], expected)
+
+        # Same format back, latency info in headers
+        response = client.post(
+            f"{settings.API_V1_STR}/predict/batch",
+            content=body,
+            headers={"Content-Type": content_type, "Accept": content_type},
+        )
+        assert response.status_code == 200
+        assert response.headers["content-type"] == content_type
+        assert response.headers["X-Model-Version"] == get_model().version
+        if content_type == "application/x-npy":
+            predictions = np.load(io.BytesIO(response.content))
+        else:
+            predictions = np.frombuffer(response.content, dtype="<f4")
+        np.testing.assert_allclose(predictions, expected, rtol=1e-6)
+
+
+def test_predict_binary_single_row(client: TestClient) -> None:
+    row = np.array([0.1, 0.2, 0.3, 0.4, 0.5], dtype=np.float32)
+    response = client.post(
+        f"{settings.API_V1_STR}/predict/predict",
+        content=row.tobytes(),
+        headers={
+            "Content-Type": "application/octet-stream",
+            "Accept": "application/octet-stream",
+        },
+    )
+    assert response.status_code == 200
+    (prediction,) = np.frombuffer(response.content, dtype="<f4")
+    assert prediction == pytest.approx(get_model().predict(row.tolist())["prediction"])
+
+    response = client.post(
+        f"{settings.API_V1_STR}/predict/predict",
+        content=np.zeros((2, 5), dtype=np.float32).tobytes(),
+        headers={"Content-Type": "application/octet-stream"},
+    )
+    assert response.status_code == 400
+
+
+def test_predict_batch_invalid_bodies(client: TestClient) -> None:
+    url = f"{settings.API_V1_STR}/predict/batch"
+    response = client.post(
+        url, content=b"\x00" * 6, headers={"Content-Type": "application/octet-stream"}
+    )
+    assert response.status_code == 400
+    response = client.post(url, content=b"a,b", headers={"Content-Type": "text/csv"})
+    assert response.status_code == 415
+    response = client.post(url, json=[["a"] * 5])
+    assert response.status_code == 422
+
+
+def test_predict_stream(client: TestClient) -> None:
+    rows = np.random.default_rng(0).standard_normal((50, 5)).round(4).tolist()
+    lines = [json.dumps(row) for row in rows] + ["not json"]
+
+    def body():
+        for line in lines:
+            yield (line + "\n").encode()
+
+    with client.stream(
+        "POST",
+        f"{settings.API_V1_STR}/predict/stream",
+        content=body(),
+        headers={"Content-Type": "application/x-ndjson"},
+    ) as response:
+        assert response.status_code == 200
+        assert response.headers["content-type"] == "application/x-ndjson"
+        assert response.headers["X-Model-Version"] == get_model().version
+        results = [json.loads(line) for line in response.iter_lines()]
+
+    assert len(results) == 51
+    assert results[-1] == {"line": 51, "error": "Invalid JSON"}
+    np.testing.assert_allclose(
+        [result["prediction"] for result in results[:-1]],
+        get_model().predict_batch(rows)["predictions"],
+    )
+
+    response = client.post(
+        f"{settings.API_V1_STR}/predict/stream",
+        content=b"1,2,3,4,5\n",
+        headers={"Content-Type": "text/csv"},
+    )
+    assert response.status_code == 200
+    assert response.text.splitlines()[0] == "line,prediction,error"
+
+    response = client.post(f"{settings.API_V1_STR}/predict/stream", json=rows)
+    assert response.status_code == 415
+
+
+def test_predict_lean(client: TestClient) -> None:
+    row = [0.1, 0.2, 0.3, 0.4, 0.5]
+    response = client.post(f"{settings.API_V1_STR}/predict/predict?lean=true", json=row)
+    assert response.status_code == 200
+    content = response.json()
+    assert content["prediction"] == pytest.approx(
+        get_model().predict(row)["prediction"]
+    )
+    assert "latency_ms" not in content
+    assert "total_time_ms" not in content
+
+    response = client.post(
+        f"{settings.API_V1_STR}/predict/batch?lean=true", json=[row, row]
+    )
+    assert response.status_code == 200
+    assert set(response.json()) == {
+        "predictions",
+        "count",
+        "model_format",
+        "features_count",
+        "model_version",
+    }
+
+
+@pytest.fixture
+def inference_server(tmp_path, monkeypatch):
+    """Inference server on its own thread, the app switched to server mode."""
+    socket_path = tmp_path / "inference.sock"
+    server = InferenceServer(get_model(), socket_path)
+    ready = threading.Event()
+    loop_and_stop: list = []
+
+    async def serve() -> None:
+        started, stop = asyncio.Event(), asyncio.Event()
+        task = asyncio.create_task(server.serve_forever(started))
+        await started.wait()
+        loop_and_stop.extend([asyncio.get_running_loop(), stop])
+        ready.set()
+        await stop.wait()
+        task.cancel()
+
+    thread = threading.Thread(target=asyncio.run, args=(serve(),), daemon=True)
+    thread.start()
+    ready.wait(10)
+    monkeypatch.setattr(settings, "ML_INFERENCE_MODE", "server")
+    monkeypatch.setattr(settings, "ML_INFERENCE_SOCKET", str(socket_path))
+    monkeypatch.setattr(ml_server, "_client_instance", None)
+    yield server
+    if ml_server._client_instance is not None:
+        ml_server._client_instance.close()
+    loop, stop = loop_and_stop
+    loop.call_soon_threadsafe(stop.set)
+    thread.join(10)
+
+
+def test_predict_server_mode(
+    client: TestClient,
+    inference_server: InferenceServer,
+    superuser_token_headers: dict[str, str],
+) -> None:
+    row = [0.1, 0.2, 0.3, 0.4, 0.5]
+    expected = get_model().predict(row)["prediction"]
+
+    response = client.get(f"{settings.API_V1_STR}/predict/ready")
+    assert response.status_code == 200
+    assert response.json()["status"] == "ready"
+
+    response = client.post(f"{settings.API_V1_STR}/predict/predict", json=row)
+    assert response.status_code == 200
+    assert response.json()["prediction"] == pytest.approx(expected)
+    assert response.json()["model_version"] == get_model().version
+
+    response = client.post(f"{settings.API_V1_STR}/predict/batch", json=[row] * 3)
+    assert response.status_code == 200
+    assert response.json()["predictions"] == pytest.approx([expected] * 3)
+    assert inference_server.rows >= 4
+
+    response = client.post(
+        f"{settings.API_V1_STR}/predict/reload", headers=superuser_token_headers
+    )
+    assert response.status_code == 409
+
+
+def test_predict_server_mode_unavailable(
+    client: TestClient, tmp_path, monkeypatch
+) -> None:
+    monkeypatch.setattr(settings, "ML_INFERENCE_MODE", "server")
+    monkeypatch.setattr(settings, "ML_INFERENCE_SOCKET", str(tmp_path / "none.sock"))
+    monkeypatch.setattr(ml_server, "_client_instance", None)
+    try:
+        response = client.post(f"{settings.API_V1_STR}/predict/predict", json=[0.0] * 5)
+        assert response.status_code == 503
+        assert "Retry-After" in response.headers
+        response = client.get(f"{settings.API_V1_STR}/predict/ready")
+        assert response.status_code == 503
+    finally:
+        if ml_server._client_instance is not None:
+            ml_server._client_instance.close()
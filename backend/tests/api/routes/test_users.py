@@ -7,7 +7,7 @@ from sqlmodel import Session, select
 from app import crud
 from app.core.config import settings
 from app.core.security import verify_password
-from app.models import User, UserCreate
+from app.models import Item, ItemCreate, User, UserCreate
 from tests.utils.user import create_random_user
 from tests.utils.utils import random_email, random_lower_string
 
@@ -198,6 +198,32 @@ def test_retrieve_users(
         assert "email" in item
 
 
+def test_retrieve_users_cursor_pagination(
+    client: TestClient, superuser_token_headers: dict[str, str], db: Session
+) -> None:
+    for _ in range(3):
+        user_in = UserCreate(email=random_email(), password=random_lower_string())
+        crud.create_user(session=db, user_create=user_in)
+    url = f"{settings.API_V1_STR}/users/"
+
+    first = client.get(url, headers=superuser_token_headers, params={"limit": 2}).json()
+    assert first["count"] > 3
+    assert first["prev_cursor"] is None
+
+    params = {"limit": 2, "cursor": first["next_cursor"]}
+    second = client.get(url, headers=superuser_token_headers, params=params).json()
+    assert second["count"] is None
+    offset = client.get(
+        url, headers=superuser_token_headers, params={"skip": 2, "limit": 2}
+    ).json()
+    assert second["data"] == offset["data"]
+
+    params = {"limit": 2, "cursor": second["prev_cursor"]}
+    back = client.get(url, headers=superuser_token_headers, params=params).json()
+    assert back["data"] == first["data"]
+    assert back["prev_cursor"] is None
+
+
 def test_update_user_me(
     client: TestClient, normal_user_token_headers: dict[str, str], db: Session
 ) -> None:
@@ -479,6 +505,23 @@ def test_delete_user_super_user(
     assert result is None
 
 
+def test_delete_user_with_items(
+    client: TestClient, superuser_token_headers: dict[str, str], db: Session
+) -> None:
+    user = create_random_user(db)
+    for _ in range(2):
+        crud.create_item(session=db, item_in=ItemCreate(title="Foo"), owner_id=user.id)
+    user_id = user.id
+    db.expire_all()
+    r = client.delete(
+        f"{settings.API_V1_STR}/users/{user_id}",
+        headers=superuser_token_headers,
+    )
+    assert r.status_code == 200
+    assert db.exec(select(Item).where(Item.owner_id == user_id)).first() is None
+    assert crud.check_item_counts(session=db) == []
+
+
 def test_delete_user_not_found(
     client: TestClient, superuser_token_headers: dict[str, str]
 ) -> None:
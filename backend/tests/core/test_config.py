@@ -0,0 +1,20 @@
+import pytest
+
+from app.core.config import Settings
+
+
+@pytest.mark.parametrize(
+    ("value", "expected"),
+    [("8", [8]), ("1,32", [1, 32]), (" 2 , 16 ", [2, 16]), ("[1, 4]", [1, 4])],
+)
+def test_warmup_batch_sizes_from_env(
+    monkeypatch: pytest.MonkeyPatch, value: str, expected: list[int]
+) -> None:
+    monkeypatch.setenv("ML_WARMUP_BATCH_SIZES", value)
+    assert Settings().ML_WARMUP_BATCH_SIZES == expected  # type: ignore[call-arg]
+
+
+def test_warmup_batch_sizes_rejects_non_ints(monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.setenv("ML_WARMUP_BATCH_SIZES", "1,large")
+    with pytest.raises(ValueError):
+        Settings()  # type: ignore[call-arg]
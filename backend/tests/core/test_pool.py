@@ -0,0 +1,81 @@
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine, exc
+from sqlalchemy.pool import QueuePool
+
+from app.api.deps import get_async_db
+from app.core.config import settings
+from app.core.pool import PoolMetrics, timed_pool_class, watch_pool
+from app.main import app
+
+
+def test_timed_pool_records_checkouts_and_timeouts() -> None:
+    metrics = PoolMetrics()
+    engine = create_engine(
+        str(settings.SQLALCHEMY_DATABASE_URI),
+        poolclass=timed_pool_class(QueuePool, metrics),
+        pool_size=1,
+        max_overflow=0,
+        pool_timeout=0.1,
+    )
+    watch_pool(engine.pool, metrics)
+    try:
+        with engine.connect():
+            assert metrics.in_use == 1
+            # Exhausted pool: fails after pool_timeout instead of hanging
+            with pytest.raises(exc.TimeoutError):
+                engine.connect()
+        assert metrics.in_use == 0
+        assert metrics.checkouts == 1
+        assert metrics.timeouts == 1
+        assert metrics.wait.count == 2
+        assert metrics.wait.max_ns >= 100_000_000
+
+        # Listeners survive the pool being replaced
+        engine.dispose()
+        with engine.connect():
+            assert metrics.in_use == 1
+        assert metrics.checkouts == 2
+    finally:
+        engine.dispose()
+
+
+def test_pool_exhausted_returns_503(
+    client: TestClient, superuser_token_headers: dict[str, str]
+) -> None:
+    async def exhausted_pool():
+        raise exc.TimeoutError("QueuePool limit of size 5 overflow 10 reached")
+        yield
+
+    app.dependency_overrides[get_async_db] = exhausted_pool
+    try:
+        response = client.get(
+            f"{settings.API_V1_STR}/items/", headers=superuser_token_headers
+        )
+    finally:
+        app.dependency_overrides.pop(get_async_db)
+    assert response.status_code == 503
+    assert response.headers["Retry-After"] == str(
+        settings.POSTGRES_POOL_RETRY_AFTER_SECONDS
+    )
+    assert response.json() == {
+        "detail": "Database connection pool exhausted, retry later"
+    }
+
+
+def test_pool_metrics(
+    client: TestClient, superuser_token_headers: dict[str, str]
+) -> None:
+    client.get(f"{settings.API_V1_STR}/items/", headers=superuser_token_headers)
+
+    response = client.get("/metrics")
+    assert response.status_code == 200
+    assert 'db_pool_checkout_wait_seconds_count{engine="async"}' in response.text
+    assert "db_pool_async_in_use 0.0" in response.text
+    assert f"db_pool_async_size {float(settings.POSTGRES_POOL_SIZE)}" in response.text
+    checkouts = next(
+        line
+        for line in response.text.splitlines()
+        if line.startswith("db_pool_async_checkouts_total")
+    )
+    assert float(checkouts.split()[1]) >= 1
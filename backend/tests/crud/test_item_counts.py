@@ -0,0 +1,28 @@
+from sqlalchemy import update
+from sqlmodel import Session
+
+from app import crud
+from app.models import ItemCreate, User
+from tests.utils.user import create_random_user
+
+
+def test_create_item_increments_item_count(db: Session) -> None:
+    user = create_random_user(db)
+    for _ in range(3):
+        crud.create_item(session=db, item_in=ItemCreate(title="Foo"), owner_id=user.id)
+    db.refresh(user)
+    assert user.item_count == 3
+
+
+def test_check_and_repair_item_counts(db: Session) -> None:
+    user = create_random_user(db)
+    crud.create_item(session=db, item_in=ItemCreate(title="Foo"), owner_id=user.id)
+    # Counter drift, e.g. items deleted by hand
+    db.exec(update(User).where(User.id == user.id).values(item_count=5))  # type: ignore[call-overload]
+    db.commit()
+
+    assert crud.check_item_counts(session=db) == [(user.id, 5, 1)]
+    assert crud.repair_item_counts(session=db) == 1
+    assert crud.check_item_counts(session=db) == []
+    db.refresh(user)
+    assert user.item_count == 1
@@ -0,0 +1,63 @@
+"""
+Query-plan regression tests: the item and user listings must be read in
+order from their index, not sorted after a sequential scan.
+
+The test tables are small enough that the planner would rather scan and
+sort, so sequential scans, bitmap scans and sorts are disabled for the
+EXPLAIN: the plan still sorts if no index can serve the query.
+"""
+
+import uuid
+from datetime import datetime, timezone
+
+import pytest
+from sqlalchemy import text
+from sqlalchemy.sql.expression import ClauseElement
+from sqlmodel import Session, select
+
+from app.core.db import engine
+from app.models import Item, User
+from app.pagination import Cursor, paginate
+
+CURSOR_TIME = datetime(2026, 1, 1, tzinfo=timezone.utc)
+OWNER_ID = uuid.uuid4()
+
+
+def explain(statement: ClauseElement) -> str:
+    with Session(engine) as session, session.begin():
+        for setting in ("enable_seqscan", "enable_bitmapscan", "enable_sort"):
+            session.execute(text(f"SET LOCAL {setting} = off"))
+        compiled = statement.compile(dialect=engine.dialect)
+        rows = session.connection().exec_driver_sql(
+            f"EXPLAIN {compiled}", compiled.params
+        )
+        return "\n".join(row[0] for row in rows)
+
+
+@pytest.mark.parametrize(
+    "cursor",
+    [
+        None,
+        Cursor(CURSOR_TIME, uuid.uuid4()),
+        Cursor(CURSOR_TIME, uuid.uuid4(), before=True),
+    ],
+    ids=["offset", "next", "prev"],
+)
+def test_owner_item_listing_uses_index(cursor: Cursor | None) -> None:
+    statement = paginate(
+        select(Item).where(Item.owner_id == OWNER_ID), Item, cursor, 0, 100
+    )
+    plan = explain(statement)
+    assert "Index Scan" in plan and "ix_item_owner_id_created_at_id" in plan, plan
+    assert "Sort" not in plan, plan
+
+
+@pytest.mark.parametrize(
+    "cursor",
+    [None, Cursor(CURSOR_TIME, uuid.uuid4())],
+    ids=["offset", "next"],
+)
+def test_user_listing_uses_index(cursor: Cursor | None) -> None:
+    plan = explain(paginate(select(User), User, cursor, 0, 100))
+    assert "Index Scan" in plan and "ix_user_created_at_id" in plan, plan
+    assert "Sort" not in plan, plan
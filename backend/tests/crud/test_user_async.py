@@ -0,0 +1,90 @@
+import asyncio
+from collections.abc import Awaitable, Callable
+from typing import TypeVar
+
+from sqlmodel import Session
+from sqlmodel.ext.asyncio.session import AsyncSession
+
+from app import async_crud
+from app.core.db import async_engine
+from app.core.security import verify_password
+from app.models import ItemCreate, User, UserCreate, UserUpdate
+from tests.utils.utils import random_email, random_lower_string
+
+T = TypeVar("T")
+
+
+def run_async(func: Callable[[AsyncSession], Awaitable[T]]) -> T:
+    async def run() -> T:
+        try:
+            async with AsyncSession(async_engine, expire_on_commit=False) as session:
+                return await func(session)
+        finally:
+            # Pooled connections are bound to this event loop
+            await async_engine.dispose()
+
+    return asyncio.run(run())
+
+
+def test_create_user_and_authenticate(db: Session) -> None:
+    email = random_email()
+    password = random_lower_string()
+    user_in = UserCreate(email=email, password=password)
+
+    async def create_and_authenticate(
+        session: AsyncSession,
+    ) -> tuple[User, User | None]:
+        user = await async_crud.create_user(session=session, user_create=user_in)
+        authenticated_user = await async_crud.authenticate(
+            session=session, email=email, password=password
+        )
+        return user, authenticated_user
+
+    user, authenticated_user = run_async(create_and_authenticate)
+    assert authenticated_user
+    assert authenticated_user.id == user.id
+    db_user = db.get(User, user.id)
+    assert db_user
+    assert db_user.email == email
+
+
+def test_not_authenticate_user() -> None:
+    user = run_async(
+        lambda session: async_crud.authenticate(
+            session=session, email=random_email(), password=random_lower_string()
+        )
+    )
+    assert user is None
+
+
+def test_update_user() -> None:
+    user_in = UserCreate(email=random_email(), password=random_lower_string())
+    new_password = random_lower_string()
+
+    async def create_and_update(session: AsyncSession) -> User:
+        user = await async_crud.create_user(session=session, user_create=user_in)
+        user_in_update = UserUpdate(password=new_password, full_name="Async")
+        return await async_crud.update_user(
+            session=session, db_user=user, user_in=user_in_update
+        )
+
+    user = run_async(create_and_update)
+    assert user.full_name == "Async"
+    verified, _ = verify_password(new_password, user.hashed_password)
+    assert verified
+
+
+def test_get_user_by_email_and_create_item() -> None:
+    user_in = UserCreate(email=random_email(), password=random_lower_string())
+
+    async def create(session: AsyncSession) -> tuple[User, User | None]:
+        user = await async_crud.create_user(session=session, user_create=user_in)
+        await async_crud.create_item(
+            session=session, item_in=ItemCreate(title="Async"), owner_id=user.id
+        )
+        found = await async_crud.get_user_by_email(session=session, email=user.email)
+        return user, found
+
+    user, found = run_async(create)
+    assert found
+    assert found.id == user.id
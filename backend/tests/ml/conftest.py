@@ -0,0 +1,11 @@
+import pytest
+
+from app.ml.model import get_model
+
+
+@pytest.fixture
+def model_copy(tmp_path):
+    """Copy of the serving model.onnx in a scratch directory."""
+    source = tmp_path / "model.onnx"
+    source.write_bytes(get_model().model_path.read_bytes())
+    return source
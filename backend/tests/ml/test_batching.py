@@ -0,0 +1,99 @@
+"""Tests for the micro-batching scheduler."""
+
+import asyncio
+import threading
+import time
+
+import numpy as np
+import pytest
+
+from app.ml.batching import MicroBatcher
+from app.ml.executor import InferenceQueueFull, get_inference_executor
+from app.ml.model import get_model, predict
+
+
+def test_batcher_matches_single_predictions():
+    """Batched results equal the unbatched predictions, in order."""
+    rows = [[i / 10, -i / 10, 0.5, 0.25, float(i)] for i in range(20)]
+    batcher = MicroBatcher(get_model(), max_batch_size=8, window_ms=5.0)
+
+    async def run():
+        return await asyncio.gather(*(batcher.predict(row) for row in rows))
+
+    results = asyncio.run(run())
+
+    for row, result in zip(rows, results, strict=True):
+        assert result["prediction"] == pytest.approx(predict(row)["prediction"])
+        assert 1 <= result["batch_size"] <= 8
+        assert result["queue_wait_ms"] >= 0
+        assert result["latency_ms"] > 0
+    assert max(r["batch_size"] for r in results) > 1
+
+
+class _SlowModel:
+    """Records how many batches are scored at once."""
+
+    version = "slow"
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.running = 0
+        self.max_running = 0
+
+    def _infer(self, X):
+        with self.lock:
+            self.running += 1
+            self.max_running = max(self.max_running, self.running)
+        time.sleep(0.05)
+        with self.lock:
+            self.running -= 1
+        return np.zeros(len(X), dtype=np.float32)
+
+
+def test_batcher_overlaps_batches():
+    """Batches run concurrently on the executor workers, not one at a time."""
+    model = _SlowModel()
+    batcher = MicroBatcher(model, max_batch_size=1, window_ms=0)
+
+    async def run():
+        return await asyncio.gather(*(batcher.predict([0.0] * 5) for _ in range(8)))
+
+    results = asyncio.run(run())
+
+    assert len(results) == 8
+    assert 1 < model.max_running <= get_inference_executor().max_workers
+
+
+def test_batcher_rejects_when_queue_is_full():
+    """Requests beyond max_queue are rejected instead of waiting."""
+    batcher = MicroBatcher(
+        _SlowModel(), max_batch_size=1, window_ms=0, max_queue=2, retry_after=3
+    )
+
+    async def run():
+        # Queued synchronously, before the batching task takes any
+        waiting = [asyncio.ensure_future(batcher.predict([0.0] * 5)) for _ in range(2)]
+        await asyncio.sleep(0)
+        with pytest.raises(InferenceQueueFull) as exc_info:
+            await batcher.predict([0.0] * 5)
+        await asyncio.gather(*waiting)
+        return exc_info.value
+
+    error = asyncio.run(run())
+    assert error.retry_after == 3
+    assert batcher.rejected == 1
+
+
+def test_batcher_zero_window():
+    """A zero window still serves requests one batch at a time."""
+    batcher = MicroBatcher(get_model(), max_batch_size=4, window_ms=0)
+    result = asyncio.run(batcher.predict([0.0, 0.0, 0.0, 0.0, 0.0]))
+    assert result["batch_size"] == 1
+    assert isinstance(result["prediction"], float)
+
+
+def test_batcher_invalid_input_length():
+    """Invalid rows are rejected before being queued."""
+    batcher = MicroBatcher(get_model())
+    with pytest.raises(ValueError, match="Expected 5 features"):
+        asyncio.run(batcher.predict([1.0, 2.0]))
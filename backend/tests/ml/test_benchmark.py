@@ -0,0 +1,79 @@
+"""Tests for the MLModel benchmark suite."""
+
+import json
+
+from app.core.config import settings
+from app.ml.benchmark import compare_results, compare_serving_modes, run_benchmark
+
+
+def test_run_benchmark():
+    """Every combination is measured and the results are JSON-serializable."""
+    results = run_benchmark(
+        batch_sizes=[1, 16], threads=[1, 2], intra_op_threads=[1], iterations=5
+    )
+
+    assert set(results["cold"]) == {"1"}
+    assert results["cold"]["1"]["load_ms"] > 0
+    assert set(results["cold"]["1"]["first_call_ms"]) == {"1", "16"}
+    assert len(results["warm"]) == 4
+    for case in results["warm"]:
+        assert case["iterations"] == 5
+        assert case["throughput_rows_per_s"] > 0
+        assert 0 < case["p50"] <= case["p90"] <= case["p99"] <= case["p999"]
+    assert results["metadata"]["model_version"]
+    # The intra-op override does not leak into the settings
+    assert settings.ML_ORT_INTRA_OP_NUM_THREADS == 0
+    assert json.loads(json.dumps(results)) == results
+
+
+def _results(p50: float, p99: float, throughput: float, load_ms: float) -> dict:
+    return {
+        "cold": {"0": {"load_ms": load_ms, "first_call_ms": {}}},
+        "warm": [
+            {
+                "intra_op_threads": 0,
+                "threads": 1,
+                "batch_size": 32,
+                "p50": p50,
+                "p99": p99,
+                "throughput_rows_per_s": throughput,
+            }
+        ],
+    }
+
+
+def test_compare_results():
+    """Only changes beyond the threshold in the bad direction are reported."""
+    baseline = _results(p50=1.0, p99=2.0, throughput=1000.0, load_ms=50.0)
+
+    # Faster everywhere, or slower within the threshold
+    assert compare_results(_results(0.5, 1.0, 2000.0, 20.0), baseline, 0.1) == []
+    assert compare_results(_results(1.05, 2.1, 950.0, 52.0), baseline, 0.1) == []
+
+    regressions = compare_results(_results(1.5, 2.0, 800.0, 80.0), baseline, 0.1)
+    assert {(r["case"], r["metric"]) for r in regressions} == {
+        ("intra_op=0/threads=1/batch=32", "p50"),
+        ("intra_op=0/threads=1/batch=32", "throughput_rows_per_s"),
+        ("cold/intra_op=0", "load_ms"),
+    }
+    p50 = next(r for r in regressions if r["metric"] == "p50")
+    assert p50["change"] == 0.5
+
+
+def test_compare_results_ignores_new_cases():
+    """Cases absent from the baseline are not regressions."""
+    assert compare_results(_results(9.0, 9.0, 1.0, 9.0), {"warm": []}, 0.1) == []
+
+
+def test_compare_serving_modes():
+    """Both serving modes score rows and report their memory."""
+    results = compare_serving_modes(
+        web_workers=2, concurrency=2, batch_size=4, duration=0.2
+    )
+
+    for mode in ("local", "server"):
+        assert results[mode]["rows_per_s"] > 0
+        assert results[mode]["memory_mb"] > 0
+    assert len(results["local"]["processes_mb"]) == 2
+    assert "server" in results["server"]["processes_mb"]
+    assert json.loads(json.dumps(results)) == results
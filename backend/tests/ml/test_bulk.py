@@ -0,0 +1,98 @@
+"""Tests for offline bulk scoring."""
+
+import numpy as np
+import pytest
+
+from app.ml import bulk
+from app.ml.model import get_model
+
+X = np.random.default_rng(0).standard_normal((1000, 5)).astype(np.float32)
+
+
+def test_npy_source_is_memory_mapped(tmp_path):
+    path = tmp_path / "features.npy"
+    np.save(path, X.astype(np.float64))
+
+    source = bulk.npy_source(path)
+    features = source.open()
+
+    assert source.rows == 1000
+    assert isinstance(features, np.memmap)
+    np.testing.assert_array_equal(features, X)
+
+
+def test_npy_source_rejects_wrong_shape(tmp_path):
+    path = tmp_path / "features.npy"
+    np.save(path, X[:, :3])
+    with pytest.raises(ValueError, match="Expected an"):
+        bulk.npy_source(path)
+
+
+def test_score_npy_file_with_process_pool(tmp_path):
+    """Shards scored by separate worker processes land in input order."""
+    np.save(tmp_path / "features.npy", X)
+
+    result = bulk.score_file(
+        tmp_path / "features.npy",
+        tmp_path / "predictions.npy",
+        workers=2,
+        shard_rows=300,
+    )
+
+    assert result["rows"] == 1000
+    assert result["shards"] == 4
+    assert result["rows_per_s"] > 0
+    predictions = np.load(tmp_path / "predictions.npy")
+    assert predictions.dtype == np.float32
+    np.testing.assert_allclose(predictions, get_model()._infer(X), rtol=1e-6)
+
+
+def test_score_csv_file(tmp_path):
+    np.savetxt(tmp_path / "features.csv", X[:10], delimiter=",", header="a,b,c,d,e")
+
+    result = bulk.score_file(
+        tmp_path / "features.csv",
+        tmp_path / "predictions.npy",
+        workers=1,
+        csv_header=True,
+    )
+
+    assert result["rows"] == 10
+    np.testing.assert_allclose(
+        np.load(tmp_path / "predictions.npy"), get_model()._infer(X[:10]), rtol=1e-5
+    )
+    # The CSV scratch copy is removed
+    assert sorted(p.name for p in tmp_path.iterdir()) == [
+        "features.csv",
+        "predictions.npy",
+    ]
+
+
+def test_score_parquet_file(tmp_path):
+    pa = pytest.importorskip("pyarrow")
+    pq = pytest.importorskip("pyarrow.parquet")
+    table = pa.table({name: X[:10, i] for i, name in enumerate("abcde")})
+    table = table.append_column("label", pa.array(range(10)))
+    pq.write_table(table, tmp_path / "features.parquet")
+
+    result = bulk.score_file(
+        tmp_path / "features.parquet",
+        tmp_path / "predictions.npy",
+        workers=1,
+        columns=list("abcde"),
+    )
+
+    assert result["rows"] == 10
+    np.testing.assert_allclose(
+        np.load(tmp_path / "predictions.npy"), get_model()._infer(X[:10]), rtol=1e-6
+    )
+    assert sorted(p.name for p in tmp_path.iterdir()) == [
+        "features.parquet",
+        "predictions.npy",
+    ]
+
+
+def test_score_file_unsupported_format(tmp_path):
+    (tmp_path / "features.txt").write_text("1,2,3,4,5\n")
+    with pytest.raises(ValueError, match="Unsupported input format"):
+        bulk.score_file(tmp_path / "features.txt", tmp_path / "predictions.npy")
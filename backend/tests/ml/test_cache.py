@@ -0,0 +1,118 @@
+"""Tests for the prediction result cache."""
+
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from app.ml.cache import PredictionCache
+from app.ml.model import get_model, predict
+
+
+def test_cache_hit_and_miss():
+    """Repeated inputs are served from the cache with the same prediction."""
+    cache = PredictionCache()
+    model = get_model()
+    data = [0.1, 0.2, 0.3, 0.4, 0.5]
+
+    first = cache.predict(model, data)
+    second = cache.predict(model, data)
+
+    assert first["cache"] == "miss"
+    assert second["cache"] == "hit"
+    assert second["prediction"] == first["prediction"]
+    assert first["prediction"] == pytest.approx(predict(data)["prediction"])
+    stats = cache.stats()
+    assert stats["hits"] == 1
+    assert stats["misses"] == 1
+    assert stats["hit_rate"] == 0.5
+
+
+def test_cache_evicts_least_recently_used():
+    """The entry count bound evicts the least recently used entry."""
+    cache = PredictionCache(max_entries=2)
+    for key in (b"a", b"b", b"a", b"c"):
+        cache.get_or_compute(key, "v1", lambda: 1.0)
+
+    assert cache.stats()["evictions"] == 1
+    assert cache.get_or_compute(b"a", "v1", lambda: 2.0) == (1.0, "hit")
+    assert cache.get_or_compute(b"b", "v1", lambda: 2.0) == (2.0, "miss")
+
+
+def test_cache_memory_bound():
+    """The byte bound caps the total estimated size."""
+    cache = PredictionCache(max_bytes=1000)
+    for i in range(100):
+        cache.get_or_compute(i.to_bytes(20, "little"), "v1", lambda: 0.0)
+
+    stats = cache.stats()
+    assert 0 < stats["bytes"] <= 1000
+    assert stats["evictions"] == 100 - stats["entries"]
+
+
+def test_cache_ttl():
+    """Entries expire after the TTL."""
+    cache = PredictionCache(ttl_seconds=0.01)
+    cache.get_or_compute(b"a", "v1", lambda: 1.0)
+    time.sleep(0.02)
+    assert cache.get_or_compute(b"a", "v1", lambda: 2.0) == (2.0, "miss")
+    assert cache.stats()["expirations"] == 1
+
+
+def test_cache_invalidated_on_model_version_change():
+    """A new model version drops all cached predictions."""
+    cache = PredictionCache()
+    cache.get_or_compute(b"a", "v1", lambda: 1.0)
+    assert cache.get_or_compute(b"a", "v2", lambda: 2.0) == (2.0, "miss")
+    assert cache.stats()["invalidations"] == 1
+
+
+def test_cache_quantization():
+    """Inputs within the same quantization step share an entry."""
+    cache = PredictionCache(quantization=0.01)
+    assert cache.make_key([0.1, 0.2, 0.3, 0.4, 0.5]) == cache.make_key(
+        [0.1001, 0.2, 0.3, 0.4, 0.5]
+    )
+    assert PredictionCache().make_key([0.1, 0.2, 0.3, 0.4, 0.5]) != (
+        PredictionCache().make_key([0.1001, 0.2, 0.3, 0.4, 0.5])
+    )
+
+
+def test_cache_coalesces_concurrent_requests():
+    """Identical concurrent inputs trigger a single computation."""
+    cache = PredictionCache()
+    calls = []
+    release = threading.Event()
+
+    def compute():
+        calls.append(1)
+        release.wait(timeout=5)
+        return 42.0
+
+    with ThreadPoolExecutor(max_workers=8) as executor:
+        futures = [
+            executor.submit(cache.get_or_compute, b"key", "v1", compute)
+            for _ in range(8)
+        ]
+        # Let all workers reach the cache before the leader finishes
+        while cache.stats()["coalesced"] < 7:
+            time.sleep(0.001)
+        release.set()
+        results = [f.result() for f in futures]
+
+    assert len(calls) == 1
+    assert sorted(outcome for _, outcome in results) == ["coalesced"] * 7 + ["miss"]
+    assert all(value == 42.0 for value, _ in results)
+
+
+def test_cache_does_not_store_failures():
+    """A failing computation is propagated and not cached."""
+    cache = PredictionCache()
+
+    def fail():
+        raise RuntimeError("boom")
+
+    with pytest.raises(RuntimeError):
+        cache.get_or_compute(b"a", "v1", fail)
+    assert cache.get_or_compute(b"a", "v1", lambda: 1.0) == (1.0, "miss")
@@ -0,0 +1,137 @@
+"""Tests for the binary prediction request/response formats."""
+
+import io
+import json
+
+import msgpack
+import numpy as np
+import pytest
+
+from app.ml import codecs
+
+X = np.arange(15, dtype=np.float32).reshape(3, 5) / 7
+
+
+def _npy(array: np.ndarray) -> bytes:
+    f = io.BytesIO()
+    np.save(f, array)
+    return f.getvalue()
+
+
+def test_media_type_and_negotiation():
+    """Content types are normalized and Accept picks the first binary type."""
+    assert codecs.media_type(None) == codecs.JSON
+    assert codecs.media_type("Application/X-NPY; charset=binary") == codecs.NPY
+    assert codecs.media_type("application/x-msgpack") == codecs.MSGPACK
+    assert codecs.negotiate(None) == codecs.JSON
+    assert codecs.negotiate("*/*") == codecs.JSON
+    assert codecs.negotiate("application/json, application/x-npy;q=0.9") == codecs.NPY
+
+
+def test_decode_raw_float32_is_zero_copy():
+    """Raw little-endian float32 bodies are wrapped, not copied."""
+    body = X.astype("<f4").tobytes()
+    decoded = codecs.decode_features(body, codecs.OCTET_STREAM)
+
+    np.testing.assert_array_equal(decoded, X)
+    assert decoded.dtype == np.float32
+    assert not decoded.flags.owndata
+    assert np.shares_memory(decoded, np.frombuffer(body, dtype=np.uint8))
+
+
+@pytest.mark.parametrize(
+    "body",
+    [
+        b"\x00" * 7,  # not a multiple of 4 bytes
+        np.zeros(6, dtype="<f4").tobytes(),  # not a multiple of 5 values
+    ],
+)
+def test_decode_raw_invalid(body):
+    with pytest.raises(ValueError):
+        codecs.decode_features(body, codecs.OCTET_STREAM)
+
+
+def test_decode_npy():
+    """float32 .npy bodies are wrapped, other layouts converted."""
+    body = _npy(X)
+    decoded = codecs.decode_features(body, codecs.NPY)
+    np.testing.assert_array_equal(decoded, X)
+    assert not decoded.flags.owndata
+
+    for array in [X.astype(np.float64), np.asfortranarray(X), X.astype(">f4")]:
+        decoded = codecs.decode_features(_npy(array), codecs.NPY)
+        np.testing.assert_array_equal(decoded, X)
+        assert decoded.dtype == np.float32
+
+
+@pytest.mark.parametrize(
+    "body",
+    [
+        b"not an npy file",
+        _npy(np.arange(15).reshape(3, 5)),  # integers
+        _npy(X.reshape(5, 3)),  # wrong feature count
+        _npy(X)[:-4],  # truncated
+    ],
+)
+def test_decode_npy_invalid(body):
+    with pytest.raises(ValueError):
+        codecs.decode_features(body, codecs.NPY)
+
+
+def test_decode_msgpack():
+    """msgpack accepts binary float32 data or rows of numbers."""
+    body = msgpack.packb({"data": X.tobytes()})
+    np.testing.assert_array_equal(codecs.decode_features(body, codecs.MSGPACK), X)
+    body = msgpack.packb(X.tolist())
+    np.testing.assert_array_equal(codecs.decode_features(body, codecs.MSGPACK), X)
+
+    for invalid in [b"\xc1", msgpack.packb({"rows": 1}), msgpack.packb([["a"] * 5])]:
+        with pytest.raises(ValueError):
+            codecs.decode_features(invalid, codecs.MSGPACK)
+
+
+def test_unsupported_content_type():
+    with pytest.raises(codecs.UnsupportedMediaTypeError):
+        codecs.decode_features(b"", "text/csv")
+
+
+def test_encode_predictions():
+    """Predictions round-trip through every binary format as float32."""
+    predictions = np.array([0.5, -1.25, 3.0])
+
+    raw = codecs.encode_predictions(predictions, codecs.OCTET_STREAM, {})
+    np.testing.assert_array_equal(np.frombuffer(raw, dtype="<f4"), predictions)
+
+    npy = codecs.encode_predictions(predictions, codecs.NPY, {})
+    np.testing.assert_array_equal(np.load(io.BytesIO(npy)), predictions)
+
+    packed = codecs.encode_predictions(predictions, codecs.MSGPACK, {"count": 3})
+    payload = msgpack.unpackb(packed)
+    assert payload["count"] == 3
+    np.testing.assert_array_equal(
+        np.frombuffer(payload["predictions"], dtype="<f4"), predictions
+    )
+
+
+def test_encode_json_numpy_and_lean():
+    """NumPy values are encoded directly, lean mode drops timing fields."""
+    result = {
+        "predictions": np.array([0.5, 1.25], dtype=np.float32),
+        "count": np.int64(2),
+        "latency_ms": 0.1,
+        "total_time_ms": 0.2,
+        "model_version": "abc",
+    }
+
+    assert json.loads(codecs.encode_json(result)) == {
+        "predictions": [0.5, 1.25],
+        "count": 2,
+        "latency_ms": 0.1,
+        "total_time_ms": 0.2,
+        "model_version": "abc",
+    }
+    assert json.loads(codecs.encode_json(result, lean=True)) == {
+        "predictions": [0.5, 1.25],
+        "count": 2,
+        "model_version": "abc",
+    }
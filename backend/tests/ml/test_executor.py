@@ -0,0 +1,74 @@
+"""Tests for the bounded inference executor."""
+
+import asyncio
+import threading
+
+import pytest
+
+from app.ml.executor import InferenceExecutor, InferenceQueueFull
+from app.ml.model import predict
+
+
+def test_executor_runs_off_the_event_loop():
+    """Calls run on the dedicated pool and return their result."""
+    executor = InferenceExecutor(max_workers=2, max_queue=4)
+
+    async def run():
+        return await executor.run(
+            lambda: (threading.current_thread().name, threading.get_ident())
+        )
+
+    name, ident = asyncio.run(run())
+    assert name.startswith("inference")
+    assert ident != threading.get_ident()
+
+    result = asyncio.run(executor.run(predict, [0.1, 0.2, 0.3, 0.4, 0.5]))
+    assert isinstance(result["prediction"], float)
+    stats = executor.stats()
+    assert stats["completed"] == 2
+    assert stats["queue_depth"] == 0
+    assert stats["running"] == 0
+
+
+def test_executor_rejects_when_queue_is_full():
+    """Calls beyond workers + queue are rejected without being queued."""
+    executor = InferenceExecutor(max_workers=1, max_queue=1, retry_after=3)
+    release = threading.Event()
+
+    async def run():
+        running = asyncio.ensure_future(executor.run(release.wait))
+        queued = asyncio.ensure_future(executor.run(release.wait))
+        await asyncio.sleep(0.05)
+        stats = executor.stats()
+        with pytest.raises(InferenceQueueFull) as exc_info:
+            await executor.run(release.wait)
+        release.set()
+        await asyncio.gather(running, queued)
+        return stats, exc_info.value
+
+    stats, error = asyncio.run(run())
+    assert stats["running"] == 1
+    assert stats["queue_depth"] == 1
+    assert error.retry_after == 3
+
+    stats = executor.stats()
+    assert stats["rejected"] == 1
+    assert stats["completed"] == 2
+    assert stats["queue_depth"] == 0
+    assert stats["wait_ms_p99"] >= stats["wait_ms_p50"] > 0
+
+
+def test_executor_propagates_errors():
+    """Exceptions raised by the call reach the caller and free the slot."""
+    executor = InferenceExecutor(max_workers=1, max_queue=0)
+
+    with pytest.raises(ValueError, match="Expected 5 features"):
+        asyncio.run(executor.run(predict, [1.0]))
+    assert asyncio.run(executor.run(int, "3")) == 3
+
+
+@pytest.mark.parametrize("kwargs", [{"max_workers": 0}, {"max_queue": -1}])
+def test_executor_invalid_config(kwargs):
+    """Invalid sizes are rejected."""
+    with pytest.raises(ValueError):
+        InferenceExecutor(**kwargs)
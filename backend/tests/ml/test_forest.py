@@ -0,0 +1,118 @@
+"""Tests for the NumPy tree ensemble engine."""
+
+import os
+
+import numpy as np
+import pytest
+
+from app.ml.forest import TreeEnsemble, compile_onnx_forest, forest_path, load_forest
+from app.ml.model import MLModel, get_model
+
+
+def test_forest_matches_onnx_runtime():
+    """Test that the compiled forest gives the same predictions as ORT."""
+    model = get_model()
+    forest = compile_onnx_forest(model.model_path)
+
+    rng = np.random.default_rng(0)
+    X = (rng.standard_normal((10_000, 5)) * 3).astype(np.float32)
+    # Far outside the training range, and exactly on zero
+    X[:10] = 1e6
+    X[10:20] = -1e6
+    X[20:30] = 0.0
+    np.testing.assert_allclose(forest.predict(X), model._infer(X), atol=1e-4)
+
+
+def test_forest_nan_follows_onnx_runtime():
+    """Test that missing values take the same branch as in ORT."""
+    model = get_model()
+    forest = compile_onnx_forest(model.model_path)
+
+    X = np.zeros((5, 5), dtype=np.float32)
+    for i in range(5):
+        X[i, i] = np.nan
+    np.testing.assert_allclose(forest.predict(X), model._infer(X), atol=1e-4)
+
+
+def test_forest_save_load_roundtrip(tmp_path):
+    """Test that saved arrays load back to the same forest."""
+    forest = compile_onnx_forest(get_model().model_path)
+    forest.save(tmp_path / "forest.npz")
+    loaded = TreeEnsemble.load(tmp_path / "forest.npz")
+
+    assert loaded.max_depth == forest.max_depth
+    X = np.random.default_rng(1).standard_normal((100, 5)).astype(np.float32)
+    np.testing.assert_array_equal(loaded.predict(X), forest.predict(X))
+
+
+def test_load_forest_caches_and_recompiles(model_copy):
+    """Test that the compiled forest is saved and rebuilt when stale."""
+    cached = forest_path(model_copy)
+    load_forest(model_copy)
+    assert cached.exists()
+
+    stale = model_copy.stat().st_mtime - 60
+    os.utime(cached, (stale, stale))
+    load_forest(model_copy)
+    assert cached.stat().st_mtime >= model_copy.stat().st_mtime
+
+
+def test_forest_without_scaler(tmp_path):
+    """Test a bare tree ensemble graph, as in legacy artifacts."""
+    from skl2onnx import convert_sklearn
+    from skl2onnx.common.data_types import FloatTensorType
+    from sklearn.ensemble import RandomForestRegressor
+
+    rng = np.random.default_rng(3)
+    X = rng.standard_normal((200, 5)).astype(np.float32)
+    regressor = RandomForestRegressor(n_estimators=4, random_state=0)
+    regressor.fit(X, X[:, 0] * 2 - X[:, 3])
+    onnx_model = convert_sklearn(
+        regressor, initial_types=[("float_input", FloatTensorType([None, 5]))]
+    )
+    (tmp_path / "model.onnx").write_bytes(onnx_model.SerializeToString())
+
+    forest = compile_onnx_forest(tmp_path / "model.onnx")
+    np.testing.assert_allclose(forest.predict(X), regressor.predict(X), atol=1e-4)
+
+
+def test_compile_rejects_non_tree_model(tmp_path):
+    """Test that graphs without a tree ensemble are rejected."""
+    from skl2onnx import convert_sklearn
+    from skl2onnx.common.data_types import FloatTensorType
+    from sklearn.linear_model import LinearRegression
+
+    regressor = LinearRegression().fit(np.eye(5), np.arange(5))
+    onnx_model = convert_sklearn(
+        regressor, initial_types=[("float_input", FloatTensorType([None, 5]))]
+    )
+    (tmp_path / "model.onnx").write_bytes(onnx_model.SerializeToString())
+
+    with pytest.raises(ValueError, match="TreeEnsembleRegressor"):
+        compile_onnx_forest(tmp_path / "model.onnx")
+
+
+def test_numpy_engine_model(model_copy):
+    """Test that MLModel serves the same predictions with the NumPy engine."""
+    numpy_model = MLModel(model_path=model_copy, engine="numpy")
+    onnx_model = MLModel(model_path=model_copy, engine="onnx")
+    assert numpy_model.forest is not None
+    assert onnx_model.forest is None
+    assert numpy_model.runtime_info()["engine"] == "numpy"
+
+    X = np.random.default_rng(2).standard_normal((64, 5)).astype(np.float32)
+    np.testing.assert_allclose(
+        numpy_model.predict_batch(X)["predictions"],
+        onnx_model.predict_batch(X)["predictions"],
+        atol=1e-4,
+    )
+    row = X[0].tolist()
+    assert numpy_model.predict(row)["prediction"] == pytest.approx(
+        onnx_model.predict(row)["prediction"], abs=1e-4
+    )
+
+
+def test_unknown_engine(model_copy):
+    """Test that an unknown engine name fails loudly."""
+    with pytest.raises(ValueError, match="Unknown inference engine"):
+        MLModel(model_path=model_copy, engine="tensorflow")
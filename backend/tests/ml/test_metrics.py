@@ -0,0 +1,93 @@
+"""Tests for the inference latency histograms."""
+
+import time
+
+import pytest
+
+from app.core.config import settings
+from app.ml import metrics
+from app.ml.metrics import (
+    LatencyHistogram,
+    get_histogram,
+    record_stage,
+    render_gauges,
+    render_histograms,
+    reset_histograms,
+)
+from app.ml.model import get_model, predict, predict_batch
+
+
+@pytest.fixture(autouse=True)
+def clean_histograms():
+    reset_histograms()
+    yield
+    reset_histograms()
+
+
+def test_histogram_quantiles():
+    """Quantiles land within one bucket of the exact value."""
+    histogram = LatencyHistogram()
+    for duration_us in range(1, 1001):
+        histogram.record(duration_us * 1000)
+
+    assert histogram.count == 1000
+    assert histogram.max_ns == 1_000_000
+    for q, exact_ns in [(0.5, 500_000), (0.9, 900_000), (0.99, 990_000)]:
+        assert exact_ns <= histogram.quantile(q) <= exact_ns * 1.1
+    # Capped at the largest observation
+    assert histogram.quantile(0.999) == 1_000_000
+    snapshot = histogram.snapshot()
+    assert set(snapshot) == {"count", "sum_ms", "p50", "p90", "p99", "p999"}
+
+
+def test_histogram_extremes():
+    """Empty histograms report 0, sub-µs durations the first bucket bound and
+    huge durations the exact maximum."""
+    histogram = LatencyHistogram()
+    assert histogram.quantile(0.5) == 0
+    histogram.record(0)
+    histogram.record(10**15)
+    assert histogram.quantile(0.5) == 1000
+    assert histogram.quantile(1.0) == 10**15
+
+
+def test_model_records_stages():
+    """Predictions record validation and inference, not scaling (in-graph)."""
+    predict([0.1, 0.2, 0.3, 0.4, 0.5])
+    predict_batch([[0.1, 0.2, 0.3, 0.4, 0.5]] * 4)
+    get_model()._infer_one([0.0] * 5)
+
+    assert get_histogram("validation").count == 2
+    assert get_histogram("inference").count == 3
+    assert get_histogram("scaling").count == 0
+
+
+def test_metrics_disabled(monkeypatch):
+    """Nothing is recorded when metrics are disabled."""
+    monkeypatch.setattr(settings, "ML_METRICS_ENABLED", False)
+    predict([0.1, 0.2, 0.3, 0.4, 0.5])
+    assert all(get_histogram(stage).count == 0 for stage in metrics.STAGES)
+
+
+def test_record_overhead():
+    """Recording is cheap enough to leave on at full traffic."""
+    start = time.perf_counter()
+    for i in range(100_000):
+        record_stage("inference", i)
+    per_record_us = (time.perf_counter() - start) * 1e6 / 100_000
+    assert per_record_us < 5
+
+
+def test_render_prometheus():
+    """The text format has one summary with quantiles, sum and count per stage."""
+    record_stage("inference", 2_000_000)
+    text = render_histograms()
+
+    assert "# TYPE ml_stage_duration_seconds summary" in text
+    assert 'ml_stage_duration_seconds{stage="inference",quantile="0.5"} 0.002' in text
+    assert 'ml_stage_duration_seconds_count{stage="inference"} 1' in text
+    assert 'ml_stage_duration_seconds_count{stage="parse"} 0' in text
+
+    text = render_gauges("ml_test", {"depth": 3, "done": 7}, counters=("done",))
+    assert "# TYPE ml_test_depth gauge\nml_test_depth 3.0" in text
+    assert "# TYPE ml_test_done_total counter\nml_test_done_total 7.0" in text
@@ -1,8 +1,20 @@
 """Tests for ML model predictions and performance."""
 
+import numpy as np
+import onnxruntime as ort
 import pytest
 
-from app.ml.model import get_model, predict
+from app.core.config import settings
+from app.ml.model import (
+    MLModel,
+    build_session_options,
+    get_execution_providers,
+    get_model,
+    get_model_status,
+    predict,
+    predict_batch,
+    save_optimized_model,
+)
 
 
 def test_model_initialization():
@@ -10,7 +22,8 @@ def test_model_initialization():
     model = get_model()
     assert model is not None
     assert model.session is not None
-    assert model.scaler is not None
+    # Scaling is folded into the ONNX graph
+    assert model.scaler is None
 
 
 def test_predict_valid_input():
@@ -64,3 +77,197 @@ def test_singleton_model():
     model1 = get_model()
     model2 = get_model()
     assert model1 is model2
+
+
+def test_predict_batch_matches_single():
+    """Test that batch predictions match row-by-row predictions."""
+    rows = [[i / 10, -i / 10, 0.5, 0.25, float(i)] for i in range(10)]
+    result = predict_batch(rows)
+
+    assert result["count"] == 10
+    assert result["predictions"].shape == (10,)
+    for row, prediction in zip(rows, result["predictions"], strict=True):
+        assert prediction == pytest.approx(predict(row)["prediction"])
+
+
+def test_predict_batch_accepts_numpy():
+    """Test batch prediction on a large NumPy array."""
+    X = np.random.default_rng(0).standard_normal((5000, 5)).astype(np.float32)
+    result = predict_batch(X)
+    assert result["count"] == 5000
+    assert result["latency_ms"] > 0
+
+
+@pytest.mark.parametrize(
+    "data",
+    [[[1.0, 2.0, 3.0]], [1.0, 2.0, 3.0, 4.0, 5.0], np.zeros((0, 5))],
+)
+def test_predict_batch_invalid_shape(data):
+    """Test batch prediction with invalid input shapes."""
+    with pytest.raises(ValueError):
+        predict_batch(data)
+
+
+def test_legacy_model_with_separate_scaler(tmp_path):
+    """Test that model.onnx + scaler.npy pairs still load and scale inputs."""
+    from skl2onnx import convert_sklearn
+    from skl2onnx.common.data_types import FloatTensorType
+    from sklearn.ensemble import RandomForestRegressor
+    from sklearn.preprocessing import StandardScaler
+
+    rng = np.random.default_rng(0)
+    X_train = rng.standard_normal((200, 5)).astype(np.float32) * 3 + 1
+    y_train = X_train[:, 0] - X_train[:, 1]
+    scaler = StandardScaler().fit(X_train)
+    forest = RandomForestRegressor(n_estimators=5, random_state=0)
+    forest.fit(scaler.transform(X_train).astype(np.float32), y_train)
+
+    onnx_model = convert_sklearn(
+        forest, initial_types=[("float_input", FloatTensorType([None, 5]))]
+    )
+    (tmp_path / "model.onnx").write_bytes(onnx_model.SerializeToString())
+    np.save(tmp_path / "scaler.npy", [scaler.mean_, scaler.scale_])
+
+    model = MLModel(model_path=tmp_path / "model.onnx")
+    assert model.scaler is not None
+
+    X = X_train[:20]
+    expected = forest.predict(scaler.transform(X).astype(np.float32))
+    result = model.predict_batch(X)
+    np.testing.assert_allclose(result["predictions"], expected, rtol=1e-5)
+
+
+def test_legacy_model_missing_scaler(tmp_path):
+    """Test that a legacy graph without its scaler file fails loudly."""
+    from skl2onnx import convert_sklearn
+    from skl2onnx.common.data_types import FloatTensorType
+    from sklearn.linear_model import LinearRegression
+
+    regressor = LinearRegression().fit(np.eye(5), np.arange(5))
+    onnx_model = convert_sklearn(
+        regressor, initial_types=[("float_input", FloatTensorType([None, 5]))]
+    )
+    (tmp_path / "model.onnx").write_bytes(onnx_model.SerializeToString())
+
+    with pytest.raises(FileNotFoundError):
+        MLModel(model_path=tmp_path / "model.onnx")
+
+
+def test_single_row_fast_path_matches_generic():
+    """Test that the IOBinding fast path reuses buffers and matches session.run."""
+    model = get_model()
+    rows = [[i / 7, -i / 3, 0.5, float(i), 2.0] for i in range(10)]
+    for row in rows:
+        expected = model._infer(np.array([row], dtype=np.float32))[0]
+        assert model._infer_one(row) == pytest.approx(float(expected))
+
+    _, X_first, _ = model._single_row_binding()
+    _, X_second, _ = model._single_row_binding()
+    assert X_first is X_second
+
+
+def test_single_row_fast_path_threads():
+    """Test that concurrent threads each get their own buffers."""
+    from concurrent.futures import ThreadPoolExecutor
+
+    model = get_model()
+    rows = [[float(i), 0.0, -float(i), 1.0, 0.5] for i in range(200)]
+    expected = model.predict_batch(rows)["predictions"]
+
+    with ThreadPoolExecutor(max_workers=8) as executor:
+        results = list(executor.map(model._infer_one, rows))
+
+    np.testing.assert_allclose(results, expected, rtol=1e-6)
+
+
+def test_session_options_from_settings(monkeypatch):
+    """Test that ONNX Runtime session options follow settings."""
+    monkeypatch.setattr(settings, "ML_ORT_INTRA_OP_NUM_THREADS", 2)
+    monkeypatch.setattr(settings, "ML_ORT_INTER_OP_NUM_THREADS", 1)
+    monkeypatch.setattr(settings, "ML_ORT_EXECUTION_MODE", "parallel")
+    monkeypatch.setattr(settings, "ML_ORT_GRAPH_OPTIMIZATION_LEVEL", "basic")
+    monkeypatch.setattr(settings, "ML_ORT_ENABLE_MEM_PATTERN", False)
+
+    options = build_session_options()
+    assert options.intra_op_num_threads == 2
+    assert options.inter_op_num_threads == 1
+    assert options.execution_mode == ort.ExecutionMode.ORT_PARALLEL
+    assert (
+        options.graph_optimization_level == ort.GraphOptimizationLevel.ORT_ENABLE_BASIC
+    )
+    assert options.enable_mem_pattern is False
+
+
+def test_unavailable_execution_provider(monkeypatch):
+    """Test that unknown providers are skipped and CPU is kept as fallback."""
+    monkeypatch.setattr(
+        settings, "ONNXRUNTIME_EXECUTION_PROVIDERS", ["MissingExecutionProvider"]
+    )
+    with pytest.warns(UserWarning, match="MissingExecutionProvider"):
+        providers = get_execution_providers()
+    assert providers == ["CPUExecutionProvider"]
+
+
+def test_runtime_info():
+    """Test that the runtime configuration is reported."""
+    info = get_model().runtime_info()
+    assert "CPUExecutionProvider" in info["providers"]
+    assert info["graph_optimization_level"] == settings.ML_ORT_GRAPH_OPTIMIZATION_LEVEL
+
+
+def test_pre_optimized_model(tmp_path):
+    """Test that a saved optimized graph is loaded with optimizations disabled."""
+    source = tmp_path / "model.onnx"
+    source.write_bytes(get_model().model_path.read_bytes())
+
+    optimized = save_optimized_model(source, "ort")
+    assert optimized == tmp_path / "model.ort"
+    assert optimized.exists()
+
+    model = MLModel(model_path=source, use_optimized_model=True)
+    assert model.session_path == optimized
+    assert model.scaler is None
+    info = model.runtime_info()
+    assert info["pre_optimized"] is True
+    assert info["graph_optimization_level"] == "disable"
+
+    baseline = MLModel(model_path=source, use_optimized_model=False)
+    assert baseline.session_path == source
+    X = np.random.default_rng(0).standard_normal((50, 5)).astype(np.float32)
+    np.testing.assert_allclose(
+        model.predict_batch(X)["predictions"],
+        baseline.predict_batch(X)["predictions"],
+        rtol=1e-6,
+    )
+
+
+def test_stale_optimized_model_is_ignored(tmp_path):
+    """Test that an optimized graph older than model.onnx is not used."""
+    import os
+
+    source = tmp_path / "model.onnx"
+    source.write_bytes(get_model().model_path.read_bytes())
+    optimized = save_optimized_model(source, "ort")
+    stale = source.stat().st_mtime - 60
+    os.utime(optimized, (stale, stale))
+
+    model = MLModel(model_path=source, use_optimized_model=True)
+    assert model.session_path == source
+
+
+def test_warmup():
+    """Test that warmup runs at the requested batch sizes."""
+    model = get_model()
+    model.warmup([1, 4, 64], iterations=2)
+    assert model._infer_one([0.0] * 5) == pytest.approx(
+        float(model._infer(np.zeros((1, 5), dtype=np.float32))[0])
+    )
+
+
+def test_model_status_ready():
+    """Test that the loading state is reported once the model is loaded."""
+    model = get_model()
+    status = get_model_status()
+    assert status["status"] == "ready"
+    assert status["error"] is None
+    assert status["model_version"] == model.version
@@ -0,0 +1,102 @@
+"""Tests for hot model reloading."""
+
+import asyncio
+
+import onnx
+import pytest
+
+from app.ml import model as ml_model
+from app.ml.model import MLModel, get_model, get_model_status, reload_model
+
+
+@pytest.fixture
+def reloadable_model(model_copy, monkeypatch):
+    """Serve a copy of the bundled artifact that tests can overwrite."""
+    monkeypatch.setattr(ml_model, "_model_instance", MLModel(model_path=model_copy))
+    monkeypatch.setattr(ml_model, "_last_reload_error", None)
+    return model_copy
+
+
+def _write_new_version(model_path):
+    """Rewrite the artifact with different bytes but the same graph."""
+    proto = onnx.load(str(model_path))
+    entry = proto.metadata_props.add()
+    entry.key = "release"
+    entry.value = "2"
+    onnx.save(proto, str(model_path))
+
+
+def test_reload_keeps_variant_and_engine(reloadable_model, monkeypatch):
+    """A variant model reloads from the same variant and engine."""
+    from app.ml.variants import build_model_variants
+
+    build_model_variants(
+        reloadable_model, variants=["trees10"], max_rmse_increase=10.0, holdout_size=500
+    )
+    monkeypatch.setattr(ml_model.settings, "ML_MODEL_VARIANT", "trees10")
+    current = MLModel(model_path=reloadable_model, engine="numpy")
+    monkeypatch.setattr(ml_model, "_model_instance", current)
+    _write_new_version(current.model_path)
+
+    assert reload_model() is True
+    new = get_model()
+    assert new.model_path == current.model_path
+    assert (new.variant, new.engine) == ("trees10", "numpy")
+    assert new.version != current.version
+
+
+@pytest.mark.usefixtures("reloadable_model")
+def test_reload_unchanged_artifact():
+    """Reloading an unchanged artifact keeps the current model."""
+    current = get_model()
+    assert reload_model() is False
+    assert get_model() is current
+
+
+def test_reload_swaps_model(reloadable_model):
+    """A changed artifact is loaded and swapped in, the old model still works."""
+    old = get_model()
+    _write_new_version(reloadable_model)
+
+    assert reload_model() is True
+    new = get_model()
+    assert new is not old
+    assert new.version != old.version
+    assert new.predict([0.1] * 5)["model_version"] == new.version
+    # Requests still holding the previous model finish on its session
+    assert old.predict([0.1] * 5)["prediction"] == pytest.approx(
+        new.predict([0.1] * 5)["prediction"]
+    )
+    assert get_model_status()["model_version"] == new.version
+
+
+def test_reload_failure_keeps_current_model(reloadable_model):
+    """A broken artifact is reported and the current model keeps serving."""
+    current = get_model()
+    reloadable_model.write_bytes(b"not an onnx model")
+
+    with pytest.raises(Exception, match="INVALID_PROTOBUF|Protobuf"):
+        reload_model()
+    assert get_model() is current
+    assert get_model_status()["last_reload_error"]
+    assert isinstance(current.predict([0.1] * 5)["prediction"], float)
+
+
+def test_watcher_reloads_changed_artifact(reloadable_model):
+    """The lifespan watcher picks up a replaced artifact."""
+    from app.ml.lifespan import _watch_model_artifact
+
+    old_version = get_model().version
+
+    async def run():
+        watcher = asyncio.create_task(_watch_model_artifact(0.01))
+        await asyncio.sleep(0.05)
+        _write_new_version(reloadable_model)
+        for _ in range(200):
+            await asyncio.sleep(0.01)
+            if get_model().version != old_version:
+                break
+        watcher.cancel()
+
+    asyncio.run(run())
+    assert get_model().version != old_version
@@ -0,0 +1,177 @@
+"""Tests for the shared inference server and its client."""
+
+import asyncio
+import stat
+import time
+
+import numpy as np
+import pytest
+
+from app.ml.executor import InferenceQueueFull
+from app.ml.model import get_model
+from app.ml.server import InferenceClient, InferenceServer, InferenceServerUnavailable
+
+
+def test_server_batches_across_clients(tmp_path):
+    """Requests of several clients are batched and answered through shm."""
+    socket_path = tmp_path / "inference.sock"
+    model = get_model()
+    X = np.random.default_rng(0).standard_normal((100, 5)).astype(np.float32)
+
+    async def run():
+        server = InferenceServer(model, socket_path, max_batch_rows=1024)
+        ready = asyncio.Event()
+        serving = asyncio.create_task(server.serve_forever(ready))
+        await ready.wait()
+        mode = stat.S_IMODE(socket_path.stat().st_mode)
+        clients = [
+            InferenceClient(socket_path, slots=4, slot_rows=16) for _ in range(2)
+        ]
+        try:
+            single = await clients[0].predict(X[0].tolist())
+            batches_before = server.batches
+            # 100 rows over 16-row slots, two clients at once
+            results = await asyncio.gather(
+                *(client.predict_batch(X) for client in clients),
+                *(clients[1].predict(row.tolist()) for row in X[:8]),
+            )
+            return mode, single, results, server.batches - batches_before
+        finally:
+            for client in clients:
+                client.close()
+            serving.cancel()
+
+    mode, single, results, batches = asyncio.run(run())
+
+    # Only the server's user can connect and name segments to map
+    assert mode == 0o600
+    expected = model._infer(X)
+    assert single["prediction"] == pytest.approx(float(expected[0]))
+    assert single["model_version"] == model.version
+    for result in results[:2]:
+        assert result["count"] == 100
+        np.testing.assert_array_equal(result["predictions"], expected)
+    for row_result, value in zip(results[2:], expected[:8], strict=True):
+        assert row_result["prediction"] == pytest.approx(float(value))
+    # 22 slot requests (7 + 7 + 8) need fewer inference calls
+    assert batches < 22
+    assert not socket_path.exists()
+
+
+def test_server_batch_window(tmp_path):
+    """With a batch window, lone requests are answered once it expires."""
+    socket_path = tmp_path / "inference.sock"
+    model = get_model()
+    X = np.random.default_rng(1).standard_normal((3, 5)).astype(np.float32)
+
+    async def run():
+        server = InferenceServer(model, socket_path, window_ms=5)
+        ready = asyncio.Event()
+        serving = asyncio.create_task(server.serve_forever(ready))
+        await ready.wait()
+        client = InferenceClient(socket_path, slots=2, slot_rows=4)
+        try:
+            # One at a time, so every batch waits out the window
+            return [await client.predict(row.tolist()) for row in X]
+        finally:
+            client.close()
+            serving.cancel()
+
+    results = asyncio.run(asyncio.wait_for(run(), 10))
+
+    expected = model._infer(X)
+    for result, value in zip(results, expected, strict=True):
+        assert result["prediction"] == pytest.approx(float(value))
+
+
+def test_cancelled_request_slot_not_reused_before_reply(tmp_path, monkeypatch):
+    """A slot freed by a cancelled request cannot receive its stale reply."""
+    socket_path = tmp_path / "inference.sock"
+    model = get_model()
+    infer = model._infer
+
+    def slow_infer(X):
+        time.sleep(0.2)
+        return infer(X)
+
+    monkeypatch.setattr(model, "_infer", slow_infer)
+    X = np.random.default_rng(2).standard_normal((2, 5)).astype(np.float32)
+
+    async def run():
+        server = InferenceServer(model, socket_path)
+        ready = asyncio.Event()
+        serving = asyncio.create_task(server.serve_forever(ready))
+        await ready.wait()
+        client = InferenceClient(socket_path, slots=1, slot_rows=1)
+        try:
+            cancelled = asyncio.create_task(client.predict(X[0].tolist()))
+            await asyncio.sleep(0.05)
+            cancelled.cancel()
+            return await client.predict(X[1].tolist())
+        finally:
+            client.close()
+            serving.cancel()
+
+    result = asyncio.run(run())
+
+    assert result["prediction"] == pytest.approx(float(infer(X[1:])[0]))
+
+
+def test_server_rejects_when_queue_is_full(tmp_path, monkeypatch):
+    """Requests beyond the server's queue fail fast with InferenceQueueFull."""
+    socket_path = tmp_path / "inference.sock"
+    model = get_model()
+    infer = model._infer
+
+    def slow_infer(X):
+        time.sleep(0.2)
+        return infer(X)
+
+    monkeypatch.setattr(model, "_infer", slow_infer)
+    X = np.random.default_rng(3).standard_normal((4, 5)).astype(np.float32)
+
+    async def run():
+        server = InferenceServer(model, socket_path, max_queue=1)
+        ready = asyncio.Event()
+        serving = asyncio.create_task(server.serve_forever(ready))
+        await ready.wait()
+        client = InferenceClient(socket_path, slots=4, slot_rows=1)
+        try:
+            results = await asyncio.gather(
+                *(client.predict(row.tolist()) for row in X), return_exceptions=True
+            )
+            # Rejected slots are free again
+            after = await client.predict(X[0].tolist())
+            return results, after, server.rejected
+        finally:
+            client.close()
+            serving.cancel()
+
+    results, after, rejected = asyncio.run(asyncio.wait_for(run(), 10))
+
+    expected = infer(X)
+    failed = [r for r in results if isinstance(r, InferenceQueueFull)]
+    assert len(failed) == rejected >= 2
+    for result, value in zip(results, expected, strict=True):
+        if not isinstance(result, InferenceQueueFull):
+            assert result["prediction"] == pytest.approx(float(value))
+    assert after["prediction"] == pytest.approx(float(expected[0]))
+
+
+def test_client_server_unavailable(tmp_path):
+    client = InferenceClient(tmp_path / "missing.sock", slots=1, slot_rows=1)
+    try:
+        with pytest.raises(InferenceServerUnavailable, match="unreachable"):
+            asyncio.run(client.predict([0.0] * 5))
+        assert client.status()["status"] == "unavailable"
+    finally:
+        client.close()
+
+
+def test_client_validates_input(tmp_path):
+    client = InferenceClient(tmp_path / "missing.sock", slots=1, slot_rows=1)
+    try:
+        with pytest.raises(ValueError, match="Expected 5 features"):
+            asyncio.run(client.predict([0.0] * 3))
+    finally:
+        client.close()
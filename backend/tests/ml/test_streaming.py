@@ -0,0 +1,122 @@
+"""Tests for streaming NDJSON/CSV scoring."""
+
+import asyncio
+import json
+from collections.abc import AsyncIterator
+
+import numpy as np
+import pytest
+
+from app.ml import streaming
+from app.ml.model import get_model
+
+ROWS = np.random.default_rng(0).standard_normal((10, 5)).round(4).tolist()
+
+
+async def _chunks(body: bytes, size: int) -> AsyncIterator[bytes]:
+    for start in range(0, len(body), size):
+        yield body[start : start + size]
+
+
+def _score(body: bytes, media_type: str, **kwargs) -> list[bytes]:
+    async def run() -> list[bytes]:
+        return [
+            chunk
+            async for chunk in streaming.score_stream(
+                _chunks(body, 7),
+                media_type,
+                streaming.executor_predictor(get_model()),
+                **kwargs,
+            )
+        ]
+
+    return asyncio.run(run())
+
+
+def _lines(body: bytes, max_line_bytes: int = 100) -> list[tuple[int, bytes | None]]:
+    async def run() -> list[tuple[int, bytes | None]]:
+        return [
+            item
+            async for item in streaming.iter_lines(_chunks(body, 3), max_line_bytes)
+        ]
+
+    return asyncio.run(run())
+
+
+def test_iter_lines_across_chunk_boundaries():
+    """Lines are split correctly whatever the chunking, long lines dropped."""
+    assert _lines(b"ab\ncdef\n\ngh") == [(1, b"ab"), (2, b"cdef"), (3, b""), (4, b"gh")]
+    assert _lines(b"a\n" + b"x" * 20 + b"\nb\n", max_line_bytes=8) == [
+        (1, b"a"),
+        (2, None),
+        (3, b"b"),
+    ]
+    assert _lines(b"x" * 20, max_line_bytes=8) == [(1, None)]
+    assert _lines(b"x" * 9 + b"\n", max_line_bytes=8) == [(1, None)]
+
+
+@pytest.mark.parametrize(
+    "line, message",
+    [
+        (b"[1, 2, 3]", "Expected 5 features, got 3"),
+        (b'{"data": [1, 2, 3, 4, 5]}', "JSON array of numbers"),
+        (b"[1, 2, 3, 4, true]", "JSON array of numbers"),
+        (b"[1, 2, 3, 4, 1e999]", "finite"),
+        (b"[1, 2,", "Invalid JSON"),
+    ],
+)
+def test_parse_ndjson_row_errors(line, message):
+    with pytest.raises(ValueError, match=message):
+        streaming.parse_ndjson_row(line)
+
+
+def test_parse_csv_row():
+    assert streaming.parse_csv_row(b"1, 2.5,-3,4e-1,5") == [1.0, 2.5, -3.0, 0.4, 5.0]
+    with pytest.raises(ValueError, match="comma-separated numbers"):
+        streaming.parse_csv_row(b"1,2,x,4,5")
+    with pytest.raises(ValueError, match="Expected 5 features"):
+        streaming.parse_csv_row(b"1,2")
+
+
+def test_score_ndjson_in_chunks_with_inline_errors():
+    """Rows are scored in chunks, bad rows reported in place, order kept."""
+    lines = [json.dumps(row) for row in ROWS]
+    lines.insert(3, "[1, 2]")
+    lines.insert(7, "")
+    body = ("\n".join(lines) + "\n").encode()
+
+    chunks = _score(body, streaming.NDJSON, chunk_rows=4)
+    results = [json.loads(line) for line in b"".join(chunks).splitlines()]
+
+    # 11 result lines in chunks of 4
+    assert len(chunks) == 3
+    assert results[3] == {"line": 4, "error": "Expected 5 features, got 2"}
+    scored = [result for result in results if "prediction" in result]
+    assert [result["line"] for result in scored] == [1, 2, 3, 5, 6, 7, 9, 10, 11, 12]
+    expected = get_model().predict_batch(ROWS)["predictions"]
+    np.testing.assert_allclose([r["prediction"] for r in scored], expected)
+
+
+def test_score_only_malformed_rows_in_chunks():
+    """Error lines are flushed per chunk, not held until the end."""
+    body = b"[1, 2]\n" * 30 + b"x" * 200 + b"\n"
+
+    chunks = _score(body, streaming.NDJSON, chunk_rows=10, max_line_bytes=100)
+
+    assert [len(chunk.splitlines()) for chunk in chunks] == [10, 10, 10, 1]
+    last = json.loads(chunks[-1])
+    assert last == {"line": 31, "error": "Line too long"}
+
+
+def test_score_csv_with_header():
+    body = "a,b,c,d,e\n" + "\n".join(",".join(map(str, row)) for row in ROWS[:3])
+    body += "\n1,2,oops,4,5\n"
+
+    output = b"".join(_score(body.encode(), streaming.CSV, csv_header=True))
+
+    header, *rows = output.decode().splitlines()
+    assert header == "line,prediction,error"
+    assert [row.split(",")[0] for row in rows] == ["2", "3", "4", "5"]
+    assert rows[-1] == "5,,Expected comma-separated numbers"
+    expected = get_model().predict_batch(ROWS[:3])["predictions"]
+    np.testing.assert_allclose([float(row.split(",")[1]) for row in rows[:3]], expected)
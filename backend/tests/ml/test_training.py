@@ -0,0 +1,48 @@
+"""Tests for model training and the serving/training split."""
+
+import subprocess
+import sys
+
+import numpy as np
+
+from app.ml.model import MLModel, get_model
+from app.ml.training import train_and_save_model
+
+
+def test_train_and_save_model(tmp_path):
+    """Test that training writes a self-contained ONNX graph."""
+    model_path = tmp_path / "model.onnx"
+    train_and_save_model(model_path)
+
+    model = MLModel(model_path=model_path)
+    assert model.scaler is None
+    assert not (tmp_path / "scaler.npy").exists()
+
+    # Training is deterministic, so this matches the bundled artifact
+    X = np.random.default_rng(0).standard_normal((20, 5)).astype(np.float32)
+    np.testing.assert_allclose(
+        model.predict_batch(X)["predictions"],
+        get_model().predict_batch(X)["predictions"],
+        rtol=1e-6,
+    )
+
+
+def test_missing_artifact_is_trained(tmp_path):
+    """Test that MLModel trains when the artifact does not exist."""
+    model = MLModel(model_path=tmp_path / "model.onnx")
+    assert (tmp_path / "model.onnx").exists()
+    assert isinstance(model.predict([0.0] * 5)["prediction"], float)
+
+
+def test_serving_does_not_import_training_dependencies():
+    """Test that loading the model for serving never imports scikit-learn."""
+    code = (
+        "import sys\n"
+        "from app.ml.model import get_model\n"
+        "get_model().predict([0.1, 0.2, 0.3, 0.4, 0.5])\n"
+        "print(sorted(m for m in ('sklearn', 'skl2onnx') if m in sys.modules))\n"
+    )
+    output = subprocess.run(
+        [sys.executable, "-c", code], check=True, capture_output=True, text=True
+    ).stdout
+    assert output.strip() == "[]"
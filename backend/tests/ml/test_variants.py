@@ -0,0 +1,96 @@
+"""Tests for the model variant build step and variant loading."""
+
+import json
+from copy import deepcopy
+
+import numpy as np
+import pytest
+
+from app.ml.model import MLModel, variant_path
+from app.ml.training import export_onnx, generate_data, train_pipeline
+from app.ml.variants import build_model_variants
+
+
+def test_build_model_variants(model_copy):
+    """Test that variants are measured and gated on the accuracy budget."""
+    report = build_model_variants(
+        model_copy, variants=["trees25", "distilled"], holdout_size=500
+    )
+
+    assert set(report["variants"]) == {"trees25", "distilled"}
+    for metrics in [report["full"], *report["variants"].values()]:
+        assert metrics["rmse"] > 0
+        assert 0 < metrics["p50_ms"] <= metrics["p99_ms"]
+    budget = report["full"]["rmse"] * (1 + report["max_rmse_increase"])
+    for name, metrics in report["variants"].items():
+        assert metrics["emitted"] == (metrics["rmse"] <= budget)
+        assert variant_path(model_copy, name).exists() == metrics["emitted"]
+
+    saved = json.loads(model_copy.with_name("variants.json").read_text())
+    assert saved == report
+
+
+def test_variants_over_budget_are_not_emitted(model_copy):
+    """Test that a variant less accurate than allowed is deleted."""
+    report = build_model_variants(
+        model_copy, variants=["trees10"], max_rmse_increase=0.0, holdout_size=500
+    )
+    assert report["variants"]["trees10"]["emitted"] is False
+    assert not variant_path(model_copy, "trees10").exists()
+
+
+def test_variants_come_from_the_served_artifact(model_copy):
+    """Test that a replaced artifact is pruned and distilled, not retrained."""
+    replacement = train_pipeline(*generate_data(seed=1), n_estimators=30)
+    export_onnx(replacement, model_copy)
+
+    build_model_variants(
+        model_copy, variants=["trees10"], max_rmse_increase=10.0, holdout_size=500
+    )
+
+    expected = deepcopy(replacement)
+    forest = expected.named_steps["model"]
+    forest.estimators_ = forest.estimators_[:10]
+    forest.n_estimators = 10
+    X = np.random.default_rng(0).standard_normal((200, 5)).astype(np.float32)
+    model = MLModel(model_path=model_copy, variant="trees10")
+    np.testing.assert_allclose(model._infer(X), expected.predict(X), atol=1e-4)
+
+
+def test_retrained_variants_require_a_reproducible_artifact(model_copy):
+    """Test that depth variants are not built from an unknown artifact."""
+    export_onnx(train_pipeline(*generate_data(seed=1)), model_copy)
+
+    with pytest.raises(ValueError, match="does not match the retrained forest"):
+        build_model_variants(model_copy, variants=["depth6"], holdout_size=500)
+    assert not variant_path(model_copy, "depth6").exists()
+
+
+def test_load_variant_by_name(model_copy):
+    """Test that MLModel serves an emitted variant."""
+    build_model_variants(
+        model_copy, variants=["trees25"], max_rmse_increase=1.0, holdout_size=500
+    )
+
+    model = MLModel(model_path=model_copy, variant="trees25")
+    assert model.model_path == variant_path(model_copy, "trees25")
+    assert model.runtime_info()["variant"] == "trees25"
+    full = MLModel(model_path=model_copy, variant="")
+    assert full.variant is None
+    assert model.version != full.version
+
+    X = np.random.default_rng(0).standard_normal((20, 5)).astype(np.float32)
+    assert model.predict_batch(X)["count"] == 20
+
+
+def test_missing_variant(model_copy):
+    """Test that a variant that was not built fails instead of training."""
+    with pytest.raises(FileNotFoundError, match="build_model_variants"):
+        MLModel(model_path=model_copy, variant="depth6")
+    assert not variant_path(model_copy, "depth6").exists()
+
+
+def test_unknown_variant_name(model_copy):
+    """Test that only known variants can be built."""
+    with pytest.raises(ValueError, match="Unknown model variants"):
+        build_model_variants(model_copy, variants=["float8"])
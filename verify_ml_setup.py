@@ -40,7 +40,6 @@ def check_ml_model() -> bool:
 
     files_to_check = {
         "model.onnx": "ONNX Model",
-        "scaler.npy": "Scaler Parameters",
         "model.py": "Python Module",
         "README.md": "Documentation",
     }